@@ -1,7 +1,45 @@
 from fastapi import FastAPI
 from neo4j import GraphDatabase
 import os
-from dependencies import set_global_neo4j_driver, get_global_neo4j_driver
+from dependencies import (
+    set_global_neo4j_driver, get_global_neo4j_driver,
+    set_global_article_cache, get_global_article_cache,
+    set_global_wikipedia_pool, get_global_wikipedia_pool,
+    set_global_analysis_sessions, get_global_analysis_sessions,
+    set_global_analysis_executor, get_global_analysis_executor,
+    set_global_stored_graph_cache, get_global_stored_graph_cache,
+    set_global_single_flight, get_global_single_flight,
+    set_global_response_cache, get_global_response_cache,
+    set_global_upstream_guard, get_global_upstream_guard,
+    set_global_metrics, get_global_metrics,
+    set_global_crawl_jobs, get_global_crawl_jobs,
+    set_global_link_index, get_global_link_index,
+)
+from services.neo4j_schema import ensure_schema
+from services.article_cache import ArticleCache, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES, DEFAULT_TTL
+from services.async_wikipedia_client import WikipediaConnectionPool, DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_CONCURRENCY, DEFAULT_TIMEOUT
+from services.wikipedia_client import WIKIPEDIA_API_URL, DEFAULT_CONNECT_TIMEOUT
+from services.analysis_session import AnalysisSessionStore, DEFAULT_MAX_SESSIONS, DEFAULT_SESSION_TTL
+from services.analysis_executor import AnalysisExecutor, DEFAULT_MAX_WORKERS, DEFAULT_MAX_QUEUE, DEFAULT_JOB_TIMEOUT, DEFAULT_INLINE_MAX_EDGES
+from services.neo4j_repository import Neo4jRepository
+from services.stored_graph_cache import StoredGraphCache, DEFAULT_MAX_AGE, DEFAULT_MAX_PENDING_WRITES
+from services.single_flight import SingleFlight
+from services.link_index import LinkIndex, DEFAULT_MAX_BYTES as LINK_INDEX_MAX_BYTES, DEFAULT_TTL as LINK_INDEX_TTL
+from services.response_cache import ResponseCache, DEFAULT_MAX_BYTES as RESPONSE_CACHE_MAX_BYTES, DEFAULT_TTL as RESPONSE_CACHE_TTL
+from services import metrics
+from services.metrics import MetricsRegistry
+from services.async_wikipedia_client import AsyncWikipediaClient
+from services.crawl_engine import CrawlEngine, CrawlBudget, LINK_SOURCE_HTML
+from services.crawl_jobs import (
+    CrawlJobManager, CrawlJobStore, DEFAULT_MAX_QUEUED as CRAWL_JOB_MAX_QUEUED,
+    DEFAULT_CHECKPOINT_INTERVAL as CRAWL_JOB_CHECKPOINT_INTERVAL,
+)
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import strategies_from_metrics
+from services.upstream_guard import (
+    UpstreamGuard, DEFAULT_RATE, DEFAULT_BURST, DEFAULT_MAX_RETRIES, DEFAULT_BASE_DELAY, DEFAULT_MAX_DELAY,
+    DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT, DEFAULT_MAXLAG,
+)
 
 async def startup_db_client():
     uri = os.getenv("NEO4J_URI")
@@ -19,6 +57,16 @@ async def startup_db_client():
     except Exception as e:
         print(f"Neo4j driver connection failed: {e}")
         raise
+
+    try:
+        schema = ensure_schema(driver, os.getenv("NEO4J_DATABASE", "neo4j"))
+        applied = ", ".join(f"v{version}" for version in schema["applied"]) or "none"
+        print(f"Neo4j schema at v{schema['version']} (applied now: {applied}); "
+              f"constraints: {', '.join(schema['constraints'])}; indexes: {', '.join(schema['indexes'])}")
+    except Exception as e:
+        print(f"Neo4j schema migration failed: {e}")
+        driver.close()
+        raise
     
     set_global_neo4j_driver(driver)
 
@@ -27,3 +75,233 @@ async def shutdown_db_client():
     if driver:
         driver.close()
         print("Neo4j driver closed.")
+
+async def startup_article_cache():
+    cache = ArticleCache(
+        max_entries=int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+        max_bytes=int(os.getenv("ARTICLE_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+        ttl=float(os.getenv("ARTICLE_CACHE_TTL", str(DEFAULT_TTL))),
+    )
+    set_global_article_cache(cache)
+    print(f"Article cache ready (max_entries={cache.max_entries}, max_bytes={cache.max_bytes}, ttl={cache.ttl}s).")
+
+async def shutdown_article_cache():
+    cache = get_global_article_cache()
+    if cache:
+        print(f"Article cache stats at shutdown: {cache.stats()}")
+        cache.clear()
+
+async def startup_wikipedia_pool():
+    pool = WikipediaConnectionPool(
+        api_url=os.getenv("WIKIPEDIA_API_URL", WIKIPEDIA_API_URL),
+        max_connections=int(os.getenv("WIKIPEDIA_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))),
+        max_concurrency=int(os.getenv("WIKIPEDIA_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))),
+        timeout=float(os.getenv("WIKIPEDIA_TIMEOUT", str(DEFAULT_TIMEOUT))),
+        connect_timeout=float(os.getenv("WIKIPEDIA_CONNECT_TIMEOUT", str(DEFAULT_CONNECT_TIMEOUT))),
+    )
+    set_global_wikipedia_pool(pool)
+    print(f"Wikipedia connection pool ready (max_concurrency={pool.max_concurrency}).")
+
+async def shutdown_wikipedia_pool():
+    pool = get_global_wikipedia_pool()
+    if pool:
+        await pool.aclose()
+        print("Wikipedia connection pool closed.")
+
+async def startup_analysis_sessions():
+    # Sessions are evicted when idle for ANALYSIS_SESSION_TTL seconds or when there are too many
+    sessions = AnalysisSessionStore(
+        max_sessions=int(os.getenv("ANALYSIS_SESSION_MAX", str(DEFAULT_MAX_SESSIONS))),
+        ttl=float(os.getenv("ANALYSIS_SESSION_TTL", str(DEFAULT_SESSION_TTL))),
+    )
+    set_global_analysis_sessions(sessions)
+    print(f"Analysis session store ready (max_sessions={sessions.max_sessions}, ttl={sessions.ttl}s).")
+
+async def shutdown_analysis_sessions():
+    sessions = get_global_analysis_sessions()
+    if sessions is not None:
+        print(f"Analysis session stats at shutdown: {sessions.stats()}")
+        sessions.clear()
+
+async def startup_analysis_executor():
+    max_workers = int(os.getenv("ANALYSIS_MAX_WORKERS", str(DEFAULT_MAX_WORKERS)))
+    if max_workers <= 0:
+        print("Analysis executor disabled; graph analysis runs inline.")
+        return
+    executor = AnalysisExecutor(
+        max_workers=max_workers,
+        max_queue=int(os.getenv("ANALYSIS_MAX_QUEUE", str(DEFAULT_MAX_QUEUE))),
+        timeout=float(os.getenv("ANALYSIS_TIMEOUT", str(DEFAULT_JOB_TIMEOUT))),
+        inline_max_edges=int(os.getenv("ANALYSIS_INLINE_MAX_EDGES", str(DEFAULT_INLINE_MAX_EDGES))),
+    )
+    set_global_analysis_executor(executor)
+    print(f"Analysis executor ready (max_workers={executor.max_workers}, max_queue={executor.max_queue}).")
+
+async def shutdown_analysis_executor():
+    executor = get_global_analysis_executor()
+    if executor:
+        executor.shutdown()
+        set_global_analysis_executor(None)
+        print("Analysis executor shut down.")
+
+async def startup_stored_graph_cache():
+    # Needs the Neo4j driver, so it starts after startup_db_client
+    max_age = float(os.getenv("STORED_GRAPH_MAX_AGE", str(DEFAULT_MAX_AGE)))
+    driver = get_global_neo4j_driver()
+    if max_age <= 0 or driver is None:
+        print("Stored graph cache disabled; explores always fetch from Wikipedia.")
+        return
+    stored_graph = StoredGraphCache(
+        Neo4jRepository(driver=driver),
+        max_age=max_age,
+        max_pending_writes=int(os.getenv("STORED_GRAPH_MAX_PENDING_WRITES", str(DEFAULT_MAX_PENDING_WRITES))),
+    )
+    set_global_stored_graph_cache(stored_graph)
+    print(f"Stored graph cache ready (max_age={stored_graph.max_age}s).")
+
+async def shutdown_stored_graph_cache():
+    # Flushes pending write-backs, so it must run before shutdown_db_client
+    stored_graph = get_global_stored_graph_cache()
+    if stored_graph:
+        stored_graph.close()
+        set_global_stored_graph_cache(None)
+        print(f"Stored graph cache stats at shutdown: {stored_graph.stats()}")
+
+async def startup_single_flight():
+    set_global_single_flight(SingleFlight())
+
+async def shutdown_single_flight():
+    single_flight = get_global_single_flight()
+    if single_flight:
+        print(f"Single-flight stats at shutdown: {single_flight.stats()}")
+
+async def startup_link_index():
+    # One per worker process; LINK_INDEX_MAX_BYTES=0 disables it
+    max_bytes = int(os.getenv("LINK_INDEX_MAX_BYTES", str(LINK_INDEX_MAX_BYTES)))
+    if max_bytes <= 0:
+        print("Link index disabled.")
+        return
+    link_index = LinkIndex(max_bytes=max_bytes, ttl=float(os.getenv("LINK_INDEX_TTL", str(LINK_INDEX_TTL))))
+    set_global_link_index(link_index)
+    print(f"Link index ready (max_bytes={link_index.max_bytes}, ttl={link_index.ttl}s).")
+
+async def shutdown_link_index():
+    link_index = get_global_link_index()
+    if link_index:
+        print(f"Link index stats at shutdown: {link_index.stats()}")
+        link_index.clear()
+        set_global_link_index(None)
+
+async def startup_response_cache():
+    # Every worker process opens the same SQLite file; an empty path disables the cache
+    path = os.getenv("WIKIPEDIA_RESPONSE_CACHE_PATH", "")
+    if not path:
+        print("Wikipedia response cache disabled.")
+        return
+    cache = ResponseCache(
+        path,
+        max_bytes=int(os.getenv("WIKIPEDIA_RESPONSE_CACHE_MAX_BYTES", str(RESPONSE_CACHE_MAX_BYTES))),
+        ttl=float(os.getenv("WIKIPEDIA_RESPONSE_CACHE_TTL", str(RESPONSE_CACHE_TTL))),
+    )
+    set_global_response_cache(cache)
+    print(f"Wikipedia response cache ready at {cache.path} (max_bytes={cache.max_bytes}, ttl={cache.ttl}s).")
+
+async def shutdown_response_cache():
+    cache = get_global_response_cache()
+    if cache:
+        print(f"Wikipedia response cache stats at shutdown: {cache.stats()}")
+        cache.close()
+        set_global_response_cache(None)
+
+async def startup_upstream_guard():
+    maxlag = int(os.getenv("WIKIPEDIA_MAXLAG", str(DEFAULT_MAXLAG)))
+    guard = UpstreamGuard(
+        rate=float(os.getenv("WIKIPEDIA_RATE_LIMIT", str(DEFAULT_RATE))),
+        burst=int(os.getenv("WIKIPEDIA_RATE_BURST", str(DEFAULT_BURST))),
+        max_retries=int(os.getenv("WIKIPEDIA_MAX_RETRIES", str(DEFAULT_MAX_RETRIES))),
+        base_delay=float(os.getenv("WIKIPEDIA_RETRY_BASE_DELAY", str(DEFAULT_BASE_DELAY))),
+        max_delay=float(os.getenv("WIKIPEDIA_RETRY_MAX_DELAY", str(DEFAULT_MAX_DELAY))),
+        failure_threshold=int(os.getenv("WIKIPEDIA_CIRCUIT_FAILURES", str(DEFAULT_FAILURE_THRESHOLD))),
+        reset_timeout=float(os.getenv("WIKIPEDIA_CIRCUIT_RESET", str(DEFAULT_RESET_TIMEOUT))),
+        maxlag=maxlag if maxlag > 0 else None,
+    )
+    set_global_upstream_guard(guard)
+    print(f"Wikipedia upstream guard ready (rate={guard.bucket.rate}/s, burst={guard.bucket.burst}, max_retries={guard.max_retries}).")
+
+async def shutdown_upstream_guard():
+    guard = get_global_upstream_guard()
+    if guard:
+        print(f"Wikipedia upstream stats at shutdown: {guard.stats()}")
+        set_global_upstream_guard(None)
+
+async def startup_metrics():
+    # Off by default: every instrumentation hook is then a no-op
+    if os.getenv("METRICS_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        print("Metrics disabled.")
+        return
+    registry = MetricsRegistry(server_timing=os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes"))
+    metrics.activate(registry)
+    set_global_metrics(registry)
+    print(f"Metrics enabled on /metrics (Server-Timing header: {registry.server_timing}).")
+
+async def shutdown_metrics():
+    if get_global_metrics():
+        metrics.activate(None)
+        set_global_metrics(None)
+
+# Crawl jobs have their own budget, much larger than an interactive explore's
+DEFAULT_CRAWL_JOB_MAX_NODES = 5000
+DEFAULT_CRAWL_JOB_MAX_CALLS = 2000
+DEFAULT_CRAWL_JOB_TIME_BUDGET = 900.0 # Seconds
+
+def _crawl_job_events(params: dict):
+    """
+    The crawl event stream of one job, built from the same app-scoped clients, caches and executor as /api/explore.
+    """
+    wiki_client = AsyncWikipediaClient(
+        pool=get_global_wikipedia_pool(),
+        cache=get_global_article_cache(),
+        single_flight=get_global_single_flight(),
+        response_cache=get_global_response_cache(),
+        upstream_guard=get_global_upstream_guard(),
+    )
+    graph_analyzer = GraphAnalyzer(strategies=strategies_from_metrics(params["metrics"]), executor=get_global_analysis_executor())
+    budget = CrawlBudget(
+        max_nodes=int(os.getenv("CRAWL_JOB_MAX_NODES", str(DEFAULT_CRAWL_JOB_MAX_NODES))),
+        max_calls=int(os.getenv("CRAWL_JOB_MAX_CALLS", str(DEFAULT_CRAWL_JOB_MAX_CALLS))),
+        time_budget=float(os.getenv("CRAWL_JOB_TIME_BUDGET", str(DEFAULT_CRAWL_JOB_TIME_BUDGET))),
+    )
+    engine = CrawlEngine(wiki_client, graph_analyzer, max_neighbors=params["max_neighbors"], budget=budget,
+                         link_source=os.getenv("LINK_SOURCE", LINK_SOURCE_HTML), stored_graph=get_global_stored_graph_cache(),
+                         link_index=get_global_link_index())
+    return engine.stream(params["article_title"], params["depth"])
+
+async def startup_crawl_jobs():
+    # Needs the Wikipedia pool and the Neo4j driver (for saving), so it starts last.
+    # Off unless CRAWL_JOB_WORKERS is set, like the response cache: the job table is a file on disk
+    workers = int(os.getenv("CRAWL_JOB_WORKERS", "0"))
+    if workers <= 0:
+        print("Crawl jobs disabled.")
+        return
+    driver = get_global_neo4j_driver()
+    repository = Neo4jRepository(driver=driver) if driver is not None else None
+    crawl_jobs = CrawlJobManager(
+        CrawlJobStore(os.getenv("CRAWL_JOB_DB_PATH", "data/crawl_jobs.sqlite3")),
+        _crawl_job_events,
+        save=repository.save_exploration if repository else None,
+        workers=workers,
+        max_queued=int(os.getenv("CRAWL_JOB_MAX_QUEUED", str(CRAWL_JOB_MAX_QUEUED))),
+        checkpoint_interval=float(os.getenv("CRAWL_JOB_CHECKPOINT_INTERVAL", str(CRAWL_JOB_CHECKPOINT_INTERVAL))),
+    )
+    await crawl_jobs.start()
+    set_global_crawl_jobs(crawl_jobs)
+    print(f"Crawl jobs ready at {crawl_jobs.store.path} (workers={crawl_jobs.workers}).")
+
+async def shutdown_crawl_jobs():
+    # Running jobs are queued again, so it must run before the pool and the driver close
+    crawl_jobs = get_global_crawl_jobs()
+    if crawl_jobs:
+        await crawl_jobs.close()
+        print(f"Crawl job stats at shutdown: {crawl_jobs.stats()}")
+        crawl_jobs.store.close()
+        set_global_crawl_jobs(None)
@@ -0,0 +1,79 @@
+"""
+Centrality strategies on the CSR arrays against the networkx implementations
+they replace, on random link graphs with explore-like out-degrees.
+
+networkx is skipped above --nx-max-nodes, where it takes minutes per metric.
+Betweenness uses --sources sampled BFS sources on both sides.
+
+Run from the backend directory:
+    python -m benchmarks.bench_centrality --sizes 1000 10000 100000
+"""
+import argparse
+import time
+import networkx as nx
+import numpy as np
+from services.csr_graph import CSRGraph
+from services.graph_strategies import (
+    BetweennessCentralityStrategy,
+    DegreeCentralityStrategy,
+    HITSAuthorityStrategy,
+    InDegreeCentralityStrategy,
+    OutDegreeCentralityStrategy,
+    PageRankStrategy,
+)
+
+def make_edges(node_count: int, out_degree: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    sources = np.repeat(np.arange(node_count), out_degree)
+    targets = rng.integers(0, node_count, size=sources.shape[0])
+    return [(f"Topic {s}", f"Topic {t}") for s, t in zip(sources.tolist(), targets.tolist())]
+
+def timed(function, repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--out-degree", type=int, default=15)
+    parser.add_argument("--sources", type=int, default=64, help="Sampled sources for betweenness")
+    parser.add_argument("--nx-max-nodes", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'metric':<16} {'csr (s)':>10} {'networkx (s)':>13} {'speedup':>8}")
+    for size in args.sizes:
+        edges = make_edges(size, args.out_degree)
+        node_ids = [f"Topic {i}" for i in range(size)]
+        build_time = timed(lambda: CSRGraph.from_edges(node_ids, edges))
+        graph = CSRGraph.from_edges(node_ids, edges)
+        print(f"{size:>8} {'build':<16} {build_time:>10.4f}")
+
+        nx_graph = None
+        if size <= args.nx_max_nodes:
+            nx_graph = nx.DiGraph()
+            nx_graph.add_nodes_from(node_ids)
+            nx_graph.add_edges_from(edges)
+
+        cases = [
+            ("degree", DegreeCentralityStrategy(), nx.degree_centrality),
+            ("in_degree", InDegreeCentralityStrategy(), nx.in_degree_centrality),
+            ("out_degree", OutDegreeCentralityStrategy(), nx.out_degree_centrality),
+            ("pagerank", PageRankStrategy(), nx.pagerank),
+            ("hits", HITSAuthorityStrategy(), nx.hits),
+            ("betweenness", BetweennessCentralityStrategy(max_sources=args.sources),
+             lambda g: nx.betweenness_centrality(g, k=args.sources, seed=0)),
+        ]
+        for name, strategy, reference in cases:
+            csr_time = timed(lambda: strategy.analyze(graph), repeat=3)
+            if nx_graph is None:
+                print(f"{size:>8} {name:<16} {csr_time:>10.4f} {'-':>13} {'-':>8}")
+                continue
+            nx_time = timed(lambda: reference(nx_graph))
+            print(f"{size:>8} {name:<16} {csr_time:>10.4f} {nx_time:>13.4f} {nx_time / csr_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
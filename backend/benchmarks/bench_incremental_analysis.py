@@ -0,0 +1,56 @@
+"""
+Incremental AnalysisSession updates against a full GraphAnalyzer recompute after
+every expansion of an interactive session.
+
+The graph starts with --start-nodes nodes, then --steps expansions each add
+--neighbors new nodes linked from one existing node.
+
+Run from the backend directory:
+    python -m benchmarks.bench_incremental_analysis --start-nodes 10000 --steps 50
+"""
+import argparse
+import time
+from services.analysis_session import AnalysisSession
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import strategies_from_metrics
+from benchmarks.bench_centrality import make_edges
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-nodes", type=int, default=10000)
+    parser.add_argument("--out-degree", type=int, default=15)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--neighbors", type=int, default=15)
+    parser.add_argument("--metrics", nargs="+", default=["degree", "degree,pagerank"])
+    args = parser.parse_args()
+
+    start_edges = make_edges(args.start_nodes, args.out_degree)
+    deltas = []
+    for step in range(args.steps):
+        parent = f"Topic {(step * 7919) % args.start_nodes}"
+        children = [f"Expanded {step}-{i}" for i in range(args.neighbors)]
+        deltas.append((children, [(parent, child) for child in children]))
+
+    print(f"{'metrics':<20} {'incremental (ms/step)':>22} {'full (ms/step)':>15} {'speedup':>8}")
+    for metrics in args.metrics:
+        session = AnalysisSession(strategies_from_metrics(metrics))
+        session.add([f"Topic {i}" for i in range(args.start_nodes)], start_edges)
+        start = time.perf_counter()
+        for node_ids, edges in deltas:
+            session.add(node_ids, edges)
+        incremental = (time.perf_counter() - start) / args.steps
+
+        analyzer = GraphAnalyzer(strategies=strategies_from_metrics(metrics))
+        nodes = [{"id": f"Topic {i}"} for i in range(args.start_nodes)]
+        edges = [{"from": u, "to": v} for u, v in start_edges]
+        start = time.perf_counter()
+        for node_ids, delta_edges in deltas:
+            nodes += [{"id": node_id} for node_id in node_ids]
+            edges += [{"from": u, "to": v} for u, v in delta_edges]
+            analyzer.analyze_and_add_results(nodes, edges)
+        full = (time.perf_counter() - start) / args.steps
+
+        print(f"{metrics:<20} {incremental * 1000:>22.2f} {full * 1000:>15.2f} {full / incremental:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark of link extraction over the saved article HTML fixtures.
+
+Compares the compiled href scanner (extract_links_from_html) with the
+BeautifulSoup/lxml reference (extract_links_from_html_soup) and checks that
+both return the same links.
+
+Run from the backend directory:
+    python -m benchmarks.bench_link_extraction
+    python -m benchmarks.bench_link_extraction --record "Albert Einstein" "World War II"
+
+The bundled fixtures (synthetic_large_*.html.gz) are generated pages that
+mimic action=parse output, not real articles; numbers measured on them are
+not real-article results. --record fetches the rendered HTML of real articles
+through action=parse and saves it next to them, named after the article,
+before benchmarking.
+"""
+import argparse
+import gzip
+import re
+import timeit
+from pathlib import Path
+from services.wikipedia_client import WikipediaClient
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "html"
+
+def fixture_name(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_") + ".html.gz"
+
+def record(client: WikipediaClient, titles: list):
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for title in titles:
+        html_content, final_title = client.get_article_content(title)
+        path = FIXTURES_DIR / fixture_name(final_title)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(html_content)
+        print(f"recorded {final_title!r} -> {path.name} ({len(html_content)} chars)")
+
+def load_fixtures() -> list:
+    return [(path.name, gzip.open(path, "rt", encoding="utf-8").read()) for path in sorted(FIXTURES_DIR.glob("*.html.gz"))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", nargs="+", metavar="TITLE", help="fetch and save these articles first")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per extractor (best is reported)")
+    args = parser.parse_args()
+
+    client = WikipediaClient()
+    if args.record:
+        record(client, args.record)
+
+    fixtures = load_fixtures()
+    print(f"{'fixture':<40} {'KB':>6} {'links':>6} {'scanner ms':>11} {'soup ms':>9} {'speedup':>8}")
+    total_fast = total_soup = 0.0
+    for name, html_content in fixtures:
+        fast_links = client.extract_links_from_html(html_content, name)
+        soup_links = client.extract_links_from_html_soup(html_content, name)
+        if fast_links != soup_links:
+            raise SystemExit(f"{name}: extractors disagree on {sorted(fast_links ^ soup_links)[:10]}")
+
+        fast = min(timeit.repeat(lambda: client.extract_links_from_html(html_content, name), number=1, repeat=args.repeat))
+        soup = min(timeit.repeat(lambda: client.extract_links_from_html_soup(html_content, name), number=1, repeat=args.repeat))
+        total_fast += fast
+        total_soup += soup
+        print(f"{name:<40} {len(html_content) / 1024:>6.0f} {len(fast_links):>6} {fast * 1000:>11.2f} {soup * 1000:>9.2f} {soup / fast:>7.1f}x")
+
+    if fixtures:
+        print(f"{'total':<40} {'':>6} {'':>6} {total_fast * 1000:>11.2f} {total_soup * 1000:>9.2f} {total_soup / total_fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare the two link sources of CrawlEngine: action=parse + HTML extraction
+("html") against action=query&prop=links ("links").
+
+For every saved HTML fixture it synthesizes both API responses for the same
+article and reports bytes, calls and decode+extract time. prop=links responses
+are paged like the real API (pllimit=max: 500 links per response, the rest
+behind "continue"), so an article with many links costs several calls. The
+synthesized bodies only approximate the real ones; --live fetches real
+articles from Wikipedia and reports the measured bytes and calls.
+
+Run from the backend directory:
+    python -m benchmarks.bench_link_sources
+    python -m benchmarks.bench_link_sources --live "Albert Einstein" "World War II"
+"""
+import argparse
+import json
+import timeit
+from typing import List
+import requests
+from benchmarks.bench_link_extraction import load_fixtures
+from services.wikipedia_client import WikipediaClient, WIKIPEDIA_API_URL
+
+def parse_body(title: str, html_content: str) -> bytes:
+    return json.dumps({"parse": {"title": title, "pageid": 1, "text": {"*": html_content}}}).encode("utf-8")
+
+PLLIMIT_MAX = 500 # Links per prop=links response for regular API users
+
+def links_bodies(title: str, links: set) -> List[bytes]:
+    """
+    The prop=links responses for one article, PLLIMIT_MAX links each, as the API pages them.
+    """
+    ordered = sorted(links)
+    bodies = []
+    for offset in range(0, max(len(ordered), 1), PLLIMIT_MAX):
+        page = {"pageid": 1, "ns": 0, "title": title,
+                "links": [{"ns": 0, "title": link} for link in ordered[offset:offset + PLLIMIT_MAX]]}
+        data = {"query": {"pages": {"1": page}}}
+        if offset + PLLIMIT_MAX < len(ordered):
+            data["continue"] = {"plcontinue": f"1|0|{ordered[offset + PLLIMIT_MAX]}", "continue": "||"}
+        else:
+            data["batchcomplete"] = ""
+        bodies.append(json.dumps(data).encode("utf-8"))
+    return bodies
+
+def links_from_parse(client: WikipediaClient, body: bytes) -> set:
+    data = json.loads(body)
+    return client.extract_links_from_html(data["parse"]["text"]["*"], data["parse"]["title"])
+
+def links_from_query(client: WikipediaClient, bodies: List[bytes]) -> set:
+    links, aliases = {}, {}
+    for body in bodies:
+        client._collect_links(json.loads(body), links, aliases)
+    return set(next(iter(links.values())))
+
+def live(titles: list):
+    session = requests.Session()
+    print(f"\n{'live article':<40} {'parse KB':>9} {'links KB':>9} {'calls':>6} {'ratio':>6}")
+    for title in titles:
+        parse_response = session.get(WIKIPEDIA_API_URL, params=WikipediaClient._content_params(title))
+        params = WikipediaClient._links_params([title])
+        links_bytes = links_calls = 0
+        while True:
+            response = session.get(WIKIPEDIA_API_URL, params=params)
+            links_bytes += len(response.content)
+            links_calls += 1
+            data = response.json()
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+        print(f"{title:<40} {len(parse_response.content) / 1024:>9.1f} {links_bytes / 1024:>9.1f} {links_calls:>6} "
+              f"{len(parse_response.content) / links_bytes:>5.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", nargs="+", metavar="TITLE", help="also measure these articles against the real API")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = WikipediaClient()
+    print("Synthesized from the HTML fixtures; use --live for real responses.")
+    print(f"{'fixture':<40} {'parse KB':>9} {'links KB':>9} {'calls':>6} {'parse ms':>9} {'links ms':>9}")
+    for name, html_content in load_fixtures():
+        title = name.split(".")[0]
+        parse = parse_body(title, html_content)
+        links = links_bodies(title, client.extract_links_from_html(html_content, title))
+        assert links_from_parse(client, parse) == links_from_query(client, links)
+
+        parse_time = min(timeit.repeat(lambda: links_from_parse(client, parse), number=1, repeat=args.repeat))
+        links_time = min(timeit.repeat(lambda: links_from_query(client, links), number=1, repeat=args.repeat))
+        links_bytes = sum(len(body) for body in links)
+        print(f"{name:<40} {len(parse) / 1024:>9.1f} {links_bytes / 1024:>9.1f} {len(links):>6} {parse_time * 1000:>9.2f} {links_time * 1000:>9.2f}")
+
+    if args.live:
+        live(args.live)
+
+if __name__ == "__main__":
+    main()
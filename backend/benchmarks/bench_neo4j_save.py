@@ -0,0 +1,103 @@
+"""
+Save time of Neo4jRepository.save_exploration against graph size, compared with
+the previous one-statement-per-node/edge implementation.
+
+By default it uses the recording fake driver with a simulated round trip per
+statement. Pass --uri to run against a real database, for example a local test
+container:
+    docker run --rm -p 7687:7687 -e NEO4J_AUTH=neo4j/benchmark neo4j:5
+    python -m benchmarks.bench_neo4j_save --uri bolt://localhost:7687 --password benchmark
+
+Run from the backend directory:
+    python -m benchmarks.bench_neo4j_save --sizes 100 1000 2000 --round-trip 0.0005
+"""
+import argparse
+import os
+import time
+from uuid import uuid4
+from neo4j import GraphDatabase
+from services.neo4j_repository import Neo4jRepository
+from tests.fake_neo4j import FakeDriver
+
+def make_graph(node_count: int):
+    nodes = [{"id": f"Bench {i}", "label": f"Bench {i}", "summary": "x" * 200, "degree_centrality": 0.1} for i in range(node_count)]
+    edges = [{"from": f"Bench {i // 10}", "to": f"Bench {i}"} for i in range(1, node_count)]
+    return nodes, edges
+
+def save_per_row(driver, database: str, name: str, nodes: list, edges: list):
+    """
+    The previous save_exploration: one statement per node and per edge.
+    """
+    exploration_id = str(uuid4())
+
+    def _tx(tx):
+        tx.run("CREATE (e:Exploration {id: $id, name: $name})", id=exploration_id, name=name)
+        for node_data in nodes:
+            tx.run("""
+                MERGE (gn:GraphNode {id: $node_id})
+                ON CREATE SET gn.label = $label, gn.summary = $summary, gn.degree_centrality = $degree_centrality
+                ON MATCH SET gn.label = $label, gn.summary = $summary, gn.degree_centrality = $degree_centrality
+                WITH gn
+                MATCH (e:Exploration {id: $exploration_id})
+                MERGE (e)-[:CONTAINS_NODE]->(gn)
+                """,
+                node_id=node_data['id'], label=node_data.get('label'), summary=node_data.get('summary'),
+                degree_centrality=node_data.get('degree_centrality'), exploration_id=exploration_id)
+        for edge_data in edges:
+            tx.run("""
+                MATCH (from_node:GraphNode {id: $from_id})
+                MATCH (to_node:GraphNode {id: $to_id})
+                MERGE (from_node)-[:LINKS_TO]->(to_node)
+                """, from_id=edge_data['from'], to_id=edge_data['to'])
+        return exploration_id
+
+    with driver.session(database=database) as session:
+        return session.execute_write(_tx)
+
+def cleanup(driver, database: str):
+    with driver.session(database=database) as session:
+        session.run("MATCH (e:Exploration) WHERE e.name STARTS WITH 'bench-' DETACH DELETE e")
+        session.run("MATCH (gn:GraphNode) WHERE gn.id STARTS WITH 'Bench ' DETACH DELETE gn")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 500, 1000, 2000])
+    parser.add_argument("--round-trip", type=float, default=0.0005, help="simulated seconds per statement (fake driver)")
+    parser.add_argument("--uri")
+    parser.add_argument("--user", default="neo4j")
+    parser.add_argument("--password", default="neo4j")
+    parser.add_argument("--database", default="neo4j")
+    args = parser.parse_args()
+
+    if args.uri:
+        driver = GraphDatabase.driver(args.uri, auth=(args.user, args.password))
+    else:
+        driver = FakeDriver(round_trip=args.round_trip)
+    os.environ["NEO4J_DATABASE"] = args.database
+    repo = Neo4jRepository(driver=driver)
+
+    print(f"{'nodes':>6} {'edges':>6} {'per-row s':>10} {'stmts':>6} {'unwind s':>9} {'stmts':>6} {'speedup':>8}")
+    try:
+        for size in args.sizes:
+            nodes, edges = make_graph(size)
+
+            before = len(getattr(driver, "queries", []))
+            started = time.perf_counter()
+            save_per_row(driver, args.database, f"bench-{size}", nodes, edges)
+            per_row = time.perf_counter() - started
+            per_row_statements = len(getattr(driver, "queries", [])) - before
+
+            before = len(getattr(driver, "queries", []))
+            started = time.perf_counter()
+            repo.save_exploration(f"bench-{size}", nodes, edges)
+            unwind = time.perf_counter() - started
+            unwind_statements = len(getattr(driver, "queries", [])) - before
+
+            print(f"{size:>6} {len(edges):>6} {per_row:>10.3f} {per_row_statements or '-':>6} {unwind:>9.3f} {unwind_statements or '-':>6} {per_row / unwind:>7.1f}x")
+            if args.uri:
+                cleanup(driver, args.database)
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+End-to-end throughput and latency of the explore, save, list and analysis
+paths, replayed offline so runs are reproducible.
+
+Wikipedia is served by a local stub: either replaying MediaWiki responses
+recorded once with --record, or the synthetic "Topic N" graph when no fixtures
+are given. --latency adds a delay per upstream response. Neo4j is the recording
+fake driver with an in-memory exploration store and --neo4j-round-trip seconds
+per statement. Requests go through the FastAPI app in process (httpx
+ASGITransport), with the same app-scoped caches, pool and executor as a server.
+
+For each scenario and concurrency level it reports p50/p95/p99 latency,
+requests per second, errors, the highest RSS sampled while the level ran
+(from /proc/self/statm, so Linux only) and the process's lifetime peak RSS,
+which never goes down from one level to the next. Both cover this process
+only, not the analysis workers. --save-baseline writes
+the results as JSON; --baseline compares against such a file and exits with
+status 1 when p95 or throughput regressed by more than --tolerance.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --record "Albert Einstein" "Python (programming language)" --fixtures benchmarks/fixtures/pipeline.json.gz
+    python -m benchmarks.bench_pipeline --fixtures benchmarks/fixtures/pipeline.json.gz --latency 0.08 --concurrency 1 8 32
+    python -m benchmarks.bench_pipeline --cold --scenarios explore
+    python -m benchmarks.bench_pipeline --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baselines/local.json
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import httpx
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.crawl_engine import CrawlEngine, LINK_SOURCE_HTML, LINK_SOURCES
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import DegreeCentralityStrategy
+from services.neo4j_repository import LIST_EXPLORATIONS_QUERY
+from services.response_cache import ResponseCache, normalize_params
+from services.wikipedia_client import WIKIPEDIA_API_URL
+from tests.fake_neo4j import FakeDriver
+from tests.wikipedia_stub import WikipediaStubServer
+
+SCENARIOS = ("explore", "save", "list", "analysis")
+DEFAULT_MAX_NEIGHBORS = 15
+RSS_SAMPLE_INTERVAL = 0.01 # Seconds between RSS samples during a level
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile; 0.0 for no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Resident set size of this process right now, or None where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def process_peak_rss_mb() -> float:
+    """
+    Highest RSS of this process since it started, the same or higher for every later level.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # Bytes on macOS, KB on Linux
+
+
+# --- Upstream: recording and replay ---
+
+class ReplayStubServer(WikipediaStubServer):
+    """
+    Serves recorded MediaWiki responses, looked up by their normalized parameters.
+    Requests that were not recorded get an API error and are counted in `misses`.
+    """
+
+    def __init__(self, responses: Dict[str, Any], latency: float = 0.0):
+        super().__init__(latency=latency)
+        self.responses = responses
+        self.misses = 0
+
+    def respond(self, params: dict) -> dict:
+        params = {name: _recorded_value(value) for name, value in params.items() if name != "maxlag"}
+        data = self.responses.get(normalize_params(params))
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return {"error": {"code": "notrecorded", "info": "This request is not in the benchmark fixtures."}}
+        return data
+
+def _recorded_value(value: str) -> str:
+    # Booleans are stored as 1/0 by normalize_params, but HTTP clients send them as words
+    return {"true": "1", "True": "1", "false": "0", "False": "0"}.get(value, value)
+
+async def record(titles: List[str], depth: int, link_source: str, max_neighbors: int, path: Path, api_url: str = WIKIPEDIA_API_URL):
+    """
+    Explore each title once against `api_url` and save every API response it needed as replay fixtures.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, "responses.sqlite3"))
+        pool = WikipediaConnectionPool(api_url=api_url)
+        try:
+            for title in titles:
+                client = AsyncWikipediaClient(pool=pool, response_cache=cache)
+                engine = CrawlEngine(client, GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=max_neighbors,
+                                     link_source=link_source)
+                graph = await engine.crawl(title, depth)
+                print(f"recorded {title!r}: {len(graph['nodes'])} nodes, {client.request_count} API calls")
+        finally:
+            await pool.aclose()
+        responses = dict(cache.items())
+        cache.close()
+
+    fixture = {"titles": titles, "depth": depth, "link_source": link_source, "max_neighbors": max_neighbors, "responses": responses}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    print(f"saved {len(responses)} responses to {path}")
+
+def load_fixture(path: Path) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- Neo4j: an in-memory exploration store behind the fake driver ---
+
+class InMemoryExplorations:
+    """
+    Responder for FakeDriver that keeps saved explorations, so list returns what save wrote.
+    """
+
+    def __init__(self):
+        self.explorations = []
+        self._lock = threading.Lock()
+
+    def respond(self, query: str, params: dict):
+        if query.startswith("CREATE (e:Exploration"):
+            with self._lock:
+                self.explorations.append({"id": params["id"], "name": params["name"], "node_count": params["node_count"],
+                                          "edge_count": params["edge_count"], "created_at": f"{time.time():.6f}"})
+        elif query == LIST_EXPLORATIONS_QUERY:
+            with self._lock:
+                return sorted(self.explorations, key=lambda e: e["created_at"], reverse=True)[:params["limit"]]
+        return []
+
+
+# --- The app, started as the server would be ---
+
+async def start_app(api_url: str, neo4j_round_trip: float):
+    """
+    Run the app_lifespan startup of everything but Neo4j, which is replaced by the fake driver.
+    """
+    os.environ["WIKIPEDIA_API_URL"] = api_url
+    os.environ.setdefault("WIKIPEDIA_RATE_LIMIT", "1000000") # Pacing would measure the limiter, not the app
+    os.environ.setdefault("WIKIPEDIA_RATE_BURST", "1000000")
+    import app_lifespan
+    from dependencies import set_global_neo4j_driver
+    from main import app
+
+    await app_lifespan.startup_article_cache()
+    await app_lifespan.startup_wikipedia_pool()
+    await app_lifespan.startup_single_flight()
+    await app_lifespan.startup_link_index()
+    await app_lifespan.startup_upstream_guard()
+    await app_lifespan.startup_analysis_sessions()
+    await app_lifespan.startup_analysis_executor()
+    set_global_neo4j_driver(FakeDriver(round_trip=neo4j_round_trip, responder=InMemoryExplorations().respond))
+    return app
+
+async def stop_app():
+    import app_lifespan
+    from dependencies import set_global_neo4j_driver, set_global_wikipedia_pool
+
+    await app_lifespan.shutdown_analysis_executor()
+    await app_lifespan.shutdown_analysis_sessions()
+    await app_lifespan.shutdown_upstream_guard()
+    await app_lifespan.shutdown_single_flight()
+    await app_lifespan.shutdown_link_index()
+    await app_lifespan.shutdown_wikipedia_pool()
+    await app_lifespan.shutdown_article_cache()
+    set_global_wikipedia_pool(None)
+    set_global_neo4j_driver(None)
+
+
+# --- Load generation ---
+
+def make_scenarios(titles: List[str], depth: int, sample: dict, metrics: str) -> Dict[str, Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]]:
+    nodes = [{"id": node["id"], "label": node["label"], "summary": node.get("summary"),
+              "degree_centrality": node.get("degree_centrality")} for node in sample["nodes"]]
+    edges = sample["edges"]
+    return {
+        "explore": lambda client, i: client.get(f"/api/explore/{titles[i % len(titles)]}", params={"depth": depth}),
+        "save": lambda client, i: client.post("/api/explorations", json={"name": f"bench-{i}", "nodes": nodes, "edges": edges}),
+        "list": lambda client, i: client.get("/api/explorations", params={"limit": 20}),
+        "analysis": lambda client, i: client.post("/api/analysis/sessions", json={
+            "nodes": [node["id"] for node in nodes], "edges": edges, "metrics": metrics}),
+    }
+
+async def run_level(client: httpx.AsyncClient, scenario: str, send: Callable, concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    next_request = 0
+
+    async def worker():
+        nonlocal errors, next_request
+        while next_request < requests:
+            index = next_request
+            next_request += 1
+            started = time.perf_counter()
+            try:
+                ok = (await send(client, index)).status_code < 400
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    rss_samples = []
+
+    async def sample_rss():
+        while (rss := current_rss_mb()) is not None:
+            rss_samples.append(rss)
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+    sampler = asyncio.create_task(sample_rss())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    await asyncio.gather(sampler, return_exceptions=True)
+    final_rss = current_rss_mb()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "rss_mb": max(rss_samples + [final_rss]) if final_rss is not None else None, # Highest sample during this level
+        "process_peak_rss_mb": process_peak_rss_mb(),
+    }
+
+async def run_benchmark(api_url: str, titles: List[str], depth: int, scenarios: List[str], concurrency: List[int],
+                        requests: int, warmup: int = 5, neo4j_round_trip: float = 0.0005, metrics: str = "degree,pagerank") -> List[dict]:
+    app = await start_app(api_url, neo4j_round_trip)
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            first = await client.get(f"/api/explore/{titles[0]}", params={"depth": depth})
+            first.raise_for_status()
+            senders = make_scenarios(titles, depth, first.json(), metrics)
+            for scenario in scenarios:
+                await run_level(client, scenario, senders[scenario], 1, warmup) # Not measured
+                for level in concurrency:
+                    results.append(await run_level(client, scenario, senders[scenario], level, requests))
+    finally:
+        await stop_app()
+    return results
+
+
+# --- Reporting ---
+
+def print_results(results: List[dict]):
+    print(f"{'scenario':<10} {'conc':>5} {'reqs':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} "
+          f"{'RSS MB':>7} {'proc peak MB':>13}")
+    for r in results:
+        rss = f"{r['rss_mb']:>7.0f}" if r["rss_mb"] is not None else f"{'-':>7}"
+        print(f"{r['scenario']:<10} {r['concurrency']:>5} {r['requests']:>6} {r['errors']:>4} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rps']:>8.1f} {rss} {r['process_peak_rss_mb']:>13.0f}")
+    print("RSS MB: highest sampled during the level; proc peak MB: since the process started, not per level")
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """
+    Print the change against the baseline and return the regressions: a p95 more than
+    `tolerance` slower, or throughput more than `tolerance` lower, than the same run in the baseline.
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    print(f"\n{'scenario':<10} {'conc':>5} {'p95 ms':>8} {'was':>8} {'change':>8} {'req/s':>8} {'was':>8} {'change':>8}")
+    for r in results:
+        base = previous.get((r["scenario"], r["concurrency"]))
+        if base is None:
+            continue
+        p95_change = r["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = r["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        flag = ""
+        if p95_change > tolerance or rps_change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(f"{r['scenario']} x{r['concurrency']}: p95 {p95_change:+.0%}, req/s {rps_change:+.0%}")
+        print(f"{r['scenario']:<10} {r['concurrency']:>5} {r['p95_ms']:>8.1f} {base['p95_ms']:>8.1f} {p95_change:>+8.0%} "
+              f"{r['rps']:>8.1f} {base['rps']:>8.1f} {rps_change:>+8.0%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", nargs="+", metavar="TITLE", help="explore these articles on Wikipedia and save the responses to --fixtures")
+    parser.add_argument("--fixtures", type=Path, help="recorded responses to replay (the synthetic stub graph when omitted)")
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--link-source", choices=LINK_SOURCES, default=LINK_SOURCE_HTML, help="when recording")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every upstream response")
+    parser.add_argument("--neo4j-round-trip", type=float, default=0.0005, help="simulated seconds per Neo4j statement")
+    parser.add_argument("--cold", action="store_true", help="disable the in-memory article cache and link index, so every explore goes upstream")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--metrics", default="degree,pagerank", help="for the analysis scenario")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95/throughput change against the baseline")
+    args = parser.parse_args()
+
+    if os.environ.get("PYTHONHASHSEED") is None:
+        # Links extracted from HTML are a set: with randomized hashing each run would
+        # explore different neighbours, missing the fixtures and the baseline's workload
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable, "-m", "benchmarks.bench_pipeline", *sys.argv[1:]])
+
+    if args.record:
+        if not args.fixtures:
+            parser.error("--record needs --fixtures to know where to save the responses")
+        max_neighbors = int(os.getenv("MAX_NEIGHBORS", str(DEFAULT_MAX_NEIGHBORS)))
+        asyncio.run(record(args.record, args.depth, args.link_source, max_neighbors, args.fixtures,
+                           api_url=os.getenv("WIKIPEDIA_API_URL", WIKIPEDIA_API_URL)))
+
+    if args.cold:
+        os.environ["ARTICLE_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["LINK_INDEX_MAX_BYTES"] = "0"
+    if args.fixtures:
+        fixture = load_fixture(args.fixtures)
+        # The replay must make the same requests as the recording; routers read these at import
+        os.environ["LINK_SOURCE"] = fixture["link_source"]
+        os.environ["MAX_NEIGHBORS"] = str(fixture["max_neighbors"])
+        server = ReplayStubServer(fixture["responses"], latency=args.latency).start()
+        titles, depth = fixture["titles"], fixture["depth"]
+    else:
+        server = WikipediaStubServer(latency=args.latency, links_per_article=DEFAULT_MAX_NEIGHBORS).start()
+        titles, depth = [f"Topic {i}" for i in range(1, 51)], args.depth
+
+    try:
+        results = asyncio.run(run_benchmark(server.api_url, titles, depth, args.scenarios, args.concurrency, args.requests,
+                                            args.warmup, args.neo4j_round_trip, args.metrics))
+    finally:
+        server.stop()
+
+    print(f"\nupstream: {'replayed ' + str(args.fixtures) if args.fixtures else 'synthetic stub'}, latency {args.latency}s, "
+          f"{server.request_count} requests")
+    if isinstance(server, ReplayStubServer) and server.misses:
+        print(f"warning: {server.misses} upstream requests were not in the fixtures; record them again")
+    print_results(results)
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps({"latency": args.latency, "fixtures": str(args.fixtures or ""), "results": results}, indent=2))
+        print(f"\nbaseline saved to {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("latency") != args.latency or baseline.get("fixtures") != str(args.fixtures or ""):
+            print("\nwarning: the baseline was recorded with a different latency or fixtures")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions))
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,32 @@
+import os
 from neo4j import Driver
-from fastapi import Depends
+from fastapi import Depends, Request
 from typing import Optional
+from services.article_cache import ArticleCache
+from services.async_wikipedia_client import WikipediaConnectionPool
+from services.analysis_executor import AnalysisExecutor
+from services.analysis_session import AnalysisSessionStore
+from services.stored_graph_cache import StoredGraphCache
+from services.single_flight import SingleFlight
+from services.response_cache import ResponseCache
+from services.upstream_guard import UpstreamGuard
+from services.metrics import MetricsRegistry
+from services.crawl_jobs import CrawlJobManager
+from services.link_index import LinkIndex
+from services.graph_encoding import GraphEncoder, DEFAULT_COMPRESS_MIN_BYTES
 
 _global_neo4j_driver: Optional[Driver] = None # Global variable for Neo4j driver
+_global_article_cache: Optional[ArticleCache] = None # Global variable for the shared Wikipedia cache
+_global_wikipedia_pool: Optional[WikipediaConnectionPool] = None # Global variable for the Wikipedia HTTP pool
+_global_analysis_sessions: Optional[AnalysisSessionStore] = None # Global LRU/TTL store of incremental analysis sessions
+_global_analysis_executor: Optional[AnalysisExecutor] = None # Global process pool for graph analysis
+_global_stored_graph_cache: Optional[StoredGraphCache] = None # Global read-through tier over the stored graph
+_global_single_flight: Optional[SingleFlight] = None # Global in-flight deduplication of Wikipedia fetches
+_global_response_cache: Optional[ResponseCache] = None # Global persistent cache of Wikipedia API responses
+_global_upstream_guard: Optional[UpstreamGuard] = None # Global rate limiter, retry policy and circuit breaker for Wikipedia
+_global_metrics: Optional[MetricsRegistry] = None # Global Prometheus metrics registry
+_global_crawl_jobs: Optional[CrawlJobManager] = None # Global background crawl job workers
+_global_link_index: Optional[LinkIndex] = None # Global in-memory index of crawled links
 
 def set_global_neo4j_driver(driver: Driver):
     """
@@ -25,4 +49,257 @@ def get_neo4j_driver() -> Driver:
     global _global_neo4j_driver
     if _global_neo4j_driver is None:
         raise RuntimeError("Neo4j driver not initialized.")
-    yield _global_neo4j_driver
\ No newline at end of file
+    yield _global_neo4j_driver
+
+def set_global_article_cache(cache: ArticleCache):
+    """
+    Sets the global, process-wide Wikipedia article cache.
+    """
+    global _global_article_cache
+    _global_article_cache = cache
+
+def get_global_article_cache() -> Optional[ArticleCache]:
+    """
+    Returns the global Wikipedia article cache.
+    """
+    global _global_article_cache
+    return _global_article_cache
+
+def get_article_cache() -> ArticleCache:
+    """
+    FastAPI dependency that yields the global article cache instance.
+    """
+    global _global_article_cache
+    if _global_article_cache is None:
+        raise RuntimeError("Article cache not initialized.")
+    yield _global_article_cache
+
+def set_global_wikipedia_pool(pool: WikipediaConnectionPool):
+    """
+    Sets the global Wikipedia HTTP connection pool.
+    """
+    global _global_wikipedia_pool
+    _global_wikipedia_pool = pool
+
+def get_global_wikipedia_pool() -> Optional[WikipediaConnectionPool]:
+    """
+    Returns the global Wikipedia HTTP connection pool.
+    """
+    global _global_wikipedia_pool
+    return _global_wikipedia_pool
+
+def get_wikipedia_pool() -> WikipediaConnectionPool:
+    """
+    FastAPI dependency that yields the global Wikipedia HTTP connection pool.
+    """
+    global _global_wikipedia_pool
+    if _global_wikipedia_pool is None:
+        raise RuntimeError("Wikipedia connection pool not initialized.")
+    yield _global_wikipedia_pool
+
+def set_global_analysis_sessions(sessions: AnalysisSessionStore):
+    """
+    Sets the global store of incremental analysis sessions.
+    """
+    global _global_analysis_sessions
+    _global_analysis_sessions = sessions
+
+def get_global_analysis_sessions() -> Optional[AnalysisSessionStore]:
+    """
+    Returns the global store of incremental analysis sessions.
+    """
+    global _global_analysis_sessions
+    return _global_analysis_sessions
+
+def get_analysis_sessions() -> AnalysisSessionStore:
+    """
+    FastAPI dependency that yields the global analysis session store.
+    """
+    global _global_analysis_sessions
+    if _global_analysis_sessions is None:
+        raise RuntimeError("Analysis session store not initialized.")
+    yield _global_analysis_sessions
+
+def set_global_analysis_executor(executor: Optional[AnalysisExecutor]):
+    """
+    Sets the global graph analysis executor.
+    """
+    global _global_analysis_executor
+    _global_analysis_executor = executor
+
+def get_global_analysis_executor() -> Optional[AnalysisExecutor]:
+    """
+    Returns the global graph analysis executor.
+    """
+    global _global_analysis_executor
+    return _global_analysis_executor
+
+def get_analysis_executor() -> Optional[AnalysisExecutor]:
+    """
+    FastAPI dependency that yields the global analysis executor, or None
+    (analysis runs inline) when it was not started.
+    """
+    global _global_analysis_executor
+    yield _global_analysis_executor
+
+def set_global_stored_graph_cache(stored_graph: Optional[StoredGraphCache]):
+    """
+    Sets the global read-through tier over the articles stored in Neo4j.
+    """
+    global _global_stored_graph_cache
+    _global_stored_graph_cache = stored_graph
+
+def get_global_stored_graph_cache() -> Optional[StoredGraphCache]:
+    """
+    Returns the global stored graph cache.
+    """
+    global _global_stored_graph_cache
+    return _global_stored_graph_cache
+
+def get_stored_graph_cache() -> Optional[StoredGraphCache]:
+    """
+    FastAPI dependency that yields the global stored graph cache, or None
+    (explores always fetch from Wikipedia) when it was not started.
+    """
+    global _global_stored_graph_cache
+    yield _global_stored_graph_cache
+
+def set_global_single_flight(single_flight: SingleFlight):
+    """
+    Sets the global in-flight deduplication table for Wikipedia fetches.
+    """
+    global _global_single_flight
+    _global_single_flight = single_flight
+
+def get_global_single_flight() -> Optional[SingleFlight]:
+    """
+    Returns the global single-flight table.
+    """
+    global _global_single_flight
+    return _global_single_flight
+
+def get_single_flight() -> SingleFlight:
+    """
+    FastAPI dependency that yields the global single-flight table.
+    """
+    global _global_single_flight
+    if _global_single_flight is None:
+        raise RuntimeError("Single-flight table not initialized.")
+    yield _global_single_flight
+
+def set_global_response_cache(response_cache: Optional[ResponseCache]):
+    """
+    Sets the global on-disk cache of Wikipedia API responses.
+    """
+    global _global_response_cache
+    _global_response_cache = response_cache
+
+def get_global_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the global response cache.
+    """
+    global _global_response_cache
+    return _global_response_cache
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    FastAPI dependency that yields the global response cache, or None
+    (every call goes to Wikipedia) when it is disabled.
+    """
+    global _global_response_cache
+    yield _global_response_cache
+
+def set_global_upstream_guard(upstream_guard: Optional[UpstreamGuard]):
+    """
+    Sets the global rate limiter, retry policy and circuit breaker for Wikipedia calls.
+    """
+    global _global_upstream_guard
+    _global_upstream_guard = upstream_guard
+
+def get_global_upstream_guard() -> Optional[UpstreamGuard]:
+    """
+    Returns the global upstream guard.
+    """
+    global _global_upstream_guard
+    return _global_upstream_guard
+
+def get_upstream_guard() -> Optional[UpstreamGuard]:
+    """
+    FastAPI dependency that yields the global upstream guard, or None
+    (one unpaced attempt per call) when it was not started.
+    """
+    global _global_upstream_guard
+    yield _global_upstream_guard
+
+def set_global_metrics(registry: Optional[MetricsRegistry]):
+    """
+    Sets the global metrics registry.
+    """
+    global _global_metrics
+    _global_metrics = registry
+
+def get_global_metrics() -> Optional[MetricsRegistry]:
+    """
+    Returns the global metrics registry.
+    """
+    global _global_metrics
+    return _global_metrics
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """
+    FastAPI dependency that yields the global metrics registry, or None when metrics are disabled.
+    """
+    global _global_metrics
+    yield _global_metrics
+
+def set_global_crawl_jobs(crawl_jobs: Optional[CrawlJobManager]):
+    """
+    Sets the global background crawl job manager.
+    """
+    global _global_crawl_jobs
+    _global_crawl_jobs = crawl_jobs
+
+def get_global_crawl_jobs() -> Optional[CrawlJobManager]:
+    """
+    Returns the global crawl job manager.
+    """
+    global _global_crawl_jobs
+    return _global_crawl_jobs
+
+def get_crawl_jobs() -> Optional[CrawlJobManager]:
+    """
+    FastAPI dependency that yields the global crawl job manager, or None when crawl jobs are disabled.
+    """
+    global _global_crawl_jobs
+    yield _global_crawl_jobs
+
+def set_global_link_index(link_index: Optional[LinkIndex]):
+    """
+    Sets the global in-memory index of the links crawled so far.
+    """
+    global _global_link_index
+    _global_link_index = link_index
+
+def get_global_link_index() -> Optional[LinkIndex]:
+    """
+    Returns the global link index.
+    """
+    global _global_link_index
+    return _global_link_index
+
+def get_link_index() -> Optional[LinkIndex]:
+    """
+    FastAPI dependency that yields the global link index, or None when it is disabled.
+    """
+    global _global_link_index
+    yield _global_link_index
+
+# Compact graph responses at least this big are compressed (br or gzip) when the client accepts it
+COMPACT_COMPRESS_MIN_BYTES = int(os.getenv("COMPACT_COMPRESS_MIN_BYTES", str(DEFAULT_COMPRESS_MIN_BYTES)))
+
+def get_graph_encoder(request: Request, format: Optional[str] = None, summary_chars: Optional[int] = None) -> Optional[GraphEncoder]:
+    """
+    FastAPI dependency for the response encoding of graph payloads; None keeps the default JSON response.
+    """
+    return GraphEncoder.negotiate(request, format=format, summary_chars=summary_chars,
+                                  compress_min_bytes=COMPACT_COMPRESS_MIN_BYTES)
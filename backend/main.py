@@ -1,8 +1,26 @@
 from fastapi import FastAPI, Depends
 from routers.wikipedia import router as wikipedia_router
 from routers.explorations import router as explorations_router
+from routers.analysis import router as analysis_router
+from routers.graph import router as graph_router
+from routers.metrics import router as metrics_router
+from routers.crawl_jobs import router as crawl_jobs_router
+from services.metrics import MetricsMiddleware
 from dotenv import load_dotenv
-from app_lifespan import startup_db_client, shutdown_db_client # Import from app_lifespan.py
+from app_lifespan import ( # Import from app_lifespan.py
+    startup_db_client, shutdown_db_client,
+    startup_article_cache, shutdown_article_cache,
+    startup_wikipedia_pool, shutdown_wikipedia_pool,
+    startup_analysis_sessions, shutdown_analysis_sessions,
+    startup_analysis_executor, shutdown_analysis_executor,
+    startup_stored_graph_cache, shutdown_stored_graph_cache,
+    startup_single_flight, shutdown_single_flight,
+    startup_link_index, shutdown_link_index,
+    startup_response_cache, shutdown_response_cache,
+    startup_upstream_guard, shutdown_upstream_guard,
+    startup_metrics, shutdown_metrics,
+    startup_crawl_jobs, shutdown_crawl_jobs,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -23,18 +41,45 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware) # A plain pass-through until startup_metrics enables it
 
 @app.on_event("startup")
 async def _startup_event(): # Renamed to avoid conflict with imported function
+    await startup_metrics()
+    await startup_article_cache()
+    await startup_wikipedia_pool()
+    await startup_single_flight()
+    await startup_link_index()
+    await startup_response_cache()
+    await startup_upstream_guard()
+    await startup_analysis_sessions()
+    await startup_analysis_executor()
     await startup_db_client()
+    await startup_stored_graph_cache()
+    await startup_crawl_jobs()
 
 @app.on_event("shutdown")
 async def _shutdown_event(): # Renamed to avoid conflict with imported function
+    await shutdown_crawl_jobs()
+    await shutdown_stored_graph_cache()
     await shutdown_db_client()
+    await shutdown_wikipedia_pool()
+    await shutdown_single_flight()
+    await shutdown_link_index()
+    await shutdown_response_cache()
+    await shutdown_upstream_guard()
+    await shutdown_analysis_executor()
+    await shutdown_analysis_sessions()
+    await shutdown_article_cache()
+    await shutdown_metrics()
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
 app.include_router(wikipedia_router)
-app.include_router(explorations_router)
\ No newline at end of file
+app.include_router(explorations_router)
+app.include_router(analysis_router)
+app.include_router(graph_router)
+app.include_router(metrics_router)
+app.include_router(crawl_jobs_router)
\ No newline at end of file
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Dict, List
+from models.exploration import GraphEdge
+
+class AnalysisDelta(BaseModel):
+    nodes: List[str] = [] # Node ids
+    edges: List[GraphEdge] = []
+
+class AnalysisSessionCreate(AnalysisDelta):
+    metrics: str = "degree" # Comma-separated strategy names, as in /api/explore
+
+class AnalysisSessionResponse(BaseModel):
+    session_id: str
+    node_count: int
+    edge_count: int
+    scores: Dict[str, Dict[str, float]] # Node id -> output key -> score
+
+class AnalysisUpdate(BaseModel):
+    node_count: int
+    edge_count: int
+    changed: Dict[str, Dict[str, float]] # Only the scores that changed
+    rescaled: Dict[str, float] # Output key -> factor for the unchanged degree scores
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class CrawlJobCreate(BaseModel):
+    article_title: str
+    depth: int = 1
+    metrics: str = "degree" # Comma-separated strategy names, as in /api/explore
+    max_neighbors: Optional[int] = None # Defaults to MAX_NEIGHBORS
+    name: Optional[str] = None # Name of the saved exploration; defaults to the article title
+    save: bool = True # Save the graph as an exploration when the job succeeds
+
+class CrawlJob(BaseModel):
+    id: str
+    article_title: str
+    depth: int
+    metrics: str
+    max_neighbors: int
+    name: Optional[str] = None
+    save: bool
+    status: str # queued, running, succeeded, failed or cancelled
+    node_count: int
+    edge_count: int
+    truncated: bool
+    error: Optional[str] = None
+    exploration_id: Optional[str] = None # Set once the result was saved
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+class CrawlJobPage(BaseModel):
+    items: List[CrawlJob]
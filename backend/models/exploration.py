@@ -24,3 +24,35 @@ class ExplorationResponse(BaseModel):
     name: str
     nodes: List[GraphNode]
     edges: List[GraphEdge]
+
+class ExplorationSummary(BaseModel):
+    id: str
+    name: str
+    node_count: Optional[int] = None
+    edge_count: Optional[int] = None
+    created_at: Optional[str] = None
+
+class ExplorationPage(BaseModel):
+    items: List[ExplorationSummary]
+    next_cursor: Optional[str] = None # Pass back as ?cursor= to get the next page
+
+class ExplorationPatch(BaseModel):
+    name: Optional[str] = None
+    # Either the changes themselves...
+    add_nodes: List[GraphNode] = [] # New nodes, or existing ones with new values
+    remove_nodes: List[str] = [] # Node ids
+    add_edges: List[GraphEdge] = []
+    remove_edges: List[GraphEdge] = []
+    # ...or the whole edited graph, diffed against the stored one on the server
+    nodes: Optional[List[GraphNode]] = None
+    edges: Optional[List[GraphEdge]] = None
+
+class ExplorationPatchResult(BaseModel):
+    id: str
+    name: str
+    node_count: int
+    edge_count: int
+    upserted_nodes: int
+    removed_nodes: int
+    added_edges: int
+    removed_edges: int
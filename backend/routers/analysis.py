@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from models.analysis import AnalysisDelta, AnalysisSessionCreate, AnalysisSessionResponse, AnalysisUpdate
+from services.analysis_session import AnalysisSession, AnalysisSessionStore
+from services.graph_strategies import strategies_from_metrics
+from services.analysis_executor import AnalysisExecutor
+from dependencies import get_analysis_sessions, get_analysis_executor
+from typing import Optional
+
+router = APIRouter()
+
+def _edge_pairs(delta: AnalysisDelta):
+    return [(edge.from_node, edge.to_node) for edge in delta.edges]
+
+def _get_session(session_id: str, sessions: AnalysisSessionStore) -> AnalysisSession:
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Analysis session not found or expired.")
+    return session
+
+@router.post("/api/analysis/sessions", response_model=AnalysisSessionResponse, status_code=status.HTTP_201_CREATED)
+def create_analysis_session(body: AnalysisSessionCreate, sessions: AnalysisSessionStore = Depends(get_analysis_sessions)):
+    """
+    Start an incremental analysis of a graph and return every score of its initial state.
+    """
+    try:
+        strategies = strategies_from_metrics(body.metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session = AnalysisSession(strategies)
+    session.add(body.nodes, _edge_pairs(body))
+    sessions.add(session)
+    return AnalysisSessionResponse(session_id=session.id, node_count=session.node_count,
+                                   edge_count=session.edge_count, scores=session.scores())
+
+@router.post("/api/analysis/sessions/{session_id}/delta", response_model=AnalysisUpdate)
+def add_to_analysis_session(session_id: str, delta: AnalysisDelta, sessions: AnalysisSessionStore = Depends(get_analysis_sessions)):
+    """
+    Add nodes and edges to a session's graph. Only the scores that changed are returned;
+    unchanged degree scores are scaled by "rescaled" when the node count grew.
+    """
+    session = _get_session(session_id, sessions)
+    return session.add(delta.nodes, _edge_pairs(delta)) # _get_session restarted the idle TTL
+
+@router.get("/api/analysis/sessions/{session_id}", response_model=AnalysisSessionResponse)
+def get_analysis_session(session_id: str, sessions: AnalysisSessionStore = Depends(get_analysis_sessions)):
+    """
+    Every current score of a session, e.g. to resynchronize a client.
+    """
+    session = _get_session(session_id, sessions)
+    return AnalysisSessionResponse(session_id=session.id, node_count=session.node_count,
+                                   edge_count=session.edge_count, scores=session.scores())
+
+@router.delete("/api/analysis/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_analysis_session(session_id: str, sessions: AnalysisSessionStore = Depends(get_analysis_sessions)):
+    """
+    Drop a session before its TTL runs out.
+    """
+    _get_session(session_id, sessions)
+    sessions.delete(session_id)
+
+@router.get("/api/analysis/executor/stats")
+def get_analysis_executor_stats(executor: Optional[AnalysisExecutor] = Depends(get_analysis_executor)):
+    """
+    Queue depth and job counters of the analysis process pool.
+    """
+    if executor is None:
+        return {"enabled": False}
+    return {"enabled": True, **executor.stats()}
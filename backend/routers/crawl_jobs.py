@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from models.crawl_job import CrawlJob, CrawlJobCreate, CrawlJobPage
+from services.crawl_jobs import CrawlJobManager, FINISHED_STATUSES
+from services.graph_encoding import GraphEncoder
+from services.graph_strategies import strategies_from_metrics
+from routers.wikipedia import MAX_NEIGHBORS
+from dependencies import get_crawl_jobs, get_graph_encoder
+from typing import Optional
+import os
+
+router = APIRouter()
+
+CRAWL_JOB_MAX_DEPTH = int(os.getenv("CRAWL_JOB_MAX_DEPTH", "5"))
+CRAWL_JOB_MAX_NEIGHBORS = int(os.getenv("CRAWL_JOB_MAX_NEIGHBORS", "100"))
+
+def _require(crawl_jobs: Optional[CrawlJobManager]) -> CrawlJobManager:
+    if crawl_jobs is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Crawl jobs are disabled (CRAWL_JOB_WORKERS).")
+    return crawl_jobs
+
+def _not_found():
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Crawl job not found")
+
+@router.post("/api/crawl-jobs", response_model=CrawlJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_crawl_job(body: CrawlJobCreate, crawl_jobs: Optional[CrawlJobManager] = Depends(get_crawl_jobs)):
+    """
+    Queue an explore that runs in the background, with a larger budget than /api/explore.
+    Poll the job for progress and its result; when it succeeds the graph is saved as an exploration.
+    """
+    crawl_jobs = _require(crawl_jobs)
+    if body.depth < 1 or body.depth > CRAWL_JOB_MAX_DEPTH:
+        raise HTTPException(status_code=400, detail=f"depth must be between 1 and {CRAWL_JOB_MAX_DEPTH}.")
+    max_neighbors = body.max_neighbors if body.max_neighbors is not None else MAX_NEIGHBORS
+    if max_neighbors < 1 or max_neighbors > CRAWL_JOB_MAX_NEIGHBORS:
+        raise HTTPException(status_code=400, detail=f"max_neighbors must be between 1 and {CRAWL_JOB_MAX_NEIGHBORS}.")
+    try:
+        strategies_from_metrics(body.metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await crawl_jobs.submit({**body.dict(), "max_neighbors": max_neighbors})
+
+@router.get("/api/crawl-jobs", response_model=CrawlJobPage)
+async def list_crawl_jobs(limit: int = Query(20, ge=1, le=100), crawl_jobs: Optional[CrawlJobManager] = Depends(get_crawl_jobs)):
+    """
+    The most recent crawl jobs, newest first.
+    """
+    return {"items": await _require(crawl_jobs).list(limit)}
+
+@router.get("/api/crawl-jobs/{job_id}", response_model=CrawlJob)
+async def get_crawl_job(job_id: str, crawl_jobs: Optional[CrawlJobManager] = Depends(get_crawl_jobs)):
+    """
+    Status and progress (nodes and edges found so far) of a crawl job.
+    """
+    job = await _require(crawl_jobs).get(job_id)
+    if job is None:
+        raise _not_found()
+    return job
+
+@router.get("/api/crawl-jobs/{job_id}/result")
+async def get_crawl_job_result(
+    job_id: str,
+    crawl_jobs: Optional[CrawlJobManager] = Depends(get_crawl_jobs),
+    encoder: Optional[GraphEncoder] = Depends(get_graph_encoder)
+):
+    """
+    The graph of a crawl job: what was found so far while it runs ("finished": false), the
+    final graph with its scores once it succeeded. Supports the compact formats of /api/explore.
+    """
+    crawl_jobs = _require(crawl_jobs)
+    job = await crawl_jobs.get(job_id)
+    if job is None:
+        raise _not_found()
+    graph = await crawl_jobs.result(job_id)
+    graph = {"id": job_id, "status": job["status"], "finished": job["status"] in FINISHED_STATUSES, **graph}
+    if encoder is not None:
+        return encoder.response(graph)
+    return graph
+
+@router.post("/api/crawl-jobs/{job_id}/cancel", response_model=CrawlJob)
+async def cancel_crawl_job(job_id: str, crawl_jobs: Optional[CrawlJobManager] = Depends(get_crawl_jobs)):
+    """
+    Stop a queued or running crawl job. Its partial graph stays available and is not saved.
+    """
+    crawl_jobs = _require(crawl_jobs)
+    job = await crawl_jobs.get(job_id)
+    if job is None:
+        raise _not_found()
+    if job["status"] in FINISHED_STATUSES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Crawl job already {job['status']}.")
+    return await crawl_jobs.cancel(job_id)
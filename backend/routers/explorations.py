@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.exploration import ExplorationCreate, ExplorationResponse, GraphNode, GraphEdge
-from services.neo4j_repository import Neo4jRepository
-from typing import List
-from dependencies import get_neo4j_driver # Import the dependency function from dependencies.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from models.exploration import ExplorationCreate, ExplorationResponse, ExplorationPage, ExplorationPatch, ExplorationPatchResult, GraphNode, GraphEdge
+from services.neo4j_repository import Neo4jRepository, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.exploration_transfer import NdjsonImporter, export_ndjson, NDJSON_MEDIA_TYPE
+from services.graph_encoding import GraphEncoder
+from typing import List, Optional
+from dependencies import get_neo4j_driver, get_graph_encoder # Import the dependency functions from dependencies.py
 from neo4j import Driver # Import Driver for type hinting
 
 router = APIRouter()
@@ -29,15 +33,108 @@ def create_exploration(
     saved_exploration = repo.save_exploration(exploration.name, nodes_data, edges_data)
     return ExplorationResponse(**saved_exploration)
 
-@router.get("/api/explorations", response_model=List[ExplorationResponse])
+@router.get("/api/explorations", response_model=ExplorationPage)
 def list_explorations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     repo: Neo4jRepository = Depends(get_neo4j_repository)
 ):
     """
-    Lista las exploraciones guardadas.
+    Lista las exploraciones guardadas (solo metadatos), de la más reciente a la más antigua.
+    Para obtener la página siguiente, pasa `next_cursor` como `cursor`.
     """
-    explorations = repo.get_all_explorations()
-    return [ExplorationResponse(**exp) for exp in explorations]
+    try:
+        return repo.list_explorations(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/api/explorations/export")
+def export_explorations(
+    repo: Neo4jRepository = Depends(get_neo4j_repository)
+):
+    """
+    Exporta todas las exploraciones como NDJSON: una línea por exploración, nodo y arista.
+    Los registros se leen de Neo4j y se envían uno a uno, sin cargar todo en memoria.
+    """
+    return StreamingResponse(
+        export_ndjson(repo),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="explorations.ndjson"'},
+    )
+
+@router.post("/api/explorations/import")
+async def import_explorations(
+    request: Request,
+    repo: Neo4jRepository = Depends(get_neo4j_repository)
+):
+    """
+    Importa un NDJSON generado por la exportación, escribiendo por lotes a medida que llegan las líneas.
+    Las exploraciones conservan su id: reimportar una copia la sobrescribe en lugar de duplicarla.
+    """
+    importer = NdjsonImporter(repo)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(importer.feed, chunk)
+        return await run_in_threadpool(importer.finish)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/api/explorations/{exploration_id}", response_model=ExplorationResponse)
+def get_exploration(
+    exploration_id: str,
+    include_summaries: bool = True,
+    repo: Neo4jRepository = Depends(get_neo4j_repository),
+    encoder: Optional[GraphEncoder] = Depends(get_graph_encoder)
+):
+    """
+    Devuelve el grafo completo de una exploración guardada, opcionalmente sin resúmenes.
+    Con `format=compact` o `format=msgpack` (o la cabecera Accept equivalente) usa el formato compacto.
+    """
+    if encoder is not None and encoder.summary_chars == 0:
+        include_summaries = False # Left out of the compact encoding anyway
+    exploration = repo.get_exploration(exploration_id, include_summaries=include_summaries)
+    if exploration is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exploration not found")
+    if encoder is not None:
+        return encoder.response(exploration)
+    return ExplorationResponse(**exploration)
+
+@router.patch("/api/explorations/{exploration_id}", response_model=ExplorationPatchResult)
+def update_exploration(
+    exploration_id: str,
+    patch: ExplorationPatch,
+    repo: Neo4jRepository = Depends(get_neo4j_repository)
+):
+    """
+    Modifica una exploración guardada escribiendo solo los cambios, en una única transacción.
+    Acepta los nodos y aristas añadidos y eliminados, o el grafo completo editado (`nodes` y `edges`),
+    en cuyo caso el servidor calcula la diferencia con el grafo guardado.
+    """
+    delta = {
+        "add_nodes": [node.dict(by_alias=True) for node in patch.add_nodes],
+        "remove_nodes": patch.remove_nodes,
+        "add_edges": [edge.dict(by_alias=True) for edge in patch.add_edges],
+        "remove_edges": [edge.dict(by_alias=True) for edge in patch.remove_edges],
+    }
+    try:
+        if patch.nodes is not None or patch.edges is not None:
+            if any(delta.values()):
+                raise ValueError("Send either the changes or the whole graph (nodes and edges), not both.")
+            if patch.nodes is None or patch.edges is None:
+                raise ValueError("The whole graph needs both nodes and edges.")
+            result = repo.replace_exploration_graph(
+                exploration_id,
+                [node.dict(by_alias=True) for node in patch.nodes],
+                [edge.dict(by_alias=True) for edge in patch.edges],
+                name=patch.name,
+            )
+        else:
+            result = repo.update_exploration(exploration_id, name=patch.name, **delta)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exploration not found")
+    return result
 
 @router.delete("/api/explorations/{exploration_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_exploration(
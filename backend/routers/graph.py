@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from itertools import chain
+from typing import Any, Dict, Iterator, Literal
+from services.neo4j_repository import Neo4jRepository, TOP_NODE_METRICS
+from services.exploration_transfer import encode_ndjson, NDJSON_MEDIA_TYPE
+from routers.explorations import get_neo4j_repository
+import os
+
+router = APIRouter()
+
+# Hop and result limits for queries over the accumulated graph
+GRAPH_MAX_PATH_HOPS = int(os.getenv("GRAPH_MAX_PATH_HOPS", "6"))
+GRAPH_MAX_NEIGHBOURHOOD_HOPS = int(os.getenv("GRAPH_MAX_NEIGHBOURHOOD_HOPS", "3"))
+GRAPH_MAX_RESULTS = int(os.getenv("GRAPH_MAX_RESULTS", "1000"))
+
+def _ndjson_response(records: Iterator[Dict[str, Any]], not_found_detail: str) -> StreamingResponse:
+    """
+    Stream records as NDJSON. The first record is read before answering, so an
+    empty result can still be reported as a 404.
+    """
+    first = next(records, None)
+    if first is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+    return StreamingResponse(encode_ndjson(chain([first], records)), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/api/graph/shortest-path")
+def get_shortest_path(
+    source: str,
+    target: str,
+    max_hops: int = Query(GRAPH_MAX_PATH_HOPS, ge=1, le=GRAPH_MAX_PATH_HOPS),
+    repo: Neo4jRepository = Depends(get_neo4j_repository)
+):
+    """
+    Camino más corto de enlaces entre dos artículos del grafo acumulado de todas las exploraciones.
+    Devuelve NDJSON, un nodo por línea en el orden del camino (`position`).
+    """
+    try:
+        records = repo.shortest_path(source, target, max_hops)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _ndjson_response(records, f"No path of at most {max_hops} links from {source!r} to {target!r}.")
+
+@router.get("/api/graph/neighbourhood")
+def get_neighbourhood(
+    id: str,
+    hops: int = Query(1, ge=1, le=GRAPH_MAX_NEIGHBOURHOOD_HOPS),
+    direction: Literal["out", "in", "both"] = "both",
+    limit: int = Query(100, ge=1, le=GRAPH_MAX_RESULTS),
+    repo: Neo4jRepository = Depends(get_neo4j_repository)
+):
+    """
+    Vecindario de un artículo hasta `hops` enlaces, en anchura. Devuelve NDJSON: primero
+    el propio nodo (`hops` 0) y después como máximo `limit` vecinos con su distancia.
+    """
+    return _ndjson_response(repo.neighbourhood(id, hops, limit, direction), f"Node {id!r} not found.")
+
+@router.get("/api/graph/top")
+def get_top_nodes(
+    metric: Literal[tuple(TOP_NODE_METRICS)] = "degree_centrality",
+    limit: int = Query(10, ge=1, le=GRAPH_MAX_RESULTS),
+    repo: Neo4jRepository = Depends(get_neo4j_repository)
+):
+    """
+    Los `limit` nodos con mayor `metric` entre todas las exploraciones guardadas, como NDJSON.
+    """
+    return _ndjson_response(repo.top_nodes(metric, limit), "No stored nodes.")
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
+from typing import Optional
+from services.metrics import MetricsRegistry, PROMETHEUS_MEDIA_TYPE
+from dependencies import (
+    get_metrics, get_global_article_cache, get_global_response_cache, get_global_stored_graph_cache,
+    get_global_single_flight, get_global_upstream_guard, get_global_analysis_executor, get_global_crawl_jobs,
+    get_global_link_index, get_global_analysis_sessions,
+)
+
+router = APIRouter()
+
+def _component_stats() -> dict:
+    """
+    The stats of every app-scoped cache and pool that was started, keyed by the metric name prefix.
+    """
+    components = {
+        "article_cache": get_global_article_cache(),
+        "response_cache": get_global_response_cache(),
+        "stored_graph": get_global_stored_graph_cache(),
+        "single_flight": get_global_single_flight(),
+        "upstream": get_global_upstream_guard(),
+        "analysis_executor": get_global_analysis_executor(),
+        "analysis_sessions": get_global_analysis_sessions(),
+        "crawl_jobs": get_global_crawl_jobs(),
+        "link_index": get_global_link_index(),
+    }
+    return {name: component.stats() for name, component in components.items() if component is not None}
+
+@router.get("/metrics")
+def get_prometheus_metrics(registry: Optional[MetricsRegistry] = Depends(get_metrics)):
+    """
+    Prometheus text exposition of the request, stage, upstream and Neo4j histograms,
+    plus the cache hit ratios and counters as gauges.
+    """
+    if registry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled (METRICS_ENABLED).")
+    return Response(content=registry.render(_component_stats()), media_type=PROMETHEUS_MEDIA_TYPE)
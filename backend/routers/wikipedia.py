@@ -1,62 +1,180 @@
 from fastapi import APIRouter, Depends, HTTPException
-from services.wikipedia_client import WikipediaClient
+from fastapi.responses import StreamingResponse
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
 from services.graph_analyzer import GraphAnalyzer
-from services.graph_strategies import DegreeCentralityStrategy
+from services.graph_strategies import strategies_from_metrics
+from services.article_cache import ArticleCache
+from services.crawl_engine import CrawlEngine, CrawlBudget, DEFAULT_MAX_NODES, DEFAULT_MAX_CALLS, DEFAULT_TIME_BUDGET, LINK_SOURCE_HTML
+from services.analysis_executor import AnalysisExecutor
+from services.stored_graph_cache import StoredGraphCache
+from services.link_index import LinkIndex
+from services.single_flight import SingleFlight
+from services.response_cache import ResponseCache
+from services.upstream_guard import UpstreamGuard
+from services.graph_encoding import GraphEncoder
+from services.exploration_transfer import NDJSON_MEDIA_TYPE
+from dependencies import (
+    get_article_cache, get_wikipedia_pool, get_analysis_executor, get_stored_graph_cache, get_single_flight, get_response_cache,
+    get_upstream_guard, get_link_index, get_graph_encoder,
+)
+from typing import AsyncIterator, Optional
+import json
 import os # Import os
 
 router = APIRouter()
 
 # Read MAX_NEIGHBORS from environment variable, default to 15 if not set
 MAX_NEIGHBORS = int(os.getenv("MAX_NEIGHBORS", "15"))
+MAX_DEPTH = int(os.getenv("EXPLORE_MAX_DEPTH", "3"))
+# "html" parses the rendered article; "links" asks the API for prop=links (much smaller responses)
+LINK_SOURCE = os.getenv("LINK_SOURCE", LINK_SOURCE_HTML)
 
-# Dependency for WikipediaClient
-def get_wikipedia_client():
-    return WikipediaClient()
+# Dependency for AsyncWikipediaClient (all clients share the app-scoped caches, HTTP pool and single-flight table)
+def get_wikipedia_client(
+    pool: WikipediaConnectionPool = Depends(get_wikipedia_pool),
+    cache: ArticleCache = Depends(get_article_cache),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    response_cache: Optional[ResponseCache] = Depends(get_response_cache),
+    upstream_guard: Optional[UpstreamGuard] = Depends(get_upstream_guard)
+):
+    return AsyncWikipediaClient(pool=pool, cache=cache, single_flight=single_flight, response_cache=response_cache,
+                                upstream_guard=upstream_guard)
+
+# Dependency for GraphAnalyzer; "metrics" picks the strategies by name, e.g. ?metrics=degree,pagerank
+def get_graph_analyzer(metrics: str = "degree", executor: Optional[AnalysisExecutor] = Depends(get_analysis_executor)):
+    try:
+        return GraphAnalyzer(strategies=strategies_from_metrics(metrics), executor=executor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-# Dependency for GraphAnalyzer (now takes a strategy)
-def get_graph_analyzer():
-    return GraphAnalyzer(strategy=DegreeCentralityStrategy())
+# Per-request crawl budget for explores
+def get_crawl_budget():
+    return CrawlBudget(
+        max_nodes=int(os.getenv("EXPLORE_MAX_NODES", str(DEFAULT_MAX_NODES))),
+        max_calls=int(os.getenv("EXPLORE_MAX_CALLS", str(DEFAULT_MAX_CALLS))),
+        time_budget=float(os.getenv("EXPLORE_TIME_BUDGET", str(DEFAULT_TIME_BUDGET))),
+    )
 
 @router.get("/api/search")
-def search_wikipedia(term: str, wiki_client: WikipediaClient = Depends(get_wikipedia_client)):
+async def search_wikipedia(term: str, wiki_client: AsyncWikipediaClient = Depends(get_wikipedia_client)):
     """
     Search Wikipedia for a given term.
     """
-    return wiki_client.search_articles(term)
+    return await wiki_client.search_articles(term)
 
-@router.get("/api/explore/{article_title}")
-def explore_article(
-    article_title: str,
-    depth: int = 1,
-    wiki_client: WikipediaClient = Depends(get_wikipedia_client),
-    graph_analyzer: GraphAnalyzer = Depends(get_graph_analyzer)
-):
+@router.get("/api/cache/stats")
+def get_cache_stats(cache: ArticleCache = Depends(get_article_cache)):
+    """
+    Return hit/miss/eviction counters of the shared Wikipedia cache.
+    """
+    return cache.stats()
+
+@router.get("/api/response-cache/stats")
+def get_response_cache_stats(response_cache: Optional[ResponseCache] = Depends(get_response_cache)):
+    """
+    Return hit/revalidation/eviction counters and the size of the on-disk response cache.
+    """
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+@router.get("/api/upstream/stats")
+def get_upstream_stats(upstream_guard: Optional[UpstreamGuard] = Depends(get_upstream_guard)):
     """
-    Explore a Wikipedia article and return its graph of linked articles.
-    Calculates degree centrality for each node.
+    Return the circuit state and attempt/retry/throttling counters of calls to Wikipedia.
     """
-    if depth != 1:
-        raise HTTPException(status_code=400, detail="Only depth=1 is currently supported.")
+    if upstream_guard is None:
+        return {"enabled": False}
+    return {"enabled": True, **upstream_guard.stats()}
 
-    # 1. Get content and summary of the root article
-    html_content, final_article_title = wiki_client.get_article_content(article_title)
-    root_summary = wiki_client.get_article_summary(final_article_title)
+@router.get("/api/single-flight/stats")
+def get_single_flight_stats(single_flight: SingleFlight = Depends(get_single_flight)):
+    """
+    Return how many Wikipedia fetches were issued and how many were served by a concurrent identical fetch.
+    """
+    return single_flight.stats()
+
+@router.get("/api/stored-graph/stats")
+def get_stored_graph_stats(stored_graph: Optional[StoredGraphCache] = Depends(get_stored_graph_cache)):
+    """
+    Return hit/miss and write-back counters of the stored graph tier.
+    """
+    if stored_graph is None:
+        return {"enabled": False}
+    return {"enabled": True, **stored_graph.stats()}
 
-    # 2. Extract links from the HTML
-    links = wiki_client.extract_links_from_html(html_content, final_article_title)
+@router.get("/api/link-index/stats")
+def get_link_index_stats(link_index: Optional[LinkIndex] = Depends(get_link_index)):
+    """
+    Return size, hit/miss and eviction counters of the in-memory link index.
+    """
+    if link_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **link_index.stats()}
 
-    # 3. Build the initial graph structure (nodes and edges)
-    nodes = [{"id": final_article_title, "label": final_article_title, "summary": root_summary}]
-    edges = []
+def _validate_depth(depth: int):
+    if depth < 1 or depth > MAX_DEPTH:
+        raise HTTPException(status_code=400, detail=f"depth must be between 1 and {MAX_DEPTH}.")
 
-    # Use the configured MAX_NEIGHBORS
-    for neighbor_title in list(links)[:MAX_NEIGHBORS]:
-        neighbor_summary = wiki_client.get_article_summary(neighbor_title)
-        if neighbor_summary:
-            nodes.append({"id": neighbor_title, "label": neighbor_title, "summary": neighbor_summary})
-            edges.append({"from": final_article_title, "to": neighbor_title})
+async def _encode_events(first: dict, events: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """
+    NDJSON lines for crawl events. Once the response has started, an error can
+    no longer change its status, so it is sent as a final "error" event.
+    """
+    yield json.dumps(first, ensure_ascii=False).encode("utf-8") + b"\n"
+    try:
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+    except HTTPException as e:
+        yield json.dumps({"type": "error", "status": e.status_code, "detail": e.detail}, ensure_ascii=False).encode("utf-8") + b"\n"
 
-    # 4. Calculate centrality using NetworkX in a separate function
-    nodes = graph_analyzer.analyze_and_add_results(nodes, edges)
+@router.get("/api/explore/{article_title}/stream")
+async def stream_explore_article(
+    article_title: str,
+    depth: int = 1,
+    wiki_client: AsyncWikipediaClient = Depends(get_wikipedia_client),
+    graph_analyzer: GraphAnalyzer = Depends(get_graph_analyzer),
+    budget: CrawlBudget = Depends(get_crawl_budget),
+    stored_graph: Optional[StoredGraphCache] = Depends(get_stored_graph_cache),
+    link_index: Optional[LinkIndex] = Depends(get_link_index)
+):
+    """
+    The explore of /api/explore/{article_title} as NDJSON events: the root node as soon
+    as the article is loaded, each neighbour node and edge as its summary batch arrives,
+    and a final "centrality" event with the scores of every node and the truncated flag.
+    """
+    _validate_depth(depth)
+    engine = CrawlEngine(wiki_client, graph_analyzer, max_neighbors=MAX_NEIGHBORS, budget=budget, link_source=LINK_SOURCE,
+                         stored_graph=stored_graph, link_index=link_index)
+    events = engine.stream(article_title, depth)
+    # Wait for the root, so a missing article is still answered with its own status code
+    first = await anext(events)
+    return StreamingResponse(_encode_events(first, events), media_type=NDJSON_MEDIA_TYPE)
 
-    return {"nodes": nodes, "edges": edges}
+@router.get("/api/explore/{article_title}")
+async def explore_article(
+    article_title: str,
+    depth: int = 1,
+    wiki_client: AsyncWikipediaClient = Depends(get_wikipedia_client),
+    graph_analyzer: GraphAnalyzer = Depends(get_graph_analyzer),
+    budget: CrawlBudget = Depends(get_crawl_budget),
+    stored_graph: Optional[StoredGraphCache] = Depends(get_stored_graph_cache),
+    link_index: Optional[LinkIndex] = Depends(get_link_index),
+    encoder: Optional[GraphEncoder] = Depends(get_graph_encoder)
+):
+    """
+    Explore a Wikipedia article and return its graph of linked articles, breadth-first
+    up to `depth` levels. Calculates degree centrality for each node, or the
+    comma-separated `metrics` asked for (degree, pagerank, betweenness, ...).
+    The crawl stops early, with "truncated": true, when the node, call or time budget runs out.
+    Links already in the link index, or stored in Neo4j and still fresh, are used instead of Wikipedia.
+    `format=compact` or `format=msgpack` (or the matching Accept header) returns the compact
+    encoding, with summaries cut to `summary_chars` characters (0 leaves them out).
+    """
+    _validate_depth(depth)
+    engine = CrawlEngine(wiki_client, graph_analyzer, max_neighbors=MAX_NEIGHBORS, budget=budget, link_source=LINK_SOURCE,
+                         stored_graph=stored_graph, link_index=link_index)
+    graph = await engine.crawl(article_title, depth)
+    if encoder is not None:
+        return encoder.response(graph)
+    return graph
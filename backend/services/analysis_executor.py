@@ -0,0 +1,196 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+import numpy as np
+from services.csr_graph import AnalysisCancelled, CSRGraph
+from services.graph_strategies import GraphAnalysisStrategy
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_QUEUE = 16 # Jobs queued or running before new ones are rejected
+DEFAULT_JOB_TIMEOUT = 30.0 # Seconds
+DEFAULT_INLINE_MAX_EDGES = 20000 # Smaller graphs are analyzed in a thread; a round trip to a worker costs more
+
+_HEADER_BYTES = 8 # Cancel flag, padded so the int64 indptr stays aligned
+
+def _graph_views(buffer, node_count: int, edge_count: int):
+    """
+    (cancel flag, indptr, indices) views over a job's shared memory block.
+    """
+    flag = np.ndarray((1,), dtype=np.uint8, buffer=buffer)
+    indptr = np.ndarray((node_count + 1,), dtype=np.int64, buffer=buffer, offset=_HEADER_BYTES)
+    indices = np.ndarray((edge_count,), dtype=np.int32, buffer=buffer, offset=_HEADER_BYTES + indptr.nbytes)
+    return flag, indptr, indices
+
+def _run_job(block_name: str, node_count: int, edge_count: int, strategies: List[GraphAnalysisStrategy]) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Worker side: rebuild the CSR graph from shared memory and run the strategies.
+    Returns None when the job was cancelled.
+    """
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        indptr, indices = _graph_views(block.buf, node_count, edge_count)[1:]
+        graph = CSRGraph(range(node_count), indptr.copy(), indices.copy()) # Node ids stay in the parent
+        del indptr, indices # No views may outlive the block
+        graph.cancel_check = lambda: block.buf[0] == 1
+        return {strategy.output_key: strategy.compute(graph) for strategy in strategies}
+    except AnalysisCancelled:
+        return None
+    finally:
+        block.close()
+
+def _run_inline(graph: CSRGraph, strategies: List[GraphAnalysisStrategy], cancelled: threading.Event) -> Dict[str, np.ndarray]:
+    graph.cancel_check = cancelled.is_set
+    try:
+        return {strategy.output_key: strategy.compute(graph) for strategy in strategies}
+    finally:
+        graph.cancel_check = None
+
+
+class _Job:
+    """
+    A graph copied into shared memory for one submitted analysis.
+    """
+
+    def __init__(self, graph: CSRGraph):
+        self.node_count = graph.node_count
+        self.edge_count = graph.edge_count
+        size = _HEADER_BYTES + graph.indptr.nbytes + graph.edge_count * 4
+        self.block = shared_memory.SharedMemory(create=True, size=size)
+        flag, indptr, indices = _graph_views(self.block.buf, self.node_count, self.edge_count)
+        flag[0] = 0
+        indptr[:] = graph.indptr
+        indices[:] = graph.indices
+        self._lock = threading.Lock()
+        self._released = False
+
+    def cancel(self):
+        with self._lock:
+            if not self._released:
+                self.block.buf[0] = 1
+
+    def release(self):
+        with self._lock:
+            if not self._released:
+                self._released = True
+                self.block.close()
+                self.block.unlink()
+
+
+class AnalysisExecutor:
+    """
+    App-scoped pool of worker processes for graph analysis, so expensive
+    strategies do not hold the GIL of the process serving requests.
+
+    Graphs travel as CSR arrays in shared memory. At most `max_queue` jobs are
+    queued or running; jobs past their timeout are cancelled (queued ones
+    immediately, running ones at the next iteration or batch of their strategy,
+    through a flag in the shared block). Graphs with up to
+    `inline_max_edges` edges are analyzed in a thread of this process, with the
+    same timeout, so the event loop keeps serving other requests.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE,
+                 timeout: float = DEFAULT_JOB_TIMEOUT, inline_max_edges: int = DEFAULT_INLINE_MAX_EDGES):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.inline_max_edges = inline_max_edges
+        self._pool = self._new_pool()
+        self._lock = threading.Lock()
+        self.queue_depth = 0 # Jobs submitted to the pool and not finished yet
+        self.submitted = 0
+        self.inline = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.failed = 0
+
+    async def run(self, graph: CSRGraph, strategies: List[GraphAnalysisStrategy], timeout: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Scores of every strategy for `graph`, as {output key: array in node index order}.
+        """
+        if graph.edge_count <= self.inline_max_edges:
+            with self._lock:
+                self.inline += 1
+            cancelled = threading.Event()
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(_run_inline, graph, strategies, cancelled), timeout or self.timeout)
+            except asyncio.TimeoutError:
+                cancelled.set() # The thread stops at the next cancel check of its strategy
+                with self._lock:
+                    self.timeouts += 1
+                raise HTTPException(status_code=504, detail="Graph analysis timed out.")
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with self._lock:
+            if self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Graph analysis queue is full, try again later.")
+            self.queue_depth += 1
+            self.submitted += 1
+
+        job = _Job(graph)
+        pool = self._pool
+        try:
+            future = pool.submit(_run_job, job.block.name, job.node_count, job.edge_count, strategies)
+        except BaseException:
+            self._finish(job, None)
+            raise
+        future.add_done_callback(lambda done: self._finish(job, done))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            job.cancel() # wait_for already cancelled the future if it had not started
+            with self._lock:
+                self.timeouts += 1
+            raise HTTPException(status_code=504, detail="Graph analysis timed out.")
+        except asyncio.CancelledError:
+            job.cancel() # The request went away
+            raise
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = self._new_pool() # A broken pool rejects every later job
+            raise HTTPException(status_code=503, detail="Graph analysis worker crashed.")
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # "spawn": forking a process that runs an event loop and driver threads is not safe
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _finish(self, job: _Job, future: Optional[Future]):
+        job.release()
+        with self._lock:
+            self.queue_depth -= 1
+            if future is None or (not future.cancelled() and future.exception() is not None):
+                self.failed += 1
+            elif future.cancelled() or future.result() is None:
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queue_depth,
+                "submitted": self.submitted,
+                "inline": self.inline,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "failed": self.failed,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
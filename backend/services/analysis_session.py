@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+import numpy as np
+from services.csr_graph import CSRGraph
+from services.graph_strategies import DegreeBasedStrategy, GraphAnalysisStrategy
+
+DEFAULT_CHANGE_TOLERANCE = 1e-6 # Iterative scores that move less than this are not reported
+DEFAULT_MAX_SESSIONS = 200
+DEFAULT_SESSION_TTL = 1800 # Seconds without updates before a session is dropped
+
+class AnalysisSession:
+    """
+    Centrality scores of a graph that grows by deltas, as when a user keeps
+    expanding nodes of one exploration.
+
+    Degree-based metrics are derived from degree counts that are updated in O(delta);
+    iterative ones (PageRank, HITS) warm-start from the previous vector; the rest are
+    recomputed. Each update reports only the scores that changed.
+    """
+
+    def __init__(self, strategies: List[GraphAnalysisStrategy], tolerance: float = DEFAULT_CHANGE_TOLERANCE):
+        self.id = str(uuid4())
+        self.strategies = strategies
+        self.tolerance = tolerance
+        self._lock = threading.Lock()
+        self._node_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._edges = set() # (source index, target index)
+        self._sources: List[int] = []
+        self._targets: List[int] = []
+        # Degree counts with spare capacity, so growing by one node is amortized O(1)
+        self._in_degree = np.zeros(16, dtype=np.int64)
+        self._out_degree = np.zeros(16, dtype=np.int64)
+        # Scores of the strategies that are not degree-based
+        self._scores: Dict[str, np.ndarray] = {
+            strategy.output_key: np.zeros(0) for strategy in strategies if not isinstance(strategy, DegreeBasedStrategy)
+        }
+
+    @property
+    def node_count(self) -> int:
+        return len(self._node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def scores(self) -> Dict[str, Dict[str, float]]:
+        """
+        Every current score, as {node id: {output key: score}}.
+        """
+        with self._lock:
+            indices = np.arange(self.node_count)
+            by_key = {strategy.output_key: self._values(strategy, indices) for strategy in self.strategies}
+            return {
+                node_id: {key: values[index] for key, values in by_key.items()}
+                for index, node_id in enumerate(self._node_ids)
+            }
+
+    def add(self, node_ids: Iterable[str], edges: Iterable[Tuple[str, str]]) -> dict:
+        """
+        Add nodes and (source, target) edges, already present ones being ignored, and update the scores.
+
+        Returns {"node_count", "edge_count", "changed", "rescaled"}: "changed" maps node id ->
+        {output key: new score}. Adding nodes changes the n - 1 denominator of the degree
+        metrics; for those, the scores not listed in "changed" are the previous ones times
+        rescaled[output key].
+        """
+        with self._lock:
+            old_count = self.node_count
+            touched = set()
+            for node_id in node_ids:
+                touched.add(self._intern(node_id))
+            for source, target in edges:
+                pair = (self._intern(source), self._intern(target))
+                if pair not in self._edges:
+                    self._edges.add(pair)
+                    self._sources.append(pair[0])
+                    self._targets.append(pair[1])
+                    self._out_degree[pair[0]] += 1
+                    self._in_degree[pair[1]] += 1
+                    touched.update(pair)
+            grown = self.node_count - old_count
+            if old_count <= 1:
+                touched = range(self.node_count) # Every score changes from the 1.0 of a lone node
+            touched = np.fromiter(sorted(touched), dtype=np.int64)
+
+            changed: Dict[int, Dict[str, float]] = {}
+            rescaled = {}
+            graph = None
+            for strategy in self.strategies:
+                key = strategy.output_key
+                if isinstance(strategy, DegreeBasedStrategy):
+                    indices = touched
+                    values = self._values(strategy, indices)
+                    if grown and old_count > 1:
+                        rescaled[key] = (old_count - 1) / (self.node_count - 1)
+                else:
+                    if graph is None:
+                        graph = CSRGraph.from_index_arrays(
+                            list(self._node_ids), np.array(self._sources, dtype=np.int64),
+                            np.array(self._targets, dtype=np.int64), self._index,
+                        )
+                    previous = self._scores[key]
+                    scores = self._recompute(strategy, graph, previous, grown)
+                    padded = np.concatenate([previous, np.full(grown, np.nan)])
+                    indices = np.flatnonzero(~(np.abs(scores - padded) <= self.tolerance)) # NaN for new nodes
+                    values = scores[indices].tolist()
+                    self._scores[key] = scores
+                for index, value in zip(indices.tolist(), values):
+                    changed.setdefault(index, {})[key] = value
+
+            return {
+                "node_count": self.node_count,
+                "edge_count": self.edge_count,
+                "changed": {self._node_ids[index]: node_scores for index, node_scores in changed.items()},
+                "rescaled": rescaled,
+            }
+
+    def _intern(self, node_id: str) -> int:
+        index = self._index.get(node_id)
+        if index is None:
+            index = self._index[node_id] = len(self._node_ids)
+            self._node_ids.append(node_id)
+            if index >= len(self._in_degree):
+                self._in_degree = np.concatenate([self._in_degree, np.zeros_like(self._in_degree)])
+                self._out_degree = np.concatenate([self._out_degree, np.zeros_like(self._out_degree)])
+        return index
+
+    def _values(self, strategy: GraphAnalysisStrategy, indices: np.ndarray) -> list:
+        if isinstance(strategy, DegreeBasedStrategy):
+            return strategy.from_degrees(self._in_degree[indices], self._out_degree[indices], self.node_count).tolist()
+        return self._scores[strategy.output_key][indices].tolist()
+
+    @staticmethod
+    def _recompute(strategy: GraphAnalysisStrategy, graph: CSRGraph, previous: np.ndarray, grown: int) -> np.ndarray:
+        if strategy.warm_start and previous.size and previous.sum() > 0:
+            # New nodes start at the uniform share; compute() renormalizes the vector
+            start = np.concatenate([previous, np.full(grown, 1.0 / graph.node_count)])
+            return strategy.compute(graph, start=start)
+        return strategy.compute(graph)
+
+
+class AnalysisSessionStore:
+    """
+    The live analysis sessions of the process, by id. A session is dropped after
+    `ttl` seconds without being used, and the least recently used one goes first
+    when there are more than `max_sessions`.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, ttl: float = DEFAULT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Tuple[AnalysisSession, float]]" = OrderedDict() # id -> (session, expires_at)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def add(self, session: AnalysisSession):
+        with self._lock:
+            self._sessions[session.id] = (session, time.monotonic() + self.ttl)
+            self._sessions.move_to_end(session.id)
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, session_id: str) -> Optional[AnalysisSession]:
+        """
+        The session, or None if it does not exist or expired. Using a session restarts its idle TTL.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            session, expires_at = entry
+            if expires_at <= now:
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            self._sessions[session_id] = (session, now + self.ttl)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl": self.ttl,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,269 @@
+import asyncio
+import time
+from fastapi import HTTPException
+import httpx
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.article_cache import ArticleCache
+from services.single_flight import SingleFlight
+from services.response_cache import ResponseCache, extract_revids
+from services.upstream_guard import UpstreamGuard, UpstreamUnavailable
+from services import metrics
+from services.wikipedia_client import WikipediaClient, WIKIPEDIA_API_URL, MAX_TITLES_PER_QUERY, MAX_EXTRACTS_PER_QUERY, DEFAULT_CONNECT_TIMEOUT
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_TIMEOUT = 10.0 # Seconds to read a response
+USER_AGENT = "wikiGraph/1.0 (https://github.com/sistemasperez/wikiGraph)"
+
+class WikipediaConnectionPool:
+    """
+    App-scoped keep-alive HTTP connection pool for the Wikipedia API.
+    The semaphore caps how many requests are in flight at once across all requests.
+    """
+
+    def __init__(self, api_url: str = WIKIPEDIA_API_URL, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT):
+        self.api_url = api_url
+        self.max_concurrency = max_concurrency
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            headers={"User-Agent": USER_AGENT},
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get(self, params: dict, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        The response, read in full; status codes are left to the caller (304, 429, ...).
+        """
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await self._http.get(self.api_url, params=params, headers=headers)
+                await response.aread()
+            except httpx.HTTPError:
+                metrics.record_upstream("async", "error", time.perf_counter() - started, 0)
+                raise
+            metrics.record_upstream("async", response.status_code, time.perf_counter() - started, len(response.content))
+            return response
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+class AsyncWikipediaClient(WikipediaClient):
+    """
+    asyncio-native counterpart of WikipediaClient. It reuses the request
+    builders, parsers and link extraction of the sync client, but sends every
+    call through the shared WikipediaConnectionPool.
+    """
+
+    def __init__(self, pool: WikipediaConnectionPool, cache: Optional[ArticleCache] = None,
+                 single_flight: Optional[SingleFlight] = None, response_cache: Optional[ResponseCache] = None,
+                 upstream_guard: Optional[UpstreamGuard] = None):
+        super().__init__(cache=cache, api_url=pool.api_url, single_flight=single_flight, response_cache=response_cache,
+                         upstream_guard=upstream_guard)
+        self._pool = pool
+
+    async def _call_wikipedia_api(self, params: dict):
+        if self.response_cache is None:
+            return (await self._request(params))[0]
+
+        # SQLite reads and (de)compression stay off the event loop
+        entry = await asyncio.to_thread(self.response_cache.lookup, params)
+        if entry is not None and entry.fresh:
+            return entry.data
+        try:
+            if self._revision_check_possible(entry):
+                current = extract_revids((await self._request(self._revision_params(list(entry.revids))))[0])
+                if current == entry.revids:
+                    await asyncio.to_thread(self.response_cache.revalidated_unchanged, entry)
+                    return entry.data
+
+            data, etag = await self._request(params, etag=entry.etag if entry is not None else None)
+        except HTTPException:
+            if entry is None:
+                raise
+            # Wikipedia is failing or the circuit is open: a stale answer beats none
+            self.response_cache.record_served_stale()
+            return entry.data
+        if data is None: # 304 Not Modified
+            await asyncio.to_thread(self.response_cache.revalidated_unchanged, entry)
+            return entry.data
+        await asyncio.to_thread(self.response_cache.store, params, data, etag)
+        return data
+
+    async def _request(self, params: dict, etag: Optional[str] = None):
+        """
+        WikipediaClient._request over the shared connection pool, sleeping without blocking the loop.
+        """
+        guard = self.upstream_guard
+        if guard is not None:
+            params = guard.prepare(params)
+        headers = {"If-None-Match": etag} if etag else None
+        attempt = 0
+        while True:
+            if guard is not None:
+                try:
+                    await asyncio.sleep(guard.reserve())
+                except UpstreamUnavailable as e:
+                    raise HTTPException(status_code=503, detail=str(e))
+            self.request_count += 1
+            try:
+                response = await self._pool.get(params, headers=headers)
+                if etag is not None and response.status_code == 304:
+                    if guard is not None:
+                        guard.record_success()
+                    return None, etag
+                data = response.json() if response.is_success else None
+            except (httpx.HTTPError, ValueError) as e: # Timeouts, refused connections, bad bodies
+                error, retry_after = e, 0.0
+            else:
+                retry_after = guard.retry_hint(response.status_code, response.headers, data) if guard is not None else None
+                if retry_after is None:
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPError as e:
+                        raise HTTPException(status_code=503, detail=f"Error connecting to Wikipedia API: {e}")
+                    if guard is not None:
+                        guard.record_success()
+                    return data, response.headers.get("ETag")
+                error = f"HTTP {response.status_code}"
+
+            delay = None
+            if guard is not None:
+                guard.record_failure(retry_after)
+                delay = guard.backoff(attempt, retry_after)
+            if delay is None:
+                raise HTTPException(status_code=503, detail=f"Error connecting to Wikipedia API: {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def search_articles(self, term: str):
+        cache_key = f"search_{term}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async def _fetch():
+            data = await self._call_wikipedia_api(self._search_params(term))
+            self.cache.set(cache_key, data)
+            return data
+
+        return await self.single_flight.run_async("search", term, _fetch)
+
+    async def get_article_summary(self, title: str) -> str:
+        cache_key = f"summary_{title}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async def _fetch():
+            summary = self._parse_summary(await self._call_wikipedia_api(self._summary_params([title])))
+            self.cache.set(cache_key, summary) # Cache empty summary too
+            return summary
+
+        return await self.single_flight.run_async("summary", title, _fetch)
+
+    async def get_article_summaries(self, titles: Iterable[str]) -> Dict[str, str]:
+        """
+        Batched summaries, with the chunks of MAX_EXTRACTS_PER_QUERY titles fetched concurrently.
+        """
+        summaries, pending = self._split_cached_summaries(titles)
+        if pending:
+            summaries.update(await self.single_flight.run_many_async("summary", pending, self._fetch_summaries))
+        return summaries
+
+    async def _fetch_summaries(self, titles: List[str]) -> Dict[str, str]:
+        summaries = {}
+        chunks = [titles[start:start + MAX_EXTRACTS_PER_QUERY] for start in range(0, len(titles), MAX_EXTRACTS_PER_QUERY)]
+        for chunk_summaries in await asyncio.gather(*(self._fetch_summary_chunk(chunk) for chunk in chunks)):
+            for title, summary in chunk_summaries.items():
+                self.cache.set(f"summary_{title}", summary)
+                summaries[title] = summary
+        return summaries
+
+    async def _fetch_summary_chunk(self, titles: List[str]) -> Dict[str, str]:
+        params = self._summary_params(titles)
+        extracts = {} # Page title -> extract
+        aliases = {} # Requested/normalized title -> next title in the chain
+        while True:
+            data = await self._call_wikipedia_api(params)
+            self._collect_extracts(data, extracts, aliases)
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+
+        return {title: extracts.get(self._resolve_title(title, aliases), "") for title in titles}
+
+    async def get_links_for_titles(self, titles: Iterable[str], max_calls: Optional[int] = None) -> Dict[str, set]:
+        """
+        Batched prop=links lookups, with the chunks of MAX_TITLES_PER_QUERY titles fetched concurrently.
+        pllimit=max caps the links of a whole chunk per response, so a chunk may need
+        several calls; with `max_calls`, the lookup stops there and the titles of the
+        chunks it could not finish are left out of the result.
+        """
+        return {title: links for title, (links, _) in (await self.get_resolved_links_for_titles(titles, max_calls)).items()}
+
+    async def get_resolved_links_for_titles(self, titles: Iterable[str], max_calls: Optional[int] = None) -> Dict[str, Tuple[set, Optional[str]]]:
+        """
+        get_links_for_titles with the final title of each article after redirects, None if it is missing.
+        """
+        results, pending = self._split_cached_links(titles)
+        if pending:
+            calls_left = [max_calls] # Shared by the concurrent chunks
+            results.update(await self.single_flight.run_many_async("links", pending, lambda chunk: self._fetch_links(chunk, calls_left)))
+        return {title: (set(links), final_title) for title, (final_title, links) in results.items()}
+
+    async def _fetch_links(self, titles: List[str], calls_left: Optional[list] = None) -> dict:
+        """
+        {title: cacheable result}, without the titles of the chunks cut short by `calls_left`.
+        """
+        results = {}
+        chunks = [titles[start:start + MAX_TITLES_PER_QUERY] for start in range(0, len(titles), MAX_TITLES_PER_QUERY)]
+        for chunk_results in await asyncio.gather(*(self._fetch_links_chunk(chunk, calls_left) for chunk in chunks)):
+            for title, result in chunk_results.items():
+                self.cache.set(f"links_{title}", result)
+                results[title] = result
+        return results
+
+    async def get_article_links(self, title: str):
+        results, pending = self._split_cached_links([title])
+        if pending:
+            results = await self.single_flight.run_many_async("links", pending, self._fetch_links)
+        final_title, links = results[title]
+        if final_title is None:
+            raise HTTPException(status_code=404, detail=f'Article "{title}" not found.')
+        return set(links), final_title
+
+    async def _fetch_links_chunk(self, titles: List[str], calls_left: Optional[list] = None) -> dict:
+        params = self._links_params(titles)
+        links = {} # Page title -> link titles
+        aliases = {} # Requested/normalized title -> next title in the chain
+        while True:
+            if calls_left is not None and calls_left[0] is not None:
+                if calls_left[0] <= 0:
+                    # Out of calls: any page of the chunk may still be missing links, so none is returned
+                    return {}
+                calls_left[0] -= 1
+            data = await self._call_wikipedia_api(params)
+            self._collect_links(data, links, aliases)
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+
+        return {title: self._links_result(title, links, aliases) for title in titles}
+
+    async def get_article_content(self, title: str):
+        cache_key = f"content_{title}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async def _fetch():
+            content = self._parse_content(await self._call_wikipedia_api(self._content_params(title)), title)
+            self.cache.set(cache_key, content)
+            return content
+
+        return await self.single_flight.run_async("content", title, _fetch)
@@ -0,0 +1,350 @@
+import asyncio
+import time
+import numpy as np
+from fastapi import HTTPException
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from services.async_wikipedia_client import AsyncWikipediaClient
+from services.csr_graph import CSRGraph
+from services.graph_analyzer import GraphAnalyzer
+from services import metrics
+from services.link_index import LinkIndex
+from services.stored_graph_cache import StoredGraphCache
+from services.wikipedia_client import MAX_TITLES_PER_QUERY, MAX_EXTRACTS_PER_QUERY
+
+DEFAULT_MAX_NODES = 500
+DEFAULT_MAX_CALLS = 200
+DEFAULT_TIME_BUDGET = 20.0 # Seconds
+
+# Where the links of an article come from
+LINK_SOURCE_HTML = "html" # action=parse, then extract_links_from_html
+LINK_SOURCE_LINKS = "links" # action=query&prop=links, batched, no HTML transferred
+LINK_SOURCES = (LINK_SOURCE_HTML, LINK_SOURCE_LINKS)
+
+class CrawlBudget:
+    """
+    Per-request limits for a crawl. When any of them runs out, the crawl stops
+    and returns what it has, marked as truncated.
+    """
+
+    def __init__(self, max_nodes: int = DEFAULT_MAX_NODES, max_calls: int = DEFAULT_MAX_CALLS, time_budget: float = DEFAULT_TIME_BUDGET):
+        self.max_nodes = max_nodes
+        self.max_calls = max_calls
+        self.time_budget = time_budget
+
+
+class CrawlResult:
+    """
+    The graph built from the events of CrawlEngine.stream(), readable at any
+    point: before the "centrality" event it holds the nodes and edges found so far.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, dict] = {}
+        self.edges: List[dict] = []
+        self.truncated = False
+        self.complete = False
+
+    def add(self, event: dict):
+        if event["type"] == "node":
+            self.nodes[event["node"]["id"]] = event["node"] # The root is sent again once its summary arrives
+        elif event["type"] == "edge":
+            self.edges.append(event["edge"])
+        elif event["type"] == "centrality":
+            for node_id, scores in event["scores"].items():
+                self.nodes[node_id].update(scores)
+            self.truncated = event["truncated"]
+            self.complete = True
+
+    def graph(self) -> dict:
+        return {"nodes": list(self.nodes.values()), "edges": list(self.edges), "truncated": self.truncated}
+
+
+def _by_final_title(resolved: Dict[str, Tuple[Iterable[str], Optional[str]]]) -> Tuple[Dict[str, Iterable[str]], Dict[str, str]]:
+    """
+    {title: (links, final title)} as the links under each final title and the
+    redirects that lead to them, the way the link caches store them. Missing
+    articles (no final title) keep their own.
+    """
+    links = {final_title or title: article_links for title, (article_links, final_title) in resolved.items()}
+    redirects = {title: final_title for title, (_, final_title) in resolved.items() if final_title and final_title != title}
+    return links, redirects
+
+
+class CrawlEngine:
+    """
+    Breadth-first explorer of the Wikipedia link graph. Each level's frontier is
+    fetched concurrently, titles are deduplicated across levels, and the result
+    goes through GraphAnalyzer once at the end. stream() yields nodes and edges
+    as their summaries arrive; crawl() returns the finished graph. With a StoredGraphCache, links and
+    summaries already stored in Neo4j are reused and only the rest is fetched. With a LinkIndex, links
+    crawled by any earlier request are read from memory before either.
+    """
+
+    def __init__(self, wiki_client: AsyncWikipediaClient, graph_analyzer: GraphAnalyzer, max_neighbors: int,
+                 budget: Optional[CrawlBudget] = None, link_source: str = LINK_SOURCE_HTML,
+                 stored_graph: Optional[StoredGraphCache] = None, link_index: Optional[LinkIndex] = None):
+        if link_source not in LINK_SOURCES:
+            raise ValueError(f"Unknown link source {link_source!r}, expected one of {LINK_SOURCES}.")
+        self._wiki_client = wiki_client
+        self._graph_analyzer = graph_analyzer
+        self._max_neighbors = max_neighbors
+        self._budget = budget or CrawlBudget()
+        self._link_source = link_source
+        self._stored_graph = stored_graph
+        self._link_index = link_index
+        self._deadline = 0.0
+        self._truncated = False
+
+    def _calls_left(self) -> int:
+        return self._budget.max_calls - self._wiki_client.request_count
+
+    def _time_left(self) -> float:
+        return self._deadline - time.monotonic()
+
+    async def crawl(self, article_title: str, depth: int) -> dict:
+        """
+        The whole graph at once: the events of stream() folded into nodes and edges.
+        """
+        result = CrawlResult()
+        async for event in self.stream(article_title, depth):
+            result.add(event)
+        return result.graph()
+
+    async def stream(self, article_title: str, depth: int) -> AsyncIterator[dict]:
+        """
+        Crawl as a sequence of events: {"type": "node", "node": ...} and
+        {"type": "edge", "edge": ...} as soon as each summary batch arrives (the
+        root first, with an empty summary, and again once its summary is known),
+        then one {"type": "centrality", "scores": {id: {metric: value}}, "truncated": ...}.
+        """
+        self._deadline = time.monotonic() + self._budget.time_budget
+        self._truncated = False
+
+        # The root article is required; failures here propagate to the caller
+        with metrics.span("crawl_root"):
+            root_title, root_links = await self._fetch_root_links(article_title)
+
+        root_node = {"id": root_title, "label": root_title, "summary": ""}
+        yield {"type": "node", "node": dict(root_node)}
+        nodes = [root_node]
+        edges = []
+        # Nodes and edges interned as they are found, so the analysis does not intern them again
+        positions = {root_title: 0}
+        sources: List[int] = []
+        targets: List[int] = []
+        seen = {root_title}
+        links_by_title = {root_title: root_links}
+        frontier = [root_title]
+
+        for level in range(1, depth + 1):
+            if not frontier:
+                break
+            if level > 1:
+                with metrics.span("crawl_links"):
+                    links_by_title = await self._fetch_links(frontier)
+
+            # 1. Collect the candidate children of every frontier node
+            parents_of: Dict[str, List[str]] = {} # Titles not yet in the graph -> their parents, in link order
+            for parent in frontier:
+                if parent not in links_by_title:
+                    continue
+                for child in list(links_by_title[parent])[:self._max_neighbors]:
+                    if child in seen:
+                        edge = {"from": parent, "to": child}
+                        edges.append(edge)
+                        sources.append(positions[parent])
+                        targets.append(positions[child])
+                        yield {"type": "edge", "edge": dict(edge)}
+                    else:
+                        parents_of.setdefault(child, []).append(parent)
+
+            # 2. Keep as many new titles as the node budget allows
+            new_titles = list(parents_of)
+            slots = self._budget.max_nodes - len(nodes)
+            if len(new_titles) > slots:
+                new_titles = new_titles[:max(slots, 0)]
+                self._truncated = True
+
+            # 3. Fetch their summaries in batches (the root's rides along with level 1); the
+            # children that have one join the graph, and the next frontier, as each batch arrives
+            frontier = []
+            async for summaries in self._summary_batches(([root_title] if level == 1 else []) + new_titles):
+                for title, summary in summaries.items():
+                    if title == root_title and level == 1:
+                        root_node["summary"] = summary or ""
+                        yield {"type": "node", "node": dict(root_node)}
+                        continue
+                    if not summary or title in seen or title not in parents_of:
+                        continue
+                    seen.add(title)
+                    positions[title] = len(nodes)
+                    node = {"id": title, "label": title, "summary": summary}
+                    nodes.append(node)
+                    frontier.append(title)
+                    yield {"type": "node", "node": dict(node)}
+                    for parent in parents_of[title]:
+                        edge = {"from": parent, "to": title}
+                        edges.append(edge)
+                        sources.append(positions[parent])
+                        targets.append(positions[title])
+                        yield {"type": "edge", "edge": dict(edge)}
+
+            if self._truncated:
+                break
+
+        graph = CSRGraph.from_index_arrays([node["id"] for node in nodes], np.array(sources, dtype=np.int64),
+                                           np.array(targets, dtype=np.int64), index=positions)
+        nodes = await self._graph_analyzer.analyze_and_add_results_async(nodes, edges, graph=graph)
+        scores = {node["id"]: {key: value for key, value in node.items() if key not in ("id", "label", "summary")}
+                  for node in nodes}
+        yield {"type": "centrality", "scores": scores, "truncated": self._truncated}
+
+    async def _fetch_root_links(self, article_title: str) -> Tuple[str, set]:
+        # Cached links are resolved like a fresh fetch, so a redirect keeps the same root id
+        if self._link_index:
+            indexed = await asyncio.to_thread(self._link_index.get_resolved_links, [article_title], self._max_neighbors)
+            if article_title in indexed:
+                links, root_title = indexed[article_title]
+                return root_title, links
+        if self._stored_graph:
+            stored = await self._stored_graph.get_article_links(article_title)
+            if stored is not None:
+                links, root_title = stored
+                if self._link_index:
+                    await self._index_links({article_title: (links, root_title)})
+                return root_title, links
+
+        if self._link_source == LINK_SOURCE_LINKS:
+            links, root_title = await self._wiki_client.get_article_links(article_title)
+        else:
+            html_content, root_title = await self._wiki_client.get_article_content(article_title)
+            links = self._wiki_client.extract_links_from_html(html_content, root_title)
+        if self._stored_graph:
+            stored_links, redirects = _by_final_title({article_title: (links, root_title)})
+            self._stored_graph.write_back(links=stored_links, redirects=redirects)
+        if self._link_index:
+            await self._index_links({article_title: (links, root_title)})
+        return root_title, links
+
+    async def _index_links(self, resolved: Dict[str, Tuple[Iterable[str], Optional[str]]]):
+        # Off the event loop: a put may compact the index
+        await asyncio.to_thread(self._link_index.put, *_by_final_title(resolved))
+
+    async def _fetch_links(self, titles: List[str]) -> Dict[str, set]:
+        """
+        Links of every article in a frontier level, within the call and time budgets.
+        Articles that fail to load are skipped instead of failing the whole crawl.
+        """
+        links_by_title = {}
+        if self._link_index:
+            links_by_title = await asyncio.to_thread(self._link_index.get_links, titles, self._max_neighbors)
+            titles = [title for title in titles if title not in links_by_title]
+            if not titles:
+                return links_by_title
+        if self._stored_graph:
+            stored = await self._stored_graph.get_resolved_links(titles)
+            if self._link_index and stored:
+                await self._index_links(stored)
+            links_by_title.update((title, links) for title, (links, _) in stored.items())
+            titles = [title for title in titles if title not in stored]
+            if not titles:
+                return links_by_title
+
+        calls_left = self._calls_left() - 1 # Keep one call for the level's summaries
+        if self._link_source == LINK_SOURCE_LINKS:
+            resolved = await self._fetch_links_batched(titles, calls_left)
+        else:
+            resolved = await self._fetch_links_from_html(titles, calls_left)
+        if self._stored_graph:
+            stored_links, redirects = _by_final_title(resolved)
+            self._stored_graph.write_back(links=stored_links, redirects=redirects)
+        if self._link_index and resolved:
+            await self._index_links(resolved)
+        links_by_title.update((title, links) for title, (links, _) in resolved.items())
+        return links_by_title
+
+    async def _fetch_links_batched(self, titles: List[str], calls_left: int) -> Dict[str, Tuple[set, Optional[str]]]:
+        # Each chunk of titles costs at least one call, more when its links need continuations
+        max_titles = max(calls_left, 0) * MAX_TITLES_PER_QUERY
+        if len(titles) > max_titles:
+            titles = titles[:max_titles]
+            self._truncated = True
+        if not titles:
+            return {}
+        try:
+            links_by_title = await asyncio.wait_for(self._wiki_client.get_resolved_links_for_titles(titles, max_calls=max(calls_left, 0)),
+                                                    timeout=max(self._time_left(), 0))
+        except (asyncio.TimeoutError, HTTPException):
+            self._truncated = True
+            return {}
+        if len(links_by_title) < len(titles): # Chunks cut short by the call budget
+            self._truncated = True
+        return links_by_title
+
+    async def _fetch_links_from_html(self, titles: List[str], calls_left: int) -> Dict[str, Tuple[set, Optional[str]]]:
+        if len(titles) > calls_left:
+            titles = titles[:max(calls_left, 0)]
+            self._truncated = True
+        if not titles:
+            return {}
+
+        tasks = {asyncio.ensure_future(self._wiki_client.get_article_content(title)): title for title in titles}
+        done, pending = await asyncio.wait(tasks, timeout=max(self._time_left(), 0))
+        if pending:
+            self._truncated = True
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        links_by_title = {}
+        for task in done:
+            if task.exception() is None:
+                html_content, final_title = task.result()
+                title = tasks[task]
+                links_by_title[title] = (self._wiki_client.extract_links_from_html(html_content, final_title), final_title)
+        return links_by_title
+
+    async def _summary_batches(self, titles: List[str]) -> AsyncIterator[Dict[str, str]]:
+        """
+        Summaries of `titles` as they arrive: the ones stored in Neo4j first, then
+        each upstream batch of MAX_EXTRACTS_PER_QUERY titles (one call each) as soon as it completes.
+        Batches that fail or miss the time budget are dropped and mark the crawl truncated.
+        """
+        if self._stored_graph and titles:
+            with metrics.span("crawl_stored_summaries"):
+                stored = await self._stored_graph.get_summaries(titles)
+            if stored:
+                yield stored
+            titles = [title for title in titles if title not in stored]
+
+        max_titles = max(self._calls_left(), 0) * MAX_EXTRACTS_PER_QUERY
+        if len(titles) > max_titles:
+            titles = titles[:max_titles]
+            self._truncated = True
+        if not titles:
+            return
+
+        chunks = [titles[start:start + MAX_EXTRACTS_PER_QUERY] for start in range(0, len(titles), MAX_EXTRACTS_PER_QUERY)]
+        tasks = [asyncio.ensure_future(self._wiki_client.get_article_summaries(chunk)) for chunk in chunks]
+        waited = 0.0 # Time spent waiting for batches, not in the consumer between them
+        try:
+            for next_batch in asyncio.as_completed(tasks, timeout=max(self._time_left(), 0)):
+                started = time.perf_counter()
+                try:
+                    fetched = await next_batch
+                except HTTPException:
+                    # Keep the batches already fetched rather than losing the whole level
+                    self._truncated = True
+                    continue
+                finally:
+                    waited += time.perf_counter() - started
+                if self._stored_graph:
+                    self._stored_graph.write_back(summaries=fetched)
+                yield fetched
+        except asyncio.TimeoutError:
+            self._truncated = True
+        finally:
+            metrics.observe_stage("crawl_summaries", waited)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,416 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from uuid import uuid4
+from fastapi import HTTPException
+from services.crawl_engine import CrawlResult
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+DEFAULT_WORKERS = 2 # Jobs crawling at once in each process, once CRAWL_JOB_WORKERS enables them
+DEFAULT_MAX_QUEUED = 100 # Jobs waiting before new ones are rejected
+DEFAULT_CHECKPOINT_INTERVAL = 2.0 # Seconds between writes of a running job's partial result
+DEFAULT_POLL_INTERVAL = 1.0 # Seconds between looks for jobs submitted by other processes
+DEFAULT_HEARTBEAT_INTERVAL = 10.0
+DEFAULT_STALE_AFTER = 60.0 # Seconds without a heartbeat before a running job is taken over
+SQLITE_BUSY_TIMEOUT = 5.0
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS crawl_jobs (
+        id TEXT PRIMARY KEY,
+        params TEXT NOT NULL,
+        status TEXT NOT NULL,
+        owner TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        node_count INTEGER NOT NULL DEFAULT 0,
+        edge_count INTEGER NOT NULL DEFAULT 0,
+        truncated INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        exploration_id TEXT,
+        result BLOB,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        heartbeat_at REAL,
+        finished_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS crawl_jobs_status ON crawl_jobs (status, created_at);
+    CREATE INDEX IF NOT EXISTS crawl_jobs_created_at ON crawl_jobs (created_at);
+    """
+
+_JOB_COLUMNS = ("id, params, status, node_count, edge_count, truncated, error, exploration_id, "
+                "created_at, started_at, finished_at")
+
+def _timestamp(seconds: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat() if seconds is not None else None
+
+def _pack(graph: dict) -> bytes:
+    return zlib.compress(json.dumps(graph, ensure_ascii=False).encode("utf-8"))
+
+
+class CrawlJobStore:
+    """
+    The job table, in a SQLite file that every worker process opens. Workers
+    claim queued jobs with a write transaction, so each job runs once; a running
+    job whose owner stopped sending heartbeats is queued again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local() # sqlite3 connections are per thread
+        self._connections = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _write(self, work: Callable[[sqlite3.Connection], Any]) -> Any:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(connection)
+            connection.execute("COMMIT")
+            return result
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def create(self, params: dict) -> dict:
+        job_id = str(uuid4())
+
+        def _create(connection):
+            # Read back in the same transaction, before a worker can claim it
+            connection.execute(
+                "INSERT INTO crawl_jobs (id, params, status, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), STATUS_QUEUED, time.time()),
+            )
+            return self._job(connection.execute(f"SELECT {_JOB_COLUMNS} FROM crawl_jobs WHERE id = ?", (job_id,)).fetchone())
+        return self._write(_create)
+
+    def count(self, status: str) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM crawl_jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def claim(self, owner: str, stale_before: float) -> Optional[dict]:
+        """
+        Take the oldest queued job, or a running one whose heartbeat is older than `stale_before`.
+        """
+        def _claim(connection):
+            row = connection.execute(
+                "SELECT id, params FROM crawl_jobs WHERE status = ? OR (status = ? AND heartbeat_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (STATUS_QUEUED, STATUS_RUNNING, stale_before),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            connection.execute(
+                "UPDATE crawl_jobs SET status = ?, owner = ?, started_at = ?, heartbeat_at = ?, result = NULL WHERE id = ?",
+                (STATUS_RUNNING, owner, now, now, row["id"]),
+            )
+            return {"id": row["id"], "params": json.loads(row["params"])}
+        return self._write(_claim)
+
+    def checkpoint(self, job_id: str, owner: str, graph: dict):
+        self._connection().execute(
+            "UPDATE crawl_jobs SET node_count = ?, edge_count = ?, truncated = ?, result = ?, heartbeat_at = ? "
+            "WHERE id = ? AND owner = ?",
+            (len(graph["nodes"]), len(graph["edges"]), graph["truncated"], _pack(graph), time.time(), job_id, owner),
+        )
+
+    def heartbeat(self, owner: str, job_ids: List[str]) -> List[str]:
+        """
+        Mark `owner`'s jobs as alive; returns those whose cancellation was asked for through another process.
+        """
+        def _heartbeat(connection):
+            placeholders = ",".join("?" * len(job_ids))
+            connection.execute(f"UPDATE crawl_jobs SET heartbeat_at = ? WHERE owner = ? AND id IN ({placeholders})",
+                               (time.time(), owner, *job_ids))
+            rows = connection.execute(f"SELECT id FROM crawl_jobs WHERE cancel_requested = 1 AND id IN ({placeholders})",
+                                      job_ids).fetchall()
+            return [row["id"] for row in rows]
+        return self._write(_heartbeat) if job_ids else []
+
+    def finish(self, job_id: str, owner: str, status: str, graph: dict, error: Optional[str] = None,
+               exploration_id: Optional[str] = None):
+        """
+        Record how a job ended. A job interrupted by shutdown (STATUS_QUEUED) is left for release().
+        """
+        if status == STATUS_QUEUED:
+            return # Handed back by release() once the manager has stopped
+        self._connection().execute(
+            "UPDATE crawl_jobs SET status = ?, owner = NULL, node_count = ?, edge_count = ?, truncated = ?, result = ?, "
+            "error = ?, exploration_id = ?, finished_at = ? WHERE id = ? AND owner = ?",
+            (status, len(graph["nodes"]), len(graph["edges"]), graph["truncated"], _pack(graph), error, exploration_id,
+             time.time(), job_id, owner),
+        )
+
+    def release(self, owner: str):
+        """
+        Queue again every job `owner` still holds, to be run from the start.
+        """
+        self._connection().execute(
+            "UPDATE crawl_jobs SET status = ?, owner = NULL, node_count = 0, edge_count = 0, truncated = 0, "
+            "result = NULL, started_at = NULL, heartbeat_at = NULL WHERE owner = ? AND status = ?",
+            (STATUS_QUEUED, owner, STATUS_RUNNING),
+        )
+
+    def request_cancel(self, job_id: str):
+        """
+        Cancel a queued job now; a running one is flagged for its owner to stop.
+        """
+        def _cancel(connection):
+            connection.execute("UPDATE crawl_jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                               (STATUS_CANCELLED, time.time(), job_id, STATUS_QUEUED))
+            connection.execute("UPDATE crawl_jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                               (job_id, STATUS_RUNNING))
+        self._write(_cancel)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute(f"SELECT {_JOB_COLUMNS} FROM crawl_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def list(self, limit: int) -> List[dict]:
+        rows = self._connection().execute(f"SELECT {_JOB_COLUMNS} FROM crawl_jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._job(row) for row in rows]
+
+    def result(self, job_id: str) -> Optional[dict]:
+        """
+        The last stored graph of a job: partial while it runs, final once it finished. None for unknown jobs.
+        """
+        row = self._connection().execute("SELECT result FROM crawl_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["result"] is None:
+            return {"nodes": [], "edges": [], "truncated": False}
+        return json.loads(zlib.decompress(row["result"]))
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            **json.loads(row["params"]),
+            "status": row["status"],
+            "node_count": row["node_count"],
+            "edge_count": row["edge_count"],
+            "truncated": bool(row["truncated"]),
+            "error": row["error"],
+            "exploration_id": row["exploration_id"],
+            "created_at": _timestamp(row["created_at"]),
+            "started_at": _timestamp(row["started_at"]),
+            "finished_at": _timestamp(row["finished_at"]),
+        }
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class _RunningJob:
+    def __init__(self, job_id: str, params: dict):
+        self.id = job_id
+        self.params = params
+        self.result = CrawlResult()
+        self.task: Optional[asyncio.Task] = None
+
+
+class CrawlJobManager:
+    """
+    Runs explores too big for a request in the background. Jobs live in a
+    CrawlJobStore; `workers` asyncio tasks claim them, crawl with the event
+    stream of `run_crawl(params)` and checkpoint the partial graph every
+    `checkpoint_interval` seconds, so it can be polled. A finished job is saved
+    as an exploration with `save(name, nodes, edges)` when it asked for it.
+
+    Crawling is I/O on the event loop and graph analysis goes to the analysis
+    executor, so jobs share the process with interactive requests without
+    holding them up beyond the shared upstream rate limit.
+    """
+
+    def __init__(self, store: CrawlJobStore, run_crawl: Callable[[dict], AsyncIterator[dict]],
+                 save: Optional[Callable[[str, List[dict], List[dict]], dict]] = None, workers: int = DEFAULT_WORKERS,
+                 max_queued: int = DEFAULT_MAX_QUEUED, checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+                 stale_after: float = DEFAULT_STALE_AFTER):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.checkpoint_interval = checkpoint_interval
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.owner = uuid4().hex
+        self._run_crawl = run_crawl
+        self._save = save
+        self._running: Dict[str, _RunningJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._closing = False
+        self.started = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def submit(self, params: dict) -> dict:
+        if await asyncio.to_thread(self.store.count, STATUS_QUEUED) >= self.max_queued:
+            raise HTTPException(status_code=503, detail="Crawl job queue is full, try again later.")
+        job = await asyncio.to_thread(self.store.create, params)
+        self._wake.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        running = self._running.get(job_id)
+        if job is not None and running is not None: # Fresher than the last checkpoint
+            job.update(node_count=len(running.result.nodes), edge_count=len(running.result.edges),
+                       truncated=running.result.truncated)
+        return job
+
+    async def result(self, job_id: str) -> Optional[dict]:
+        running = self._running.get(job_id)
+        if running is not None:
+            return running.result.graph()
+        return await asyncio.to_thread(self.store.result, job_id)
+
+    async def list(self, limit: int) -> List[dict]:
+        return await asyncio.to_thread(self.store.list, limit)
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancel a job and return it. A job running in this process has stopped when
+        this returns; one running in another process stops at its next heartbeat.
+        """
+        running = self._running.get(job_id)
+        if running is not None and running.task is not None:
+            running.task.cancel()
+            await asyncio.wait({running.task})
+        else:
+            await asyncio.to_thread(self.store.request_cancel, job_id)
+        return await self.get(job_id)
+
+    async def _worker(self):
+        while True:
+            self._wake.clear()
+            claim = asyncio.ensure_future(asyncio.to_thread(self.store.claim, self.owner, time.time() - self.stale_after))
+            try:
+                claimed = await asyncio.shield(claim)
+            except asyncio.CancelledError:
+                await asyncio.wait({claim}) # Let a claim in progress land, so close() can hand it back
+                raise
+            if claimed is None:
+                # Not wait_for: on 3.11 it can swallow a cancel that lands as the timeout fires
+                waiter = asyncio.ensure_future(self._wake.wait())
+                try:
+                    await asyncio.wait({waiter}, timeout=self.poll_interval)
+                finally:
+                    waiter.cancel()
+                continue
+            job = _RunningJob(claimed["id"], claimed["params"])
+            job.task = asyncio.create_task(self._run(job))
+            self._running[job.id] = job
+            try:
+                await asyncio.wait({job.task}) # Cancelling the job must not cancel the worker
+            finally:
+                self._running.pop(job.id, None)
+
+    async def _run(self, job: _RunningJob):
+        self.started += 1
+        status, error, exploration_id = STATUS_SUCCEEDED, None, None
+        try:
+            checkpointed = time.monotonic()
+            async for event in self._run_crawl(job.params):
+                job.result.add(event)
+                if time.monotonic() - checkpointed >= self.checkpoint_interval:
+                    await asyncio.to_thread(self.store.checkpoint, job.id, self.owner, job.result.graph())
+                    checkpointed = time.monotonic()
+            if job.params.get("save") and self._save is not None:
+                graph = job.result.graph()
+                saving = asyncio.ensure_future(asyncio.to_thread(self._save, job.params.get("name") or job.params["article_title"],
+                                                                 graph["nodes"], graph["edges"]))
+                try:
+                    exploration_id = (await asyncio.shield(saving))["id"]
+                except asyncio.CancelledError:
+                    # The save goes on in its thread anyway: wait for it, so the job records the exploration it created
+                    await asyncio.wait({saving})
+                    if saving.exception() is None:
+                        exploration_id = saving.result()["id"]
+                    raise
+        except asyncio.CancelledError:
+            # At shutdown the job goes back to the queue, to run again after the restart,
+            # unless it was already saved: running it again would save it twice
+            status = STATUS_QUEUED if self._closing else STATUS_CANCELLED
+            if self._closing and exploration_id is not None:
+                status = STATUS_SUCCEEDED
+        except HTTPException as e:
+            status, error = STATUS_FAILED, str(e.detail)
+        except Exception as e:
+            status, error = STATUS_FAILED, f"{type(e).__name__}: {e}"
+
+        if status == STATUS_SUCCEEDED:
+            self.succeeded += 1
+        elif status == STATUS_FAILED:
+            self.failed += 1
+        elif status == STATUS_CANCELLED:
+            self.cancelled += 1
+        await asyncio.to_thread(self.store.finish, job.id, self.owner, status, job.result.graph(), error, exploration_id)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            cancelled = await asyncio.to_thread(self.store.heartbeat, self.owner, list(self._running))
+            for job_id in cancelled:
+                running = self._running.get(job_id)
+                if running is not None and running.task is not None:
+                    running.task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "queued": self.store.count(STATUS_QUEUED),
+            "started": self.started,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+    async def close(self):
+        """
+        Stop the workers. Jobs still running are handed back to the queue, for this or another process.
+        """
+        self._closing = True
+        for task in self._tasks:
+            task.cancel()
+        running = [job.task for job in self._running.values() if job.task is not None]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *running, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.store.release, self.owner)
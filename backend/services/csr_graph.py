@@ -0,0 +1,129 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+class AnalysisCancelled(Exception):
+    """
+    Raised inside a strategy when the graph's cancel check fires.
+    """
+
+class CSRGraph:
+    """
+    Directed graph stored as compressed sparse row arrays over integer node indices.
+    Node ids are interned once, in insertion order; `indptr`/`indices` hold the
+    out-neighbours of every node, deduplicated like a networkx DiGraph.
+    """
+
+    def __init__(self, node_ids: List[str], indptr: np.ndarray, indices: np.ndarray):
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self._index: Optional[Dict[str, int]] = None
+        self._adjacency: Optional[sp.csr_matrix] = None
+        self._adjacency_t: Optional[sp.csr_matrix] = None
+        self.cancel_check: Optional[Callable[[], bool]] = None # Polled by long-running strategies
+
+    @classmethod
+    def from_edges(cls, node_ids: Iterable[str], edges: Iterable[Tuple[str, str]]) -> "CSRGraph":
+        """
+        Build the graph from node ids and (source, target) pairs. Endpoints that are
+        not in `node_ids` are appended, as networkx does when adding an edge.
+        """
+        index: Dict[str, int] = {}
+        for node_id in node_ids:
+            index.setdefault(node_id, len(index))
+        pairs = []
+        for source, target in edges:
+            if source not in index:
+                index[source] = len(index)
+            if target not in index:
+                index[target] = len(index)
+            pairs.append(index[source])
+            pairs.append(index[target])
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return cls.from_index_arrays(list(index), pairs[:, 0], pairs[:, 1], index)
+
+    @classmethod
+    def from_graph_data(cls, nodes: list, edges: list) -> "CSRGraph":
+        """
+        Build the graph from the node and edge dicts used across the API ({"id": ...}, {"from": ..., "to": ...}).
+        """
+        return cls.from_edges((node['id'] for node in nodes), ((edge['from'], edge['to']) for edge in edges))
+
+    @classmethod
+    def from_networkx(cls, graph) -> "CSRGraph":
+        """
+        Build the graph from a networkx (Di)Graph. Undirected edges count in both directions.
+        """
+        edges = list(graph.edges())
+        if not graph.is_directed():
+            edges += [(target, source) for source, target in edges if source != target]
+        return cls.from_edges(graph.nodes(), edges)
+
+    @classmethod
+    def from_index_arrays(cls, node_ids: List[str], sources: np.ndarray, targets: np.ndarray, index: Optional[Dict[str, int]] = None) -> "CSRGraph":
+        """
+        Build the graph from already interned edges: sources[i] -> targets[i] are indices into `node_ids`.
+        """
+        n = len(node_ids)
+        if len(sources):
+            # Sort by (source, target) and drop repeated edges
+            keys = np.sort(sources * n + targets)
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+            sources, targets = np.divmod(keys, n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        graph = cls(node_ids, indptr, targets.astype(np.int32))
+        graph._index = index
+        return graph
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.indices.shape[0])
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """
+        Node id -> integer index.
+        """
+        if self._index is None:
+            self._index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        return self._index
+
+    def raise_if_cancelled(self):
+        if self.cancel_check is not None and self.cancel_check():
+            raise AnalysisCancelled()
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.node_count)
+
+    def adjacency(self) -> sp.csr_matrix:
+        """
+        n x n 0/1 matrix with A[u, v] = 1 for every edge u -> v. Shares the CSR arrays.
+        """
+        if self._adjacency is None:
+            n = self.node_count
+            data = np.ones(self.edge_count, dtype=np.float64)
+            self._adjacency = sp.csr_matrix((data, self.indices, self.indptr), shape=(n, n))
+        return self._adjacency
+
+    def adjacency_transpose(self) -> sp.csr_matrix:
+        """
+        Transposed adjacency in CSR form (rows are in-neighbours), cached for repeated products.
+        """
+        if self._adjacency_t is None:
+            self._adjacency_t = self.adjacency().T.tocsr()
+        return self._adjacency_t
+
+    def to_dict(self, values: np.ndarray) -> Dict[str, float]:
+        """
+        Map a per-node array back to node ids.
+        """
+        return dict(zip(self.node_ids, values.tolist()))
@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from services.neo4j_repository import Neo4jRepository
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def encode_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    One UTF-8 JSON line per record.
+    """
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+def export_ndjson(repo: Neo4jRepository) -> Iterator[bytes]:
+    """
+    Encode the export stream as NDJSON, one line per exploration, node or edge.
+    """
+    return encode_ndjson(repo.stream_export())
+
+
+class NdjsonImporter:
+    """
+    Applies an NDJSON export to the database as its lines arrive.
+
+    Lines must follow the export order: an "exploration" record, then its "node"
+    records, then its "edge" records. Nodes and edges are buffered up to the
+    repository's write batch size, so memory stays bounded whatever the input
+    size. Each flush is its own transaction: if a later line is invalid, the
+    batches already written stay in place.
+    """
+
+    def __init__(self, repo: Neo4jRepository, batch_size: Optional[int] = None):
+        self._repo = repo
+        self._batch_size = batch_size or repo.write_batch_size
+        self._remainder = b""
+        self._line_number = 0
+        self._exploration_id: Optional[str] = None
+        self._nodes: List[Dict[str, Any]] = []
+        self._edges: List[Dict[str, Any]] = []
+        self.counts = {"explorations": 0, "nodes": 0, "edges": 0}
+
+    def feed(self, chunk: bytes):
+        """
+        Consume a chunk of the request body; chunks may split lines anywhere.
+        """
+        lines = (self._remainder + chunk).split(b"\n")
+        self._remainder = lines.pop()
+        for line in lines:
+            self._handle_line(line)
+
+    def finish(self) -> Dict[str, int]:
+        if self._remainder:
+            self._handle_line(self._remainder)
+            self._remainder = b""
+        self._flush()
+        return self.counts
+
+    def _handle_line(self, line: bytes):
+        self._line_number += 1
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+            record_type = record["type"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Line {self._line_number}: not an export record ({e}).")
+
+        if record_type == "exploration":
+            if not record.get("id") or not record.get("name"):
+                raise ValueError(f"Line {self._line_number}: exploration records need an id and a name.")
+            self._flush()
+            self._repo.import_exploration(record)
+            self._exploration_id = record["id"]
+            self.counts["explorations"] += 1
+        elif record_type in ("node", "edge"):
+            if record.get("exploration_id") != self._exploration_id or self._exploration_id is None:
+                raise ValueError(f"Line {self._line_number}: {record_type} does not belong to the exploration above it.")
+            if record_type == "node":
+                if not record.get("id") or not isinstance(record["id"], str):
+                    raise ValueError(f"Line {self._line_number}: node records need an id.")
+                if self._edges:
+                    self._flush() # Edges can only link nodes that are already written
+                self._nodes.append(record)
+                if len(self._nodes) >= self._batch_size:
+                    self._flush_nodes()
+            else:
+                if not all(record.get(end) and isinstance(record[end], str) for end in ("from", "to")):
+                    raise ValueError(f"Line {self._line_number}: edge records need a from and a to.")
+                self._edges.append(record)
+                if len(self._edges) >= self._batch_size:
+                    self._flush()
+        else:
+            raise ValueError(f"Line {self._line_number}: unknown record type {record_type!r}.")
+
+    def _flush_nodes(self):
+        if self._nodes:
+            self._repo.import_nodes(self._exploration_id, self._nodes)
+            self.counts["nodes"] += len(self._nodes)
+            self._nodes = []
+
+    def _flush(self):
+        self._flush_nodes()
+        if self._edges:
+            self._repo.import_edges(self._exploration_id, self._edges)
+            self.counts["edges"] += len(self._edges)
+            self._edges = []
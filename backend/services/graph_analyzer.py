@@ -1,27 +1,55 @@
-import networkx as nx
+import asyncio
+from typing import List, Optional
+from services.analysis_executor import AnalysisExecutor
+from services.csr_graph import CSRGraph
+from services import metrics
 from services.graph_strategies import GraphAnalysisStrategy # Import the strategy
 
 class GraphAnalyzer:
-    def __init__(self, strategy: GraphAnalysisStrategy):
-        self._strategy = strategy
+    def __init__(self, strategy: Optional[GraphAnalysisStrategy] = None, strategies: Optional[List[GraphAnalysisStrategy]] = None,
+                 executor: Optional[AnalysisExecutor] = None):
+        self._strategies = list(strategies or [])
+        if strategy is not None:
+            self._strategies.insert(0, strategy)
+        self._executor = executor # Runs large analyses in worker processes; inline when None
 
-    def analyze_and_add_results(self, nodes: list, edges: list) -> list:
-        G = nx.DiGraph()
+    @property
+    def strategies(self) -> List[GraphAnalysisStrategy]:
+        return self._strategies
 
-        for node_data in nodes:
-            G.add_node(node_data['id'])
+    def analyze_and_add_results(self, nodes: list, edges: list, graph: Optional[CSRGraph] = None) -> list:
+        """
+        Fill every node with each strategy's score. `graph` is the CSR form of `nodes`
+        and `edges` when the caller already interned them (as CrawlEngine does).
+        """
+        with metrics.span("graph_analysis"):
+            # The CSR arrays are built once and shared by every strategy
+            if graph is None:
+                graph = CSRGraph.from_graph_data(nodes, edges)
 
-        for edge_data in edges:
-            G.add_edge(edge_data['from'], edge_data['to'])
+            for strategy in self._strategies:
+                # Delegate analysis to the strategy, which names the field it fills
+                analysis_results = strategy.analyze(graph)
+                for node in nodes:
+                    node[strategy.output_key] = analysis_results.get(node['id'], 0.0)
 
-        # Delegate analysis to the strategy
-        analysis_results = self._strategy.analyze(G)
+            return nodes
 
-        # Add analysis results to the nodes
-        for node in nodes:
-            node_id = node['id']
-            # For simplicity, hardcoding 'degree_centrality' key for now.
-            # A more robust solution would have the strategy define the key.
-            node['degree_centrality'] = analysis_results.get(node_id, 0.0)
+    async def analyze_and_add_results_async(self, nodes: list, edges: list, graph: Optional[CSRGraph] = None) -> list:
+        """
+        analyze_and_add_results for async callers, through the analysis executor when there is one
+        and in a thread otherwise, so the event loop is never blocked by the scoring.
+        """
+        if self._executor is None:
+            return await asyncio.to_thread(self.analyze_and_add_results, nodes, edges, graph)
 
-        return nodes
\ No newline at end of file
+        with metrics.span("graph_analysis"):
+            if graph is None:
+                graph = CSRGraph.from_graph_data(nodes, edges)
+            scores = await self._executor.run(graph, self._strategies)
+        positions = [graph.index[node['id']] for node in nodes]
+        for output_key, values in scores.items():
+            for node, value in zip(nodes, values[positions].tolist()):
+                node[output_key] = value
+
+        return nodes
@@ -1,18 +1,266 @@
 from abc import ABC, abstractmethod
+import random
+from typing import List, Optional, Union
 import networkx as nx
+import numpy as np
+from services.csr_graph import CSRGraph
 
 class GraphAnalysisStrategy(ABC):
-    @abstractmethod
-    def analyze(self, graph: nx.Graph) -> dict:
+    """
+    A node metric computed over a CSRGraph. Each strategy names the node field
+    its results are written to, so GraphAnalyzer can run several of them at once.
+    """
+
+    output_key: str = ""
+    warm_start: bool = False
+
+    def analyze(self, graph: Union[CSRGraph, nx.Graph]) -> dict:
         """
-        Abstract method to perform graph analysis.
+        Perform graph analysis.
         Returns a dictionary where keys are node IDs and values are analysis results.
+        networkx graphs are converted to a CSRGraph first.
+        """
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_networkx(graph)
+        return graph.to_dict(self.compute(graph))
+
+    @abstractmethod
+    def compute(self, graph: CSRGraph) -> np.ndarray:
+        """
+        Abstract method returning one score per node, in node index order.
         """
         pass
 
-class DegreeCentralityStrategy(GraphAnalysisStrategy):
-    def analyze(self, graph: nx.DiGraph) -> dict:
+class DegreeBasedStrategy(GraphAnalysisStrategy):
+    """
+    Centralities that only depend on node degrees, so they can be updated from
+    degree counts alone (see AnalysisSession).
+    """
+
+    def compute(self, graph: CSRGraph) -> np.ndarray:
+        return self.from_degrees(graph.in_degree(), graph.out_degree(), graph.node_count)
+
+    def from_degrees(self, in_degree: np.ndarray, out_degree: np.ndarray, node_count: int) -> np.ndarray:
+        if node_count <= 1:
+            return np.ones(len(in_degree))
+        return self.degree(in_degree, out_degree) / (node_count - 1)
+
+    @abstractmethod
+    def degree(self, in_degree: np.ndarray, out_degree: np.ndarray) -> np.ndarray:
+        pass
+
+class DegreeCentralityStrategy(DegreeBasedStrategy):
+    """
+    Calculates degree centrality (in + out degree over n - 1), like nx.degree_centrality.
+    """
+
+    output_key = "degree_centrality"
+
+    def degree(self, in_degree: np.ndarray, out_degree: np.ndarray) -> np.ndarray:
+        return in_degree + out_degree
+
+class InDegreeCentralityStrategy(DegreeBasedStrategy):
+    output_key = "in_degree_centrality"
+
+    def degree(self, in_degree: np.ndarray, out_degree: np.ndarray) -> np.ndarray:
+        return in_degree
+
+class OutDegreeCentralityStrategy(DegreeBasedStrategy):
+    output_key = "out_degree_centrality"
+
+    def degree(self, in_degree: np.ndarray, out_degree: np.ndarray) -> np.ndarray:
+        return out_degree
+
+class PageRankStrategy(GraphAnalysisStrategy):
+    """
+    Power-iteration PageRank over the row-normalized adjacency, with the same
+    dangling-node handling and stopping rule as nx.pagerank.
+    """
+
+    output_key = "pagerank"
+    warm_start = True # compute() accepts the previous scores as a starting vector
+
+    def __init__(self, alpha: float = 0.85, tol: float = 1.0e-6, max_iter: int = 100):
+        self.alpha = alpha
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def compute(self, graph: CSRGraph, start: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        `start` seeds the iteration (for example with the previous scores of a grown graph).
+        """
+        n = graph.node_count
+        if n == 0:
+            return np.zeros(0)
+        out_degree = graph.out_degree().astype(np.float64)
+        dangling = out_degree == 0
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+        transition_t = graph.adjacency_transpose()
+        p = np.full(n, 1.0 / n)
+
+        x = p.copy() if start is None else start / start.sum()
+        for _ in range(self.max_iter):
+            graph.raise_if_cancelled()
+            x_last = x
+            x = self.alpha * (transition_t @ (x * inverse_degree) + x[dangling].sum() * p) + (1 - self.alpha) * p
+            if np.abs(x - x_last).sum() < n * self.tol:
+                return x
+        raise nx.PowerIterationFailedConvergence(self.max_iter)
+
+class _HITSStrategy(GraphAnalysisStrategy):
+    """
+    Hub and authority scores through power iteration on A^T A, normalized to sum 1 like nx.hits.
+    """
+
+    warm_start = True
+
+    def __init__(self, tol: float = 1.0e-8, max_iter: int = 1000):
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def hits(self, graph: CSRGraph, start: Optional[np.ndarray] = None):
         """
-        Calculates degree centrality for a given graph.
+        (hubs, authorities); `start` seeds the authority vector.
         """
-        return nx.degree_centrality(graph)
+        n = graph.node_count
+        if n == 0:
+            return np.zeros(0), np.zeros(0)
+        adjacency = graph.adjacency()
+        adjacency_t = graph.adjacency_transpose()
+        authorities = np.full(n, 1.0 / n)
+        if start is not None and start.sum() > 0:
+            authorities = start / start.sum()
+        for _ in range(self.max_iter):
+            graph.raise_if_cancelled()
+            last = authorities
+            authorities = adjacency_t @ (adjacency @ authorities)
+            total = authorities.sum()
+            if total == 0:
+                break # No edges: every score is zero
+            authorities /= total
+            if np.abs(authorities - last).sum() < n * self.tol:
+                break
+        else:
+            raise nx.PowerIterationFailedConvergence(self.max_iter)
+        hubs = adjacency @ authorities
+        if hubs.sum() > 0:
+            hubs /= hubs.sum()
+        return hubs, authorities
+
+class HITSHubStrategy(_HITSStrategy):
+    output_key = "hits_hub"
+
+    def compute(self, graph: CSRGraph, start: Optional[np.ndarray] = None) -> np.ndarray:
+        if start is not None:
+            start = graph.adjacency_transpose() @ start # Authorities implied by the previous hubs
+        return self.hits(graph, start)[0]
+
+class HITSAuthorityStrategy(_HITSStrategy):
+    output_key = "hits_authority"
+
+    def compute(self, graph: CSRGraph, start: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.hits(graph, start)[1]
+
+class BetweennessCentralityStrategy(GraphAnalysisStrategy):
+    """
+    Normalized betweenness centrality (Brandes), run for a batch of BFS sources at
+    once as sparse matrix products. Graphs with more than `max_sources` nodes use
+    that many sampled sources, chosen and rescaled exactly as
+    nx.betweenness_centrality(G, k=max_sources, seed=seed) does. At least two
+    sources are needed: with one, the sampled node's own score cannot be rescaled.
+    """
+
+    output_key = "betweenness_centrality"
+    BATCH_CELLS = 4_000_000 # Upper bound for nodes x sources in one batch
+
+    def __init__(self, max_sources: Optional[int] = 256, seed: Optional[int] = 0):
+        if max_sources is not None and max_sources < 2:
+            raise ValueError(f"max_sources must be at least 2 (or None for exact betweenness), got {max_sources}.")
+        self.max_sources = max_sources
+        self.seed = seed
+
+    def compute(self, graph: CSRGraph) -> np.ndarray:
+        n = graph.node_count
+        betweenness = np.zeros(n)
+        if n <= 2:
+            return betweenness
+
+        sources = None
+        if self.max_sources is not None and self.max_sources < n:
+            # Sampling positions picks the same nodes as sampling the node list, without needing the ids
+            sources = np.array(random.Random(self.seed).sample(range(n), self.max_sources), dtype=np.int64)
+        all_sources = np.arange(n) if sources is None else sources
+
+        batch_size = max(1, min(len(all_sources), self.BATCH_CELLS // n))
+        for start in range(0, len(all_sources), batch_size):
+            graph.raise_if_cancelled()
+            betweenness += self._accumulate(graph, all_sources[start:start + batch_size])
+
+        if sources is None:
+            return betweenness / ((n - 1) * (n - 2))
+        k = len(sources)
+        scale = np.full(n, 1.0 / (k * (n - 2)))
+        scale[sources] = 1.0 / ((k - 1) * (n - 2))
+        return betweenness * scale
+
+    @staticmethod
+    def _accumulate(graph: CSRGraph, sources: np.ndarray) -> np.ndarray:
+        """
+        Dependency sums of one batch of sources; column j of every matrix belongs to sources[j].
+        """
+        n = graph.node_count
+        batch = len(sources)
+        columns = np.arange(batch)
+        adjacency = graph.adjacency()
+        adjacency_t = graph.adjacency_transpose()
+
+        distance = np.full((n, batch), -1, dtype=np.int32)
+        sigma = np.zeros((n, batch)) # Number of shortest paths from the source
+        distance[sources, columns] = 0
+        sigma[sources, columns] = 1.0
+
+        # Forward: level-synchronous BFS, counting shortest paths
+        frontier = sigma.copy()
+        level = 0
+        while True:
+            reached = adjacency_t @ frontier
+            new = (reached > 0) & (distance < 0)
+            if not new.any():
+                break
+            level += 1
+            distance[new] = level
+            sigma[new] = reached[new]
+            frontier = np.where(new, sigma, 0.0)
+
+        # Backward: accumulate dependencies from the deepest level up
+        delta = np.zeros((n, batch))
+        for depth in range(level - 1, -1, -1):
+            below = distance == depth + 1
+            coefficient = np.divide(1.0 + delta, sigma, out=np.zeros((n, batch)), where=below)
+            contribution = adjacency @ coefficient
+            at_depth = distance == depth
+            delta[at_depth] += sigma[at_depth] * contribution[at_depth]
+
+        delta[sources, columns] = 0.0 # The source is an endpoint of its own paths
+        return delta.sum(axis=1)
+
+# Strategies selectable by name, e.g. through the "metrics" query parameter of /api/explore
+STRATEGIES = {
+    "degree": DegreeCentralityStrategy,
+    "in_degree": InDegreeCentralityStrategy,
+    "out_degree": OutDegreeCentralityStrategy,
+    "pagerank": PageRankStrategy,
+    "hits_hub": HITSHubStrategy,
+    "hits_authority": HITSAuthorityStrategy,
+    "betweenness": BetweennessCentralityStrategy,
+}
+
+def strategies_from_metrics(metrics: str) -> List[GraphAnalysisStrategy]:
+    """
+    Strategies for a comma-separated list of STRATEGIES names; ValueError on unknown or empty lists.
+    """
+    names = [name.strip() for name in metrics.split(",") if name.strip()]
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown or not names:
+        raise ValueError(f"Unknown metrics {unknown}, expected some of {sorted(STRATEGIES)}.")
+    return [STRATEGIES[name]() for name in dict.fromkeys(names)]
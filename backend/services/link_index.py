@@ -0,0 +1,234 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024 # 64 MB
+DEFAULT_TTL = 900 # Seconds, like the article cache: links change as articles are edited
+LOW_WATER = 0.9 # Eviction frees down to this fraction of max_bytes, so compactions are spaced out
+
+_ROW_OVERHEAD = 150 # ndarray header, tuple and LRU entry of one article's row
+_TITLE_OVERHEAD = 104 # List slot, dict entry and reference count of one interned title, on top of the str itself
+_REDIRECT_OVERHEAD = 100 # Dict entry of one redirect
+
+
+class LinkIndex:
+    """
+    App-wide index of the outgoing links of every article crawled so far.
+    Titles are interned to int ids once; each article's links are one int32
+    array of ids (4 bytes per link), kept in the order they were put. Redirects
+    map a title to the article it resolves to, so both find the same row.
+
+    Each title counts the rows and redirects that refer to it. Rows expire after
+    `ttl` and are evicted least recently used once rows and live titles pass
+    `max_bytes`, down to LOW_WATER of it; titles nothing refers to any more go
+    with them. Their memory is reclaimed by compacting the intern table, which
+    only runs when dead titles outgrow the slack eviction left, so each
+    compaction frees a sizeable share of the budget.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._titles: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._refs = np.zeros(0, dtype=np.int32) # title id -> rows and redirects that refer to it
+        self._rows: "OrderedDict[int, Tuple[np.ndarray, float]]" = OrderedDict() # source id -> (link ids, expires_at)
+        self._redirects: Dict[int, int] = {} # title id -> id of the title it redirects to
+        self._row_bytes = 0 # Rows and redirects
+        self._title_bytes = 0 # Every interned title, live or dead
+        self._dead: set = set() # Ids of the titles no row or redirect refers to, until the next compaction
+        self._dead_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.compactions = 0
+
+    def _intern(self, title: str) -> int:
+        title_id = self._ids.get(title)
+        if title_id is None:
+            title_id = len(self._titles)
+            self._titles.append(title)
+            self._ids[title] = title_id
+            self._title_bytes += self._title_cost(title_id)
+        return title_id
+
+    def _title_cost(self, title_id: int) -> int:
+        return sys.getsizeof(self._titles[title_id]) + _TITLE_OVERHEAD
+
+    def _ref(self, ids: np.ndarray):
+        """
+        Count one more reference to each of `ids`; dead titles among them come back.
+        """
+        if len(self._refs) < len(self._titles):
+            grown = np.zeros(max(len(self._titles), 2 * len(self._refs)), dtype=np.int32)
+            grown[:len(self._refs)] = self._refs
+            self._refs = grown
+        unreferenced = np.unique(ids[self._refs[ids] == 0]).tolist() # Dead, or interned by this put
+        np.add.at(self._refs, ids, 1)
+        for title_id in unreferenced:
+            if title_id in self._dead:
+                self._dead.discard(title_id)
+                self._dead_bytes -= self._title_cost(title_id)
+
+    def _unref(self, ids: np.ndarray):
+        np.subtract.at(self._refs, ids, 1)
+        for title_id in np.unique(ids[self._refs[ids] == 0]).tolist():
+            self._dead.add(title_id)
+            self._dead_bytes += self._title_cost(title_id)
+
+    def _drop_row(self, source: int, row: np.ndarray):
+        """
+        Release a row already taken out of self._rows.
+        """
+        self._unref(np.append(row, source))
+        self._row_bytes -= row.nbytes + _ROW_OVERHEAD
+
+    def _drop_redirect(self, alias: int):
+        target = self._redirects.pop(alias)
+        self._unref(np.array([alias, target], dtype=np.int32))
+        self._row_bytes -= _REDIRECT_OVERHEAD
+
+    def put(self, links_by_title: Dict[str, Iterable[str]], redirects: Optional[Dict[str, str]] = None):
+        """
+        Store (or replace) the links of each article, and the redirects (title -> title it resolves to) that lead to them.
+        """
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for title, links in links_by_title.items():
+                source = self._intern(title)
+                row = np.fromiter((self._intern(link) for link in links), dtype=np.int32)
+                self._ref(np.append(row, source)) # Before releasing the old row, so shared titles never look dead
+                previous = self._rows.pop(source, None)
+                if previous is not None:
+                    self._drop_row(source, previous[0])
+                if source in self._redirects: # No longer a redirect
+                    self._drop_redirect(source)
+                self._rows[source] = (row, expires_at)
+                self._row_bytes += row.nbytes + _ROW_OVERHEAD
+            for title, target in (redirects or {}).items():
+                if title == target:
+                    continue
+                alias, target_id = self._intern(title), self._intern(target)
+                self._ref(np.array([alias, target_id], dtype=np.int32))
+                if alias in self._redirects:
+                    self._drop_redirect(alias)
+                previous = self._rows.pop(alias, None)
+                if previous is not None: # Now a redirect
+                    self._drop_row(alias, previous[0])
+                self._redirects[alias] = target_id
+                self._row_bytes += _REDIRECT_OVERHEAD
+            self._evict()
+
+    def get_links(self, titles: Iterable[str], limit: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        {title: its first `limit` links (all when None)} for the titles in the
+        index. Only the titles returned are materialized; the rest stay as ids.
+        """
+        return {title: links for title, (links, _) in self.get_resolved_links(titles, limit).items()}
+
+    def get_resolved_links(self, titles: Iterable[str], limit: Optional[int] = None) -> Dict[str, Tuple[List[str], str]]:
+        """
+        get_links with the title each one resolves to: itself, or the target of its redirect.
+        """
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for title in titles:
+                title_id = self._ids.get(title)
+                source = self._redirects.get(title_id, title_id)
+                entry = self._rows.get(source) if source is not None else None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                row, expires_at = entry
+                if expires_at <= now:
+                    del self._rows[source]
+                    self._drop_row(source, row)
+                    self.expirations += 1
+                    self.misses += 1
+                    continue
+                self._rows.move_to_end(source)
+                self.hits += 1
+                found[title] = ([self._titles[link] for link in row[:limit].tolist()], self._titles[source])
+        return found
+
+    def _evict(self):
+        if self._row_bytes + self._title_bytes <= self.max_bytes:
+            return
+        low_water = int(self.max_bytes * LOW_WATER)
+        while self._rows and self._row_bytes + self._title_bytes - self._dead_bytes > low_water:
+            source, (row, _) = self._rows.popitem(last=False)
+            self._drop_row(source, row)
+            self.evictions += 1
+        if self._row_bytes + self._title_bytes > self.max_bytes:
+            self._compact()
+
+    def _compact(self):
+        """
+        Rebuild the intern table with only the titles that some row or redirect still refers to, renumbering both.
+        Redirects to evicted rows are dropped first.
+        """
+        dangling = [alias for alias, target in self._redirects.items() if target not in self._rows]
+        for alias in dangling:
+            del self._redirects[alias]
+        self._row_bytes -= len(dangling) * _REDIRECT_OVERHEAD
+
+        refs = np.zeros(len(self._titles), dtype=np.int32)
+        for source, (row, _) in self._rows.items():
+            refs[source] += 1
+            np.add.at(refs, row, 1)
+        for alias, target in self._redirects.items():
+            refs[alias] += 1
+            refs[target] += 1
+        kept = np.flatnonzero(refs)
+        remap = np.full(len(self._titles), -1, dtype=np.int32)
+        remap[kept] = np.arange(len(kept), dtype=np.int32)
+
+        self._titles = [self._titles[title_id] for title_id in kept.tolist()]
+        self._ids = {title: title_id for title_id, title in enumerate(self._titles)}
+        self._refs = refs[kept]
+        self._title_bytes = sum(sys.getsizeof(title) + _TITLE_OVERHEAD for title in self._titles)
+        self._dead.clear()
+        self._dead_bytes = 0
+        self._rows = OrderedDict((int(remap[source]), (remap[row], expires_at))
+                                 for source, (row, expires_at) in self._rows.items())
+        self._redirects = {int(remap[alias]): int(remap[target]) for alias, target in self._redirects.items()}
+        self.compactions += 1
+
+    def clear(self):
+        with self._lock:
+            self._titles = []
+            self._ids = {}
+            self._refs = np.zeros(0, dtype=np.int32)
+            self._rows.clear()
+            self._redirects.clear()
+            self._row_bytes = 0
+            self._title_bytes = 0
+            self._dead.clear()
+            self._dead_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            links = sum(len(row) for row, _ in self._rows.values())
+            return {
+                "articles": len(self._rows),
+                "titles": len(self._titles),
+                "dead_titles": len(self._dead),
+                "redirects": len(self._redirects),
+                "links": links,
+                "bytes": self._row_bytes + self._title_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "compactions": self.compactions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,355 @@
+import contextvars
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0) # Seconds
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+_INF_LABEL = 'le="+Inf"'
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {} # Label values -> bucket counts, then sum and count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, series):
+                    le = 'le="%s"' % _format_value(float(bound))
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, _INF_LABEL)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class RequestTimings:
+    """
+    What one HTTP request spent, per stage, for its Server-Timing header and the per-request histograms.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {} # Stage -> [seconds, count]
+        self.upstream_calls = 0
+        self.upstream_bytes = 0
+        self.neo4j_transactions = 0
+        self.neo4j_queries = 0
+        self._lock = threading.Lock() # Stages may be recorded from worker threads
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            totals = self.stages.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    def add_upstream(self, seconds: float, size: int):
+        self.add("upstream", seconds)
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_bytes += size
+
+    def add_transaction(self, seconds: float, queries: int):
+        self.add("neo4j", seconds)
+        with self._lock:
+            self.neo4j_transactions += 1
+            self.neo4j_queries += queries
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: one entry per stage with its summed duration in ms.
+        Stages that ran concurrently can add up to more than the total.
+        """
+        entries = []
+        with self._lock:
+            for stage, (seconds, _) in self.stages.items():
+                entries.append(f"{stage};dur={seconds * 1000:.1f}")
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+class MetricsRegistry:
+    """
+    In-process Prometheus metrics of the hot paths: stage spans, upstream calls
+    and bytes, Neo4j transactions and queries, and HTTP requests. Rendered in
+    the Prometheus text format by render(), together with any gauges passed in
+    (the stats of the caches, read at scrape time).
+    """
+
+    def __init__(self, server_timing: bool = False):
+        self.server_timing = server_timing
+        self.stage_seconds = Histogram("wikigraph_stage_seconds", "Time spent in each stage of a request.", ("stage",))
+        self.upstream_seconds = Histogram("wikigraph_upstream_request_seconds", "Duration of Wikipedia API attempts.", ("client", "status"))
+        self.upstream_requests = Counter("wikigraph_upstream_requests_total", "Wikipedia API attempts.", ("client", "status"))
+        self.upstream_bytes = Counter("wikigraph_upstream_response_bytes_total", "Bytes received from the Wikipedia API.", ("client",))
+        self.neo4j_seconds = Histogram("wikigraph_neo4j_transaction_seconds", "Duration of Neo4j transactions, retries included.", ("operation",))
+        self.neo4j_queries = Counter("wikigraph_neo4j_queries_total", "Queries run in Neo4j transactions.", ("operation",))
+        self.http_seconds = Histogram("wikigraph_http_request_seconds", "Duration of HTTP requests.", ("method", "route", "status"))
+        self.request_upstream_calls = Histogram("wikigraph_request_upstream_calls", "Wikipedia API attempts per HTTP request.",
+                                                ("route",), COUNT_BUCKETS)
+        self.request_neo4j_queries = Histogram("wikigraph_request_neo4j_queries", "Neo4j queries per HTTP request.",
+                                               ("route",), COUNT_BUCKETS)
+
+    def observe_request(self, timings: RequestTimings, method: str, route: str, status: int):
+        self.http_seconds.observe(time.perf_counter() - timings.started, method=method, route=route, status=status)
+        self.request_upstream_calls.observe(timings.upstream_calls, route=route)
+        self.request_neo4j_queries.observe(timings.neo4j_queries, route=route)
+
+    def render(self, gauges: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        lines = []
+        for metric in (self.stage_seconds, self.upstream_seconds, self.upstream_requests, self.upstream_bytes,
+                       self.neo4j_seconds, self.neo4j_queries, self.http_seconds, self.request_upstream_calls,
+                       self.request_neo4j_queries):
+            lines.extend(metric.render())
+        for component, stats in (gauges or {}).items():
+            for stat, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"wikigraph_{component}_{stat}"
+                lines.extend([f"# TYPE {name} gauge", f"{name} {_format_value(value)}"])
+        return "\n".join(lines) + "\n"
+
+
+# The active registry, set at startup; None keeps every hook below a no-op
+_registry: Optional[MetricsRegistry] = None
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+def activate(registry: Optional[MetricsRegistry]):
+    global _registry
+    _registry = registry
+
+def active() -> Optional[MetricsRegistry]:
+    return _registry
+
+def start_request() -> Tuple[RequestTimings, contextvars.Token]:
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+def end_request(token: contextvars.Token):
+    _current.reset(token)
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_stage(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(stage: str):
+    """
+    Context manager timing one stage. A shared no-op when metrics are disabled.
+    """
+    return _NULL_SPAN if _registry is None else _Span(stage)
+
+def observe_stage(stage: str, seconds: float):
+    registry = _registry
+    if registry is None:
+        return
+    registry.stage_seconds.observe(seconds, stage=stage)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+def record_upstream(client: str, status: Any, seconds: float, size: int):
+    """
+    One attempt against the Wikipedia API; `status` is the HTTP status or "error".
+    """
+    registry = _registry
+    if registry is None:
+        return
+    registry.upstream_seconds.observe(seconds, client=client, status=status)
+    registry.upstream_requests.inc(client=client, status=status)
+    registry.upstream_bytes.inc(size, client=client)
+    timings = _current.get()
+    if timings is not None:
+        timings.add_upstream(seconds, size)
+
+
+class _CountingTransaction:
+    """
+    A transaction that counts the queries run through it.
+    """
+
+    def __init__(self, tx, counter: List[int]):
+        self._tx = tx
+        self._counter = counter
+
+    def run(self, *args, **kwargs):
+        self._counter[0] += 1
+        return self._tx.run(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+
+class _InstrumentedSession:
+    """
+    A Neo4j session whose managed transactions and auto-commit queries are timed and counted.
+    """
+
+    def __init__(self, session, operation: str):
+        self._session = session
+        self._operation = operation
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._session.__exit__(*exc)
+
+    def execute_read(self, work: Callable, *args, **kwargs):
+        return self._execute(self._session.execute_read, work, *args, **kwargs)
+
+    def execute_write(self, work: Callable, *args, **kwargs):
+        return self._execute(self._session.execute_write, work, *args, **kwargs)
+
+    def _execute(self, execute: Callable, work: Callable, *args, **kwargs):
+        counter = [0]
+        started = time.perf_counter()
+        try:
+            return execute(lambda tx, *a, **kw: work(_CountingTransaction(tx, counter), *a, **kw), *args, **kwargs)
+        finally:
+            _record_transaction(self._operation, time.perf_counter() - started, counter[0])
+
+    def run(self, *args, **kwargs):
+        _record_transaction(self._operation, 0.0, 1) # Auto-commit: the records are read later, by the caller
+        return self._session.run(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+def instrument_session(session, operation: str):
+    """
+    `session` itself when metrics are disabled, otherwise a wrapper recording its transactions.
+    """
+    return session if _registry is None else _InstrumentedSession(session, operation)
+
+def _record_transaction(operation: str, seconds: float, queries: int):
+    registry = _registry
+    if registry is None:
+        return
+    registry.neo4j_seconds.observe(seconds, operation=operation)
+    registry.neo4j_queries.inc(queries, operation=operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.add_transaction(seconds, queries)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware giving each HTTP request its RequestTimings, recording its
+    duration and, if enabled, adding a Server-Timing header. With metrics disabled
+    it only forwards the call. For streamed responses the header covers the work
+    done before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        registry = _registry
+        if registry is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        status = 500
+
+        async def send_with_timings(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if registry.server_timing:
+                    headers = list(message.get("headers", [])) + [(b"server-timing", timings.server_timing().encode("latin-1"))]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            end_request(token)
+            route = getattr(scope.get("route"), "path", "unmatched") # The template, not the raw path
+            registry.observe_request(timings, scope["method"], route, status)
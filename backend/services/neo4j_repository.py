@@ -1,51 +1,356 @@
+import base64
+import contextvars
 import os
+import queue
+import threading
 from neo4j import GraphDatabase, Driver # Import Driver for type hinting
 import json
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional
 from uuid import uuid4
+from services import metrics
+
+DEFAULT_WRITE_BATCH_SIZE = 1000 # Rows per UNWIND statement
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+DEFAULT_STREAM_BUFFER = 256 # Records read ahead of a slow consumer
+
+UPSERT_NODES_QUERY = """
+    MATCH (e:Exploration {id: $exploration_id})
+    UNWIND $nodes AS node
+    MERGE (gn:GraphNode {id: node.id})
+    SET gn.label = node.label, gn.summary = node.summary, gn.degree_centrality = node.degree_centrality
+    MERGE (e)-[:CONTAINS_NODE]->(gn)
+    """
+
+# A LINKS_TO is shared by the explorations listed in its `explorations` property;
+# an exploration's edges are the ones that list it, between nodes it contains.
+MERGE_EDGES_QUERY = """
+    UNWIND $edges AS edge
+    MATCH (from_node:GraphNode {id: edge.from})
+    MATCH (to_node:GraphNode {id: edge.to})
+    MERGE (from_node)-[l:LINKS_TO]->(to_node)
+    SET l.explorations = CASE
+            WHEN $exploration_id IN coalesce(l.explorations, []) THEN l.explorations
+            ELSE coalesce(l.explorations, []) + $exploration_id
+        END
+    """
+
+LIST_EXPLORATIONS_QUERY = """
+    MATCH (e:Exploration)
+    WHERE $cursor_created_at IS NULL
+       OR e.created_at < datetime($cursor_created_at)
+       OR (e.created_at = datetime($cursor_created_at) AND e.id < $cursor_id)
+    RETURN e.id AS id, e.name AS name, e.node_count AS node_count, e.edge_count AS edge_count,
+           toString(e.created_at) AS created_at
+    ORDER BY e.created_at DESC, e.id DESC
+    LIMIT $limit
+    """
+
+GET_EXPLORATION_QUERY = """
+    MATCH (e:Exploration {id: $id})
+    CALL {
+        WITH e
+        OPTIONAL MATCH (e)-[:CONTAINS_NODE]->(gn:GraphNode)
+        RETURN COLLECT(gn {.id, .label, .degree_centrality,
+                           summary: CASE WHEN $include_summaries THEN gn.summary ELSE null END}) AS nodes
+    }
+    CALL {
+        WITH e
+        OPTIONAL MATCH (e)-[:CONTAINS_NODE]->(a:GraphNode)-[l:LINKS_TO]->(b:GraphNode)<-[:CONTAINS_NODE]-(e)
+        WHERE e.id IN l.explorations
+        RETURN COLLECT({from: a.id, to: b.id}) AS edges
+    }
+    RETURN e.id AS id, e.name AS name, nodes, edges
+    """
+
+# One row per exploration, node and edge, in that order for each exploration.
+# UNION ALL keeps the rows streaming; UNION would have to collect them to dedupe.
+EXPORT_QUERY = """
+    MATCH (e:Exploration)
+    CALL {
+        WITH e
+        RETURN 'exploration' AS type,
+               e {.id, .name, .node_count, .edge_count, created_at: toString(e.created_at)} AS data
+        UNION ALL
+        WITH e
+        MATCH (e)-[:CONTAINS_NODE]->(gn:GraphNode)
+        RETURN 'node' AS type,
+               gn {exploration_id: e.id, .id, .label, .summary, .degree_centrality} AS data
+        UNION ALL
+        WITH e
+        MATCH (e)-[:CONTAINS_NODE]->(a:GraphNode)-[l:LINKS_TO]->(b:GraphNode)<-[:CONTAINS_NODE]-(e)
+        WHERE e.id IN l.explorations
+        RETURN 'edge' AS type, {exploration_id: e.id, from: a.id, to: b.id} AS data
+    }
+    RETURN type, data
+    """
+
+# An import replaces the graph of an exploration with the same id: the old
+# nodes and edges leave it first, the way REMOVE_NODES_QUERY removes them
+CLEAR_EXPLORATION_GRAPH_QUERY = """
+    MATCH (e:Exploration {id: $exploration_id})-[r:CONTAINS_NODE]->(gn:GraphNode)
+    DELETE r
+    WITH gn
+    CALL {
+        WITH gn
+        MATCH (gn)-[l:LINKS_TO]-(:GraphNode)
+        WHERE $exploration_id IN l.explorations
+        SET l.explorations = [other IN l.explorations WHERE other <> $exploration_id]
+        WITH l WHERE size(l.explorations) = 0
+        DELETE l
+    }
+    """
+
+IMPORT_EXPLORATION_QUERY = """
+    MERGE (e:Exploration {id: $id})
+    SET e.name = $name,
+        e.created_at = CASE WHEN $created_at IS NULL THEN datetime() ELSE datetime($created_at) END,
+        e.node_count = $node_count,
+        e.edge_count = $edge_count
+    """
+
+# --- Partial updates of a saved exploration ---
+
+PATCH_EXPLORATION_QUERY = """
+    MATCH (e:Exploration {id: $id})
+    SET e.name = coalesce($name, e.name)
+    RETURN e.name AS name, e.node_count AS node_count, e.edge_count AS edge_count
+    """
+
+# Removals only drop this exploration's membership, so other explorations are
+# unchanged. A LINKS_TO that no exploration lists any more is deleted; the
+# GraphNode stays.
+REMOVE_EDGES_QUERY = """
+    UNWIND $edges AS edge
+    MATCH (:GraphNode {id: edge.from})-[l:LINKS_TO]->(:GraphNode {id: edge.to})
+    WHERE $exploration_id IN l.explorations
+    SET l.explorations = [other IN l.explorations WHERE other <> $exploration_id]
+    WITH l WHERE size(l.explorations) = 0
+    DELETE l
+    """
+
+# The edges of a removed node leave the exploration with it
+REMOVE_NODES_QUERY = """
+    MATCH (e:Exploration {id: $exploration_id})
+    UNWIND $ids AS id
+    MATCH (e)-[r:CONTAINS_NODE]->(gn:GraphNode {id: id})
+    DELETE r
+    WITH gn
+    CALL {
+        WITH gn
+        MATCH (gn)-[l:LINKS_TO]-(:GraphNode)
+        WHERE $exploration_id IN l.explorations
+        SET l.explorations = [other IN l.explorations WHERE other <> $exploration_id]
+        WITH l WHERE size(l.explorations) = 0
+        DELETE l
+    }
+    """
+
+REFRESH_COUNTS_QUERY = """
+    MATCH (e:Exploration {id: $id})
+    CALL {
+        WITH e
+        OPTIONAL MATCH (e)-[:CONTAINS_NODE]->(gn:GraphNode)
+        RETURN count(gn) AS node_count
+    }
+    CALL {
+        WITH e
+        OPTIONAL MATCH (e)-[:CONTAINS_NODE]->(:GraphNode)-[l:LINKS_TO]->(:GraphNode)<-[:CONTAINS_NODE]-(e)
+        WHERE e.id IN l.explorations
+        RETURN count(l) AS edge_count
+    }
+    SET e.node_count = node_count, e.edge_count = edge_count
+    RETURN node_count, edge_count
+    """
+
+# --- Fetched articles as a crawl cache (StoredGraphCache) ---
+
+# The cache lives in its own CachedArticle nodes, keyed by title: only what was
+# fetched from Wikipedia is stored there, and articles no exploration contains
+# never become GraphNodes. A redirect is a CachedArticle whose `redirects_to`
+# names the article it resolves to; its links are read from that article.
+# Summaries and links are only returned while younger than $max_age seconds; a
+# missing timestamp counts as stale.
+GET_STORED_ARTICLES_QUERY = """
+    UNWIND $titles AS title
+    MATCH (requested:CachedArticle {title: title})
+    OPTIONAL MATCH (target:CachedArticle {title: requested.redirects_to})
+    WITH title, requested, coalesce(target, requested) AS article, datetime() - duration({seconds: $max_age}) AS fresh_after
+    RETURN title AS id,
+           article.title AS title,
+           CASE WHEN requested.summary_fetched_at >= fresh_after THEN requested.summary END AS summary,
+           CASE WHEN requested.links_fetched_at >= fresh_after AND article.links_fetched_at >= fresh_after
+                THEN article.out_links END AS links
+    """
+
+STORE_SUMMARIES_QUERY = """
+    UNWIND $articles AS article
+    MERGE (ca:CachedArticle {title: article.title})
+    SET ca.summary = article.summary, ca.summary_fetched_at = datetime()
+    """
+
+# The full link list of the article, not only the links kept in an exploration (LINKS_TO)
+STORE_LINKS_QUERY = """
+    UNWIND $articles AS article
+    MERGE (ca:CachedArticle {title: article.title})
+    SET ca.out_links = article.links, ca.links_fetched_at = datetime(), ca.redirects_to = null
+    """
+
+STORE_REDIRECTS_QUERY = """
+    UNWIND $redirects AS redirect
+    MERGE (ca:CachedArticle {title: redirect.title})
+    SET ca.redirects_to = redirect.target, ca.links_fetched_at = datetime(), ca.out_links = null
+    """
+
+# --- Queries over the accumulated graph (/api/graph) ---
+
+# The upper bound of a variable-length pattern cannot be a parameter; callers
+# format in an int they have already range-checked.
+SHORTEST_PATH_QUERY = """
+    MATCH (source:GraphNode {id: $source}), (target:GraphNode {id: $target})
+    MATCH path = shortestPath((source)-[:LINKS_TO*..%d]->(target))
+    UNWIND range(0, length(path)) AS position
+    WITH position, nodes(path)[position] AS gn
+    RETURN position, gn {.id, .label, .degree_centrality} AS node
+    ORDER BY position
+    """
+
+GET_NODE_QUERY = "MATCH (gn:GraphNode {id: $id}) RETURN gn {.id, .label, .degree_centrality} AS node"
+
+# One breadth-first level: the unseen neighbours of a frontier. Ordered so that
+# a retried transaction returns the same rows.
+NEIGHBOURHOOD_STEP_QUERY = """
+    UNWIND $frontier AS frontier_id
+    MATCH (:GraphNode {id: frontier_id})%s(gn:GraphNode)
+    WHERE NOT gn.id IN $seen
+    RETURN DISTINCT gn {.id, .label, .degree_centrality} AS node
+    ORDER BY node.id
+    LIMIT $limit
+    """
+
+NEIGHBOURHOOD_PATTERNS = {
+    "out": "-[:LINKS_TO]->",
+    "in": "<-[:LINKS_TO]-",
+    "both": "-[:LINKS_TO]-",
+}
+
+# Score expression per metric accepted by top_nodes
+TOP_NODE_METRICS = {
+    "degree_centrality": "gn.degree_centrality", # Stored by the last saved exploration that contained the node
+    "in_links": "COUNT { (gn)<-[:LINKS_TO]-(:GraphNode) }",
+    "out_links": "COUNT { (gn)-[:LINKS_TO]->(:GraphNode) }",
+    "explorations": "COUNT { (gn)<-[:CONTAINS_NODE]-(:Exploration) }",
+}
+
+TOP_NODES_QUERY = """
+    MATCH (gn:GraphNode)
+    WITH gn, %s AS score
+    WHERE score IS NOT NULL
+    RETURN gn {.id, .label, score: score} AS node
+    ORDER BY score DESC, gn.id
+    LIMIT $limit
+    """
+
+_STREAM_END = object()
+
+class _StreamClosed(Exception):
+    """
+    The consumer stopped reading; aborts the transaction that feeds it.
+    """
+
+def _encode_cursor(created_at: str, exploration_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, exploration_id]).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str):
+    """
+    Inverse of _encode_cursor. Raises ValueError for anything that is not one of our cursors.
+    """
+    try:
+        created_at, exploration_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(created_at, str) or not isinstance(exploration_id, str):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return created_at, exploration_id
+
+def _node_params(node_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": node_data['id'],
+        "label": node_data.get('label'),
+        "summary": node_data.get('summary'),
+        "degree_centrality": node_data.get('degree_centrality'),
+    }
+
+def _edge_params(edge_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"from": edge_data['from'], "to": edge_data['to']}
+
+def diff_graph(stored: Dict[str, Any], nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    The changes that turn a stored exploration into the graph `nodes`/`edges`:
+    nodes that are new or whose values changed, ids of the nodes to remove, and
+    the edges to add and remove.
+    """
+    stored_nodes = {node["id"]: _node_params(node) for node in stored["nodes"]}
+    node_ids = {node["id"] for node in nodes}
+    stored_edges = {(edge["from"], edge["to"]) for edge in stored["edges"]}
+    edge_keys = {(edge["from"], edge["to"]) for edge in edges}
+    return {
+        "add_nodes": [node for node in nodes if stored_nodes.get(node["id"]) != _node_params(node)],
+        "remove_nodes": [node_id for node_id in stored_nodes if node_id not in node_ids],
+        "add_edges": [{"from": source, "to": target} for source, target in edge_keys - stored_edges],
+        "remove_edges": [{"from": source, "to": target} for source, target in stored_edges - edge_keys],
+    }
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int, to_params: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield UNWIND parameter lists of at most `size` rows, building each one only when it is sent.
+    """
+    batch = []
+    for row in rows:
+        batch.append(to_params(row))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 class Neo4jRepository:
     def __init__(self, driver: Driver): # Accept driver as parameter
         self._driver = driver
         self._database = os.getenv("NEO4J_DATABASE", "neo4j") # Still get database name from env
+        self._write_batch_size = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", str(DEFAULT_WRITE_BATCH_SIZE)))
 
     # Removed close() method
 
+    @property
+    def write_batch_size(self) -> int:
+        return self._write_batch_size
+
+    def _session(self, operation: str, **kwargs):
+        """
+        A session on the configured database; with metrics enabled, its transactions are timed and counted under `operation`.
+        """
+        return metrics.instrument_session(self._driver.session(database=self._database, **kwargs), operation)
+
     def save_exploration(self, name: str, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[str, Any]:
         exploration_id = str(uuid4())
+        batch_size = self._write_batch_size
 
         def _create_exploration_tx(tx, exploration_id, name, nodes, edges):
-            # 1. Create the main Exploration node
-            tx.run("CREATE (e:Exploration {id: $id, name: $name})", id=exploration_id, name=name)
-
-            # 2. Create GraphNodes and link them to Exploration
-            for node_data in nodes:
-                tx.run("""
-                    MERGE (gn:GraphNode {id: $node_id})
-                    ON CREATE SET gn.label = $label, gn.summary = $summary, gn.degree_centrality = $degree_centrality
-                    ON MATCH SET gn.label = $label, gn.summary = $summary, gn.degree_centrality = $degree_centrality
-                    WITH gn
-                    MATCH (e:Exploration {id: $exploration_id})
-                    MERGE (e)-[:CONTAINS_NODE]->(gn)
-                    """,
-                    node_id=node_data['id'],
-                    label=node_data.get('label'),
-                    summary=node_data.get('summary'),
-                    degree_centrality=node_data.get('degree_centrality'),
-                    exploration_id=exploration_id
-                )
-
-            # 3. Create relationships between GraphNodes
-            for edge_data in edges:
-                tx.run("""
-                    MATCH (from_node:GraphNode {id: $from_id})
-                    MATCH (to_node:GraphNode {id: $to_id})
-                    MERGE (from_node)-[:LINKS_TO]->(to_node)
-                    """,
-                    from_id=edge_data['from'],
-                    to_id=edge_data['to']
-                )
-            
+            # 1. Create the main Exploration node, with the metadata the listing reads
+            tx.run(
+                "CREATE (e:Exploration {id: $id, name: $name, created_at: datetime(), node_count: $node_count, edge_count: $edge_count})",
+                id=exploration_id, name=name, node_count=len(nodes), edge_count=len(edges)
+            )
+
+            # 2. Upsert GraphNodes and link them to the Exploration, one UNWIND per batch
+            for batch in _batches(nodes, batch_size, _node_params):
+                tx.run(UPSERT_NODES_QUERY, nodes=batch, exploration_id=exploration_id)
+
+            # 3. Create relationships between GraphNodes, one UNWIND per batch
+            for batch in _batches(edges, batch_size, _edge_params):
+                tx.run(MERGE_EDGES_QUERY, edges=batch, exploration_id=exploration_id)
+
             # Return the created exploration details
             return {
                 "id": exploration_id,
@@ -54,34 +359,153 @@ class Neo4jRepository:
                 "edges": edges
             }
 
-        with self._driver.session(database=self._database) as session:
-            return session.write_transaction(_create_exploration_tx, exploration_id, name, nodes, edges)
+        with self._session("save_exploration") as session:
+            return session.execute_write(_create_exploration_tx, exploration_id, name, nodes, edges)
 
-    def get_all_explorations(self) -> List[Dict[str, Any]]:
-        query = """
-        MATCH (e:Exploration)
-        OPTIONAL MATCH (e)-[:CONTAINS_NODE]->(gn:GraphNode)
-        OPTIONAL MATCH (gn)-[r:LINKS_TO]->(gn2:GraphNode)
-        RETURN e.id AS id, e.name AS name,
-               COLLECT(DISTINCT {id: gn.id, label: gn.label, summary: gn.summary, degree_centrality: gn.degree_centrality}) AS nodes,
-               COLLECT(DISTINCT {from: gn.id, to: gn2.id}) AS edges
-        """
-        with self._driver.session(database=self._database) as session:
-            results = session.read_transaction(lambda tx: tx.run(query).data())
-            
-            parsed_results = []
-            for record in results:
-                # Filter out null nodes/edges if no graph data is associated
-                nodes = [n for n in record["nodes"] if n['id'] is not None]
-                edges = [e for e in record["edges"] if e['from'] is not None and e['to'] is not None]
-                
-                parsed_results.append({
-                    "id": record["id"],
-                    "name": record["name"],
-                    "nodes": nodes,
-                    "edges": edges
-                })
-            return parsed_results
+    def list_explorations(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of exploration metadata, newest first. Only Exploration properties
+        are read, so the cost does not depend on the size of the stored graphs.
+        """
+        cursor_created_at, cursor_id = _decode_cursor(cursor) if cursor else (None, None)
+
+        def _list_tx(tx):
+            return tx.run(
+                LIST_EXPLORATIONS_QUERY,
+                cursor_created_at=cursor_created_at,
+                cursor_id=cursor_id,
+                limit=limit + 1, # One extra row tells whether there is a next page
+            ).data()
+
+        with self._session("list_explorations") as session:
+            records = session.execute_read(_list_tx)
+
+        items = records[:limit]
+        next_cursor = _encode_cursor(items[-1]["created_at"], items[-1]["id"]) if len(records) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def get_exploration(self, exploration_id: str, include_summaries: bool = True) -> Optional[Dict[str, Any]]:
+        with self._session("get_exploration") as session:
+            record = session.execute_read(
+                lambda tx: tx.run(GET_EXPLORATION_QUERY, id=exploration_id, include_summaries=include_summaries).single()
+            )
+        if record is None:
+            return None
+        return {"id": record["id"], "name": record["name"], "nodes": record["nodes"], "edges": record["edges"]}
+
+    def stream_export(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every exploration, node and edge as a flat record, reading the result
+        record by record. The session stays open until the caller stops iterating.
+        """
+        with self._session("export", fetch_size=self._write_batch_size) as session:
+            for record in session.run(EXPORT_QUERY):
+                yield {"type": record["type"], **record["data"]}
+
+    def import_exploration(self, exploration: Dict[str, Any]):
+        """
+        Create or overwrite the Exploration node of an imported record, keeping its id.
+        An exploration it overwrites loses its nodes and edges; the import's own follow.
+        """
+        def _import_exploration_tx(tx):
+            tx.run(CLEAR_EXPLORATION_GRAPH_QUERY, exploration_id=exploration["id"]).consume()
+            tx.run(
+                IMPORT_EXPLORATION_QUERY,
+                id=exploration["id"],
+                name=exploration["name"],
+                created_at=exploration.get("created_at"),
+                node_count=exploration.get("node_count"),
+                edge_count=exploration.get("edge_count"),
+            ).consume()
+
+        with self._session("import_exploration") as session:
+            session.execute_write(_import_exploration_tx)
+
+    def import_nodes(self, exploration_id: str, nodes: List[Dict[str, Any]]):
+        batch_size = self._write_batch_size
+
+        def _import_nodes_tx(tx):
+            for batch in _batches(nodes, batch_size, _node_params):
+                tx.run(UPSERT_NODES_QUERY, nodes=batch, exploration_id=exploration_id)
+
+        with self._session("import_nodes") as session:
+            session.execute_write(_import_nodes_tx)
+
+    def import_edges(self, exploration_id: str, edges: List[Dict[str, Any]]):
+        batch_size = self._write_batch_size
+
+        def _import_edges_tx(tx):
+            for batch in _batches(edges, batch_size, _edge_params):
+                tx.run(MERGE_EDGES_QUERY, edges=batch, exploration_id=exploration_id)
+
+        with self._session("import_edges") as session:
+            session.execute_write(_import_edges_tx)
+
+    def update_exploration(self, exploration_id: str, name: Optional[str] = None,
+                           add_nodes: List[Dict[str, Any]] = (), remove_nodes: List[str] = (),
+                           add_edges: List[Dict[str, Any]] = (), remove_edges: List[Dict[str, Any]] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Apply a delta to a saved exploration in one transaction: the writes are
+        proportional to the change, not to the size of the graph. Returns what was
+        applied and the new counts, or None when the exploration does not exist.
+        """
+        removed_ids = set(remove_nodes)
+        if any(node["id"] in removed_ids for node in add_nodes):
+            raise ValueError("A node cannot be both added and removed.")
+        removed_edges = {(edge["from"], edge["to"]) for edge in remove_edges}
+        if any((edge["from"], edge["to"]) in removed_edges for edge in add_edges):
+            raise ValueError("An edge cannot be both added and removed.")
+
+        def _update_tx(tx):
+            return self._apply_delta(tx, exploration_id, name, add_nodes, remove_nodes, add_edges, remove_edges)
+
+        with self._session("update_exploration") as session:
+            return session.execute_write(_update_tx)
+
+    def replace_exploration_graph(self, exploration_id: str, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]],
+                                  name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Make a saved exploration hold exactly `nodes` and `edges`, writing only what
+        differs from the stored graph. The diff is computed in the same transaction as the writes.
+        """
+        def _replace_tx(tx):
+            stored = tx.run(GET_EXPLORATION_QUERY, id=exploration_id, include_summaries=True).single()
+            if stored is None:
+                return None
+            delta = diff_graph(stored, nodes, edges)
+            return self._apply_delta(tx, exploration_id, name, **delta)
+
+        with self._session("update_exploration") as session:
+            return session.execute_write(_replace_tx)
+
+    def _apply_delta(self, tx, exploration_id, name, add_nodes, remove_nodes, add_edges, remove_edges) -> Optional[Dict[str, Any]]:
+        record = tx.run(PATCH_EXPLORATION_QUERY, id=exploration_id, name=name).single()
+        if record is None:
+            return None
+        batch_size = self._write_batch_size
+
+        for batch in _batches(remove_edges, batch_size, _edge_params):
+            tx.run(REMOVE_EDGES_QUERY, edges=batch, exploration_id=exploration_id)
+        for batch in _batches(remove_nodes, batch_size, lambda node_id: node_id):
+            tx.run(REMOVE_NODES_QUERY, ids=batch, exploration_id=exploration_id)
+        for batch in _batches(add_nodes, batch_size, _node_params):
+            tx.run(UPSERT_NODES_QUERY, nodes=batch, exploration_id=exploration_id)
+        for batch in _batches(add_edges, batch_size, _edge_params):
+            tx.run(MERGE_EDGES_QUERY, edges=batch, exploration_id=exploration_id)
+
+        counts = {"node_count": record["node_count"], "edge_count": record["edge_count"]}
+        if add_nodes or remove_nodes or add_edges or remove_edges:
+            counts = tx.run(REFRESH_COUNTS_QUERY, id=exploration_id).single()
+        return {
+            "id": exploration_id,
+            "name": record["name"],
+            "node_count": counts["node_count"],
+            "edge_count": counts["edge_count"],
+            "upserted_nodes": len(add_nodes),
+            "removed_nodes": len(remove_nodes),
+            "added_edges": len(add_edges),
+            "removed_edges": len(remove_edges),
+        }
 
     def delete_exploration(self, exploration_id: str) -> bool:
         query = """
@@ -89,6 +513,156 @@ class Neo4jRepository:
         DETACH DELETE e
         RETURN count(e) AS deleted_count
         """
-        with self._driver.session(database=self._database) as session:
-            result = session.write_transaction(lambda tx: tx.run(query, id=exploration_id).single())
+        with self._session("delete_exploration") as session:
+            result = session.execute_write(lambda tx: tx.run(query, id=exploration_id).single())
             return result["deleted_count"] > 0
+
+    # --- Fetched articles as a crawl cache ---
+
+    def get_stored_articles(self, titles: List[str], max_age: float) -> Dict[str, Dict[str, Any]]:
+        """
+        {title: {"title": ..., "summary": ..., "links": [...]}} for the cached articles among `titles`.
+        "title" is the article a redirect resolves to, or the title itself. Summary or
+        links are None when they were never fetched or are older than `max_age` seconds.
+        """
+        def _get_tx(tx):
+            return tx.run(GET_STORED_ARTICLES_QUERY, titles=titles, max_age=int(max_age)).data()
+
+        with self._session("get_stored_articles") as session:
+            records = session.execute_read(_get_tx)
+        return {record["id"]: {"title": record["title"], "summary": record["summary"], "links": record["links"]}
+                for record in records}
+
+    def store_articles(self, summaries: Dict[str, str], links: Dict[str, List[str]],
+                       redirects: Optional[Dict[str, str]] = None):
+        """
+        Write freshly fetched summaries, link lists and redirects (title -> target)
+        to the crawl cache, stamped with the current time.
+        """
+        batch_size = self._write_batch_size
+        summary_rows = [{"title": title, "summary": summary} for title, summary in summaries.items()]
+        link_rows = [{"title": title, "links": list(article_links)} for title, article_links in links.items()]
+        redirect_rows = [{"title": title, "target": target} for title, target in (redirects or {}).items()]
+
+        def _store_tx(tx):
+            for batch in _batches(summary_rows, batch_size, dict):
+                tx.run(STORE_SUMMARIES_QUERY, articles=batch)
+            for batch in _batches(link_rows, batch_size, dict):
+                tx.run(STORE_LINKS_QUERY, articles=batch)
+            for batch in _batches(redirect_rows, batch_size, dict):
+                tx.run(STORE_REDIRECTS_QUERY, redirects=batch)
+
+        with self._session("store_articles") as session:
+            session.execute_write(_store_tx)
+
+    # --- Accumulated graph queries ---
+
+    def _stream_read(self, operation: str, work: Callable[[Any], Iterator[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the records produced by `work(tx)` inside a managed read transaction,
+        as they are read. The transaction runs in a helper thread that hands records
+        over through a bounded queue, since a transaction function cannot yield. If
+        the driver retries the transaction, records already handed over are skipped.
+        """
+        records = queue.Queue(maxsize=DEFAULT_STREAM_BUFFER)
+        closed = threading.Event()
+        sent = 0
+
+        def _put(item):
+            while True:
+                if closed.is_set():
+                    raise _StreamClosed()
+                try:
+                    records.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def _read_tx(tx):
+            nonlocal sent
+            position = 0
+            for record in work(tx):
+                position += 1
+                if position > sent:
+                    _put(record)
+                    sent += 1
+
+        def _produce():
+            try:
+                with self._session(operation) as session:
+                    session.execute_read(_read_tx)
+                _put(_STREAM_END)
+            except _StreamClosed:
+                pass
+            except Exception as e:
+                try:
+                    _put(e)
+                except _StreamClosed:
+                    pass
+
+        # The copied context keeps the transaction attributed to the request that asked for it
+        threading.Thread(target=contextvars.copy_context().run, args=(_produce,), daemon=True).start()
+        try:
+            while True:
+                item = records.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            closed.set()
+
+    def shortest_path(self, source: str, target: str, max_hops: int) -> Iterator[Dict[str, Any]]:
+        """
+        Nodes of a shortest LINKS_TO path from `source` to `target`, in path order.
+        Yields nothing if there is no path of at most `max_hops` links.
+        """
+        if source == target:
+            raise ValueError("source and target must be different articles.")
+        query = SHORTEST_PATH_QUERY % int(max_hops)
+
+        def _path_tx(tx):
+            for record in tx.run(query, source=source, target=target):
+                yield {"position": record["position"], **record["node"]}
+
+        return self._stream_read("shortest_path", _path_tx)
+
+    def neighbourhood(self, node_id: str, hops: int, limit: int, direction: str = "both") -> Iterator[Dict[str, Any]]:
+        """
+        The node and the nodes up to `hops` links away, breadth first, each with its
+        distance. At most `limit` nodes besides the start node. Yields nothing if the node is not stored.
+        """
+        query = NEIGHBOURHOOD_STEP_QUERY % NEIGHBOURHOOD_PATTERNS[direction]
+
+        def _neighbourhood_tx(tx):
+            start = tx.run(GET_NODE_QUERY, id=node_id).single()
+            if start is None:
+                return
+            yield {"hops": 0, **start["node"]}
+            seen = [node_id]
+            frontier = [node_id]
+            for level in range(1, hops + 1):
+                remaining = limit - (len(seen) - 1)
+                if not frontier or remaining <= 0:
+                    break
+                next_frontier = []
+                for record in tx.run(query, frontier=frontier, seen=seen, limit=remaining):
+                    next_frontier.append(record["node"]["id"])
+                    yield {"hops": level, **record["node"]}
+                seen = seen + next_frontier
+                frontier = next_frontier
+
+        return self._stream_read("neighbourhood", _neighbourhood_tx)
+
+    def top_nodes(self, metric: str, limit: int) -> Iterator[Dict[str, Any]]:
+        """
+        The `limit` stored nodes with the highest `metric` (a TOP_NODE_METRICS key), across all explorations.
+        """
+        query = TOP_NODES_QUERY % TOP_NODE_METRICS[metric]
+
+        def _top_tx(tx):
+            for record in tx.run(query, limit=limit):
+                yield record["node"]
+
+        return self._stream_read("top_nodes", _top_tx)
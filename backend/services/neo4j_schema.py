@@ -0,0 +1,96 @@
+from neo4j import Driver
+from typing import Any, Dict, List, Tuple
+
+# Ordered schema migrations: (version, statements). Every statement must be
+# idempotent, so re-running a migration on a database that already has it is harmless.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (1, [
+        # MERGE/MATCH on these ids become index seeks instead of label scans
+        "CREATE CONSTRAINT graph_node_id IF NOT EXISTS FOR (gn:GraphNode) REQUIRE gn.id IS UNIQUE",
+        "CREATE CONSTRAINT exploration_id IF NOT EXISTS FOR (e:Exploration) REQUIRE e.id IS UNIQUE",
+    ]),
+    (2, [
+        # Paginated listing orders by creation time and reads stored counts
+        "CREATE INDEX exploration_created_at IF NOT EXISTS FOR (e:Exploration) ON (e.created_at)",
+        "MATCH (e:Exploration) WHERE e.created_at IS NULL SET e.created_at = datetime({epochMillis: 0})",
+        """
+        MATCH (e:Exploration) WHERE e.node_count IS NULL
+        SET e.node_count = COUNT { (e)-[:CONTAINS_NODE]->(:GraphNode) },
+            e.edge_count = COUNT { (e)-[:CONTAINS_NODE]->(:GraphNode)-[:LINKS_TO]->(:GraphNode)<-[:CONTAINS_NODE]-(e) }
+        """,
+    ]),
+    (3, [
+        # Top-k by stored centrality (/api/graph/top) reads this index in order
+        "CREATE INDEX graph_node_degree_centrality IF NOT EXISTS FOR (gn:GraphNode) ON (gn.degree_centrality)",
+    ]),
+    (4, [
+        # The crawl cache moves from GraphNode properties to CachedArticle nodes
+        "CREATE CONSTRAINT cached_article_title IF NOT EXISTS FOR (ca:CachedArticle) REQUIRE ca.title IS UNIQUE",
+        """
+        MATCH (gn:GraphNode) WHERE gn.links_fetched_at IS NOT NULL
+        MERGE (ca:CachedArticle {title: gn.id})
+        ON CREATE SET ca.out_links = gn.out_links, ca.links_fetched_at = gn.links_fetched_at
+        """,
+        # GraphNodes that only the cache created: no exploration and no link refers to them
+        """
+        MATCH (gn:GraphNode)
+        WHERE (gn.links_fetched_at IS NOT NULL OR gn.summary_fetched_at IS NOT NULL) AND NOT (gn)--()
+        DELETE gn
+        """,
+        # Summaries are not migrated: saved explorations stamped client-sent ones as fetched
+        """
+        MATCH (gn:GraphNode)
+        WHERE gn.out_links IS NOT NULL OR gn.links_fetched_at IS NOT NULL OR gn.summary_fetched_at IS NOT NULL
+        REMOVE gn.out_links, gn.links_fetched_at, gn.summary_fetched_at
+        """,
+    ]),
+    (5, [
+        # Edge membership per exploration: existing edges belong to every exploration that contains both endpoints
+        """
+        MATCH (e:Exploration)-[:CONTAINS_NODE]->(:GraphNode)-[l:LINKS_TO]->(:GraphNode)<-[:CONTAINS_NODE]-(e)
+        WHERE l.explorations IS NULL
+        WITH l, collect(e.id) AS exploration_ids
+        SET l.explorations = exploration_ids
+        """,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+GET_SCHEMA_VERSION_QUERY = "MATCH (s:SchemaVersion {id: 'wikigraph'}) RETURN s.version AS version"
+
+SET_SCHEMA_VERSION_QUERY = """
+    MERGE (s:SchemaVersion {id: 'wikigraph'})
+    SET s.version = $version, s.applied_at = datetime()
+    """
+
+def ensure_schema(driver: Driver, database: str) -> Dict[str, Any]:
+    """
+    Apply the migrations newer than the version recorded in the database, then
+    record the new version. Returns the resulting state for startup logging.
+    """
+    with driver.session(database=database) as session:
+        record = session.execute_read(lambda tx: tx.run(GET_SCHEMA_VERSION_QUERY).single())
+        current_version = record["version"] if record and record["version"] is not None else 0
+
+        applied = []
+        for version, statements in MIGRATIONS:
+            if version <= current_version:
+                continue
+            # Schema statements cannot share a transaction with data writes,
+            # so each one runs in its own auto-commit transaction.
+            for statement in statements:
+                session.run(statement).consume()
+            session.execute_write(lambda tx, v: tx.run(SET_SCHEMA_VERSION_QUERY, version=v).consume(), version)
+            applied.append(version)
+            current_version = version
+
+        constraints = [row["name"] for row in session.run("SHOW CONSTRAINTS YIELD name RETURN name")]
+        indexes = [row["name"] for row in session.run("SHOW INDEXES YIELD name RETURN name")]
+
+    return {
+        "version": current_version,
+        "applied": applied,
+        "constraints": sorted(constraints),
+        "indexes": sorted(indexes),
+    }
@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024 # Compressed bodies kept on disk
+DEFAULT_TTL = 24 * 3600 # Seconds before an entry must be revalidated
+ACCESS_GRANULARITY = 60 # Seconds; last-access times are not rewritten more often than this
+SQLITE_BUSY_TIMEOUT = 5.0 # Seconds to wait for another process holding the write lock
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        body BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        etag TEXT,
+        revids TEXT,
+        validated_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+    """
+
+def normalize_params(params: dict) -> str:
+    """
+    Cache key for a set of API parameters: sorted names, values as the wire sends
+    them, and the titles of a multi-title query in sorted order.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, bool):
+            value = int(value)
+        value = str(value)
+        if name == "titles":
+            value = "|".join(sorted(value.split("|")))
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def extract_revids(data: dict) -> Optional[Dict[str, int]]:
+    """
+    {page title: revision id} of every page in a response, with 0 for missing
+    pages, or None when the response does not carry the revision of each page.
+    """
+    if "parse" in data:
+        revid = data["parse"].get("revid")
+        return {data["parse"]["title"]: revid} if revid is not None else None
+    pages = data.get("query", {}).get("pages")
+    if not pages:
+        return None
+    revids = {}
+    for page in pages.values():
+        if "missing" in page or "invalid" in page:
+            revids[page["title"]] = 0
+        elif "lastrevid" in page:
+            revids[page["title"]] = page["lastrevid"]
+        else:
+            return None
+    return revids
+
+
+class CachedResponse:
+    def __init__(self, key: str, data: Any, etag: Optional[str], revids: Optional[Dict[str, int]], fresh: bool):
+        self.key = key
+        self.data = data
+        self.etag = etag
+        self.revids = revids
+        self.fresh = fresh
+
+
+class ResponseCache:
+    """
+    Persistent cache of Wikipedia API responses in a SQLite file, shared by every
+    worker process that opens the same path. Bodies are stored zlib-compressed with
+    the ETag and page revision ids they were served with, so an entry older than
+    `ttl` can be revalidated (a conditional request, or one prop=info call for the
+    revision ids) instead of fetched again.
+
+    Eviction removes the least recently used entries once the stored bodies pass
+    `max_bytes`; it runs in a write transaction, so processes do not race on it.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local() # sqlite3 connections are per thread
+        self._connections = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.served_stale = 0
+        self.stores = 0
+        self.evictions = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only its own thread uses a connection, but close() may run on another one
+            connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL") # Readers do not block the writer
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def lookup(self, params: dict) -> Optional[CachedResponse]:
+        """
+        The stored response for `params`, fresh or not, or None.
+        """
+        key = normalize_params(params)
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT body, etag, revids, validated_at, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        body, etag, revids, validated_at, accessed_at = row
+        now = time.time()
+        if now - accessed_at > ACCESS_GRANULARITY:
+            connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        fresh = now - validated_at < self.ttl
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+        return CachedResponse(key, json.loads(zlib.decompress(body)), etag, json.loads(revids) if revids else None, fresh)
+
+    def store(self, params: dict, data: Any, etag: Optional[str] = None):
+        """
+        Store a response just received, then evict down to `max_bytes`.
+        """
+        body = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        if len(body) > self.max_bytes:
+            return
+        revids = extract_revids(data)
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, etag, revids, validated_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_params(params), body, len(body), etag, json.dumps(revids) if revids else None, now, now),
+            )
+            evicted = self._evict(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.stores += 1
+            self.evictions += evicted
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        while total > self.max_bytes:
+            rows = connection.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        return evicted
+
+    def revalidated_unchanged(self, entry: CachedResponse):
+        """
+        Mark an entry as fresh again after the upstream confirmed it has not changed.
+        """
+        now = time.time()
+        self._connection().execute("UPDATE responses SET validated_at = ?, accessed_at = ? WHERE key = ?", (now, now, entry.key))
+        with self._lock:
+            self.revalidated += 1
+
+    def record_served_stale(self):
+        """
+        Count a stale entry returned because Wikipedia could not be reached.
+        """
+        with self._lock:
+            self.served_stale += 1
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        (key, response) for every stored entry, e.g. to export them as fixtures.
+        """
+        for key, body in self._connection().execute("SELECT key, body FROM responses ORDER BY key"):
+            yield key, json.loads(zlib.decompress(body))
+
+    def stats(self) -> dict:
+        entries, stored_bytes = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            lookups = self.hits + self.stale + self.misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": stored_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "stale": self.stale,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "served_stale": self.served_stale,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_ratio": ((self.hits + self.revalidated) / lookups) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
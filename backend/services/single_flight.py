@@ -0,0 +1,164 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+def normalize_title(title: str) -> str:
+    """
+    The title MediaWiki would resolve `title` to before redirects: underscores
+    as spaces, whitespace collapsed, first letter upper-cased.
+    """
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+class _Call:
+    """
+    One outstanding fetch on the sync path; followers wait on `done`.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    In-flight deduplication of upstream fetches, keyed by (operation, normalized title).
+    A caller asking for a key that another caller is already fetching waits for
+    that fetch instead of issuing its own. Batched fetches coalesce per title:
+    the titles nobody is fetching go out in one call, the rest are awaited.
+
+    The sync (threads) and async (one event loop) paths keep separate tables,
+    so a sync and an async caller never wait on each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+        self.fetched = 0 # Keys fetched by the caller that asked first
+        self.coalesced = 0 # Keys served by another caller's fetch
+
+    def run(self, operation: str, title: str, fetch: Callable[[], Any]) -> Any:
+        """
+        fetch() for one title, shared with concurrent callers asking for the same key.
+        """
+        return self.run_many(operation, [title], lambda titles: {titles[0]: fetch()})[title]
+
+    async def run_async(self, operation: str, title: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        async def fetch_one(titles):
+            return {titles[0]: await fetch()}
+        return (await self.run_many_async(operation, [title], fetch_one))[title]
+
+    def run_many(self, operation: str, titles: List[str], fetch: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        {title: value} for every title, where fetch(titles) is only called with the
+        titles no other thread is fetching and must return a value for each of them.
+        """
+        own: List[Tuple[str, _Call]] = []
+        waiting: List[Tuple[str, _Call]] = []
+        with self._lock:
+            for title in dict.fromkeys(titles):
+                key = (operation, normalize_title(title))
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    own.append((title, call))
+                else:
+                    waiting.append((title, call))
+            self.fetched += len(own)
+            self.coalesced += len(waiting)
+
+        results = {}
+        if own:
+            try:
+                fetched = fetch([title for title, _ in own])
+                for title, call in own:
+                    call.result = results[title] = fetched[title]
+            except BaseException as e:
+                for _, call in own:
+                    call.error = e
+                raise
+            finally:
+                with self._lock:
+                    for title, call in own:
+                        self._calls.pop((operation, normalize_title(title)), None)
+                        call.done.set()
+
+        for title, call in waiting:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[title] = call.result
+        return results
+
+    async def run_many_async(self, operation: str, titles: List[str],
+                             fetch: Callable[[List[str]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        run_many for coroutines. fetch(titles) may leave out titles it could not
+        fetch (e.g. out of budget); they are missing from the result too. When the
+        task fetching a key is cancelled or leaves it out, the callers waiting for
+        it fetch the key themselves instead.
+        """
+        loop = asyncio.get_running_loop()
+        results = {}
+        pending = list(dict.fromkeys(titles))
+        while pending:
+            own: List[Tuple[str, asyncio.Future]] = []
+            waiting: List[Tuple[str, asyncio.Future]] = []
+            for title in pending:
+                key = (operation, normalize_title(title))
+                call = self._async_calls.get(key)
+                if call is None:
+                    call = self._async_calls[key] = loop.create_future()
+                    own.append((title, call))
+                else:
+                    waiting.append((title, call))
+            with self._lock:
+                self.fetched += len(own)
+                self.coalesced += len(waiting)
+
+            if own:
+                try:
+                    fetched = await fetch([title for title, _ in own])
+                    for title, call in own:
+                        if title in fetched: # Left out: cancelled below, so waiters fetch it themselves
+                            results[title] = fetched[title]
+                            call.set_result(fetched[title])
+                except asyncio.CancelledError:
+                    for _, call in own:
+                        call.cancel()
+                    raise
+                except BaseException as e:
+                    for _, call in own:
+                        if not call.done():
+                            call.set_exception(e)
+                            call.exception() # Nobody may be waiting; do not log it as unretrieved
+                    raise
+                finally:
+                    for title, call in own:
+                        key = (operation, normalize_title(title))
+                        if self._async_calls.get(key) is call:
+                            del self._async_calls[key]
+                        if not call.done():
+                            call.cancel()
+
+            pending = []
+            for title, call in waiting:
+                try:
+                    results[title] = await asyncio.shield(call)
+                except asyncio.CancelledError:
+                    if call.cancelled() and not asyncio.current_task().cancelling():
+                        pending.append(title) # The fetching task was cancelled or left it out, not this one
+                    else:
+                        raise
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "fetched": self.fetched,
+                "coalesced": self.coalesced,
+            }
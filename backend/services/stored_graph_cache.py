@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.neo4j_repository import Neo4jRepository
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600 # Seconds a stored summary or link list stays fresh
+DEFAULT_MAX_PENDING_WRITES = 64 # Write-backs queued before new ones are dropped
+
+class StoredGraphCache:
+    """
+    Read-through tier over the articles already fetched into Neo4j. Explores ask it
+    for summaries and outgoing links first and only go to Wikipedia for titles
+    that are missing or older than `max_age`; what they fetch is written back
+    by a background thread, off the request path.
+
+    Neo4j errors never fail a crawl: reads fall back to Wikipedia and failed
+    writes are only counted.
+    """
+
+    def __init__(self, repository: Neo4jRepository, max_age: float = DEFAULT_MAX_AGE,
+                 max_pending_writes: int = DEFAULT_MAX_PENDING_WRITES):
+        self._repository = repository
+        self.max_age = max_age
+        self.max_pending_writes = max_pending_writes
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stored-graph-writer")
+        self._lock = threading.Lock()
+        self.pending_writes = 0
+        self.summary_hits = 0
+        self.summary_misses = 0
+        self.link_hits = 0
+        self.link_misses = 0
+        self.read_errors = 0
+        self.writes = 0
+        self.dropped_writes = 0
+        self.write_errors = 0
+
+    async def _lookup(self, titles: List[str]) -> Dict[str, dict]:
+        try:
+            return await asyncio.to_thread(self._repository.get_stored_articles, titles, self.max_age)
+        except Exception:
+            with self._lock:
+                self.read_errors += 1
+            return {}
+
+    async def get_summaries(self, titles: Iterable[str]) -> Dict[str, str]:
+        """
+        Fresh stored summaries for the titles that have one.
+        """
+        titles = list(titles)
+        if not titles:
+            return {}
+        stored = await self._lookup(titles)
+        summaries = {title: article["summary"] for title, article in stored.items() if article["summary"]}
+        with self._lock:
+            self.summary_hits += len(summaries)
+            self.summary_misses += len(titles) - len(summaries)
+        return summaries
+
+    async def get_resolved_links(self, titles: Iterable[str]) -> Dict[str, Tuple[set, str]]:
+        """
+        get_links with the final title of each article, after its redirect.
+        """
+        titles = list(titles)
+        if not titles:
+            return {}
+        stored = await self._lookup(titles)
+        links = {title: (set(article["links"]), article["title"]) for title, article in stored.items()
+                 if article["links"] is not None}
+        with self._lock:
+            self.link_hits += len(links)
+            self.link_misses += len(titles) - len(links)
+        return links
+
+    async def get_links(self, titles: Iterable[str]) -> Dict[str, set]:
+        """
+        Fresh stored outgoing links for the titles that have them; a redirect gets the links of its target.
+        """
+        return {title: links for title, (links, _) in (await self.get_resolved_links(titles)).items()}
+
+    async def get_article_links(self, title: str) -> Optional[Tuple[set, str]]:
+        """
+        (links, final title) like AsyncWikipediaClient.get_article_links, or None when not stored or stale.
+        """
+        return (await self.get_resolved_links([title])).get(title)
+
+    def write_back(self, summaries: Optional[Dict[str, str]] = None, links: Optional[Dict[str, Iterable[str]]] = None,
+                   redirects: Optional[Dict[str, str]] = None):
+        """
+        Queue what was just fetched from Wikipedia to be stored: summaries, links
+        under the final title of each article, and redirects (title -> final title).
+        Empty summaries (missing articles) are not stored. Returns without waiting for Neo4j.
+        """
+        summaries = {title: summary for title, summary in (summaries or {}).items() if summary}
+        links = {title: sorted(article_links) for title, article_links in (links or {}).items()}
+        redirects = {title: target for title, target in (redirects or {}).items() if title != target}
+        if not summaries and not links and not redirects:
+            return
+        with self._lock:
+            if self.pending_writes >= self.max_pending_writes:
+                self.dropped_writes += 1
+                return
+            self.pending_writes += 1
+        self._writer.submit(self._write, summaries, links, redirects)
+
+    def _write(self, summaries: Dict[str, str], links: Dict[str, List[str]], redirects: Dict[str, str]):
+        try:
+            self._repository.store_articles(summaries, links, redirects)
+            succeeded = True
+        except Exception:
+            succeeded = False
+        with self._lock:
+            self.pending_writes -= 1
+            if succeeded:
+                self.writes += 1
+            else:
+                self.write_errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_age": self.max_age,
+                "summary_hits": self.summary_hits,
+                "summary_misses": self.summary_misses,
+                "link_hits": self.link_hits,
+                "link_misses": self.link_misses,
+                "read_errors": self.read_errors,
+                "pending_writes": self.pending_writes,
+                "writes": self.writes,
+                "dropped_writes": self.dropped_writes,
+                "write_errors": self.write_errors,
+            }
+
+    def close(self):
+        """
+        Wait for the queued write-backs; call before the Neo4j driver is closed.
+        """
+        self._writer.shutdown(wait=True)
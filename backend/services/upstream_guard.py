@@ -0,0 +1,186 @@
+import random
+import threading
+import time
+from typing import Mapping, Optional
+
+DEFAULT_RATE = 20.0 # Requests per second to Wikipedia, across the app
+DEFAULT_BURST = 20
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_DELAY = 0.5 # Seconds; doubled on every retry
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5 # Consecutive failures that open the circuit
+DEFAULT_RESET_TIMEOUT = 30.0 # Seconds the circuit stays open before a probe request
+DEFAULT_MAXLAG = 5 # Seconds of replication lag at which Wikipedia asks bots to back off
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class UpstreamUnavailable(Exception):
+    """
+    The circuit is open: Wikipedia failed repeatedly and is not being called for now.
+    """
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. reserve() takes a token and returns how long the
+    caller must wait before using it, so sync callers sleep and async callers
+    await for that long. pause() holds every caller back, e.g. for a Retry-After.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1 # May go negative: the token is borrowed from the future
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._not_before - now)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._not_before = max(self._not_before, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. While open, calls are
+    refused; after `reset_timeout` one probe is let through, and its outcome
+    closes the circuit or opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # Open long enough, or a probe that never reported back: let one caller probe
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class UpstreamGuard:
+    """
+    App-wide policy for calls to the Wikipedia API, shared by the sync and async
+    clients: token-bucket pacing, retries with jittered exponential backoff that
+    honour Retry-After and maxlag, and a circuit breaker. The clients run the
+    request loop (with their own connect/read timeouts); this class makes the decisions.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 maxlag: Optional[int] = DEFAULT_MAXLAG):
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.maxlag = maxlag
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.throttled = 0
+        self.rejected = 0
+
+    def prepare(self, params: dict) -> dict:
+        """
+        The parameters to send: with maxlag, Wikipedia refuses the request while its replicas lag.
+        """
+        return {**params, "maxlag": self.maxlag} if self.maxlag is not None else params
+
+    def reserve(self) -> float:
+        """
+        Seconds to wait before the next attempt. Raises UpstreamUnavailable while the circuit is open.
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise UpstreamUnavailable("Wikipedia API is temporarily unavailable.")
+        with self._lock:
+            self.attempts += 1
+        return self.bucket.reserve()
+
+    def retry_hint(self, status_code: int, headers: Mapping[str, str], data: Optional[dict]) -> Optional[float]:
+        """
+        None when the response must not be retried; otherwise the seconds the
+        server asked to wait (0.0 when it did not say).
+        """
+        maxlag_error = isinstance(data, dict) and data.get("error", {}).get("code") == "maxlag"
+        if status_code not in RETRYABLE_STATUS_CODES and not maxlag_error:
+            return None
+        if status_code == 429 or maxlag_error:
+            with self._lock:
+                self.throttled += 1
+        try:
+            return max(float(headers.get("Retry-After", 0)), 0.0)
+        except ValueError:
+            return 0.0 # An HTTP date; fall back to our own backoff
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_failure(self, retry_after: float = 0.0):
+        self.breaker.record_failure()
+        if retry_after:
+            self.bucket.pause(retry_after) # Every caller waits, not only the one that was told
+
+    def backoff(self, attempt: int, retry_after: float = 0.0) -> Optional[float]:
+        """
+        Seconds to sleep before retry number `attempt + 1`, or None when out of retries.
+        """
+        if attempt >= self.max_retries or retry_after > self.max_delay:
+            return None # Better to fail now (and serve cached data) than to hold the request
+        with self._lock:
+            self.retries += 1
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)) # Full jitter
+        return max(delay, retry_after)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.bucket.rate,
+                "burst": self.bucket.burst,
+                "circuit": self.breaker.state,
+                "circuit_opened": self.breaker.opened,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "rejected": self.rejected,
+            }
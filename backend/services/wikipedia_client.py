@@ -1,91 +1,443 @@
 from fastapi import HTTPException
 import requests
+import time
 from bs4 import BeautifulSoup
+import html
 import re
-import time # Added for caching
+from typing import Dict, Iterable, List, Optional
+from services.article_cache import ArticleCache
+from services.single_flight import SingleFlight
+from services.response_cache import ResponseCache, CachedResponse, extract_revids
+from services.upstream_guard import UpstreamGuard, UpstreamUnavailable
+from services import metrics
 
 WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+MAX_TITLES_PER_QUERY = 50 # MediaWiki limit for the "titles" parameter
+MAX_EXTRACTS_PER_QUERY = 20 # TextExtracts returns at most 20 intro extracts per call (exlimit=max)
+DEFAULT_CONNECT_TIMEOUT = 3.05 # Seconds
+DEFAULT_READ_TIMEOUT = 10.0 # Seconds
+
+ARTICLE_LINK_PATTERN = re.compile(r"^/wiki/([^:?#]+)$")
+# The href of every <a> start tag. Quoted attribute values are consumed whole,
+# so a ">" or "href=" inside another attribute's value is never mistaken for markup.
+ANCHOR_HREF_PATTERN = re.compile(
+    r"""<a\s(?:[^>"']|"[^"]*"|'[^']*')*?(?<=[\s"'])href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+    re.IGNORECASE,
+)
+HTML_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
 
 class WikipediaClient:
-    def __init__(self):
-        self.cache = {} # Added cache dictionary
-        self.cache_ttl = 900 # Cache Time-To-Live in seconds (15 minutes)
+    def __init__(self, cache: Optional[ArticleCache] = None, api_url: str = WIKIPEDIA_API_URL,
+                 single_flight: Optional[SingleFlight] = None, response_cache: Optional[ResponseCache] = None,
+                 upstream_guard: Optional[UpstreamGuard] = None):
+        # Share the app-scoped cache when given one; otherwise keep a private one
+        self.cache = cache if cache is not None else ArticleCache()
+        # Concurrent fetches of the same title wait for one upstream call; app-scoped too when given
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        # Persistent store of raw API responses, revalidated when stale; None disables it
+        self.response_cache = response_cache
+        # App-wide pacing, retries and circuit breaker; None makes one attempt per call
+        self.upstream_guard = upstream_guard
+        self.timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        self.api_url = api_url
+        self.request_count = 0 # Upstream calls made by this client, used for crawl budgets
 
     def _call_wikipedia_api(self, params: dict):
+        if self.response_cache is None:
+            return self._request(params)[0]
+
+        entry = self.response_cache.lookup(params)
+        if entry is not None and entry.fresh:
+            return entry.data
         try:
-            response = requests.get(WIKIPEDIA_API_URL, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(status_code=503, detail=f"Error connecting to Wikipedia API: {e}")
+            if self._revision_check_possible(entry):
+                current = extract_revids(self._request(self._revision_params(list(entry.revids)))[0])
+                if current == entry.revids:
+                    self.response_cache.revalidated_unchanged(entry)
+                    return entry.data
 
-    def search_articles(self, term: str):
-        cache_key = f"search_{term}"
-        if cache_key in self.cache and (time.time() - self.cache[cache_key]["timestamp"] < self.cache_ttl):
-            return self.cache[cache_key]["data"]
+            data, etag = self._request(params, etag=entry.etag if entry is not None else None)
+        except HTTPException:
+            if entry is None:
+                raise
+            # Wikipedia is failing or the circuit is open: a stale answer beats none
+            self.response_cache.record_served_stale()
+            return entry.data
+        if data is None: # 304 Not Modified
+            self.response_cache.revalidated_unchanged(entry)
+            return entry.data
+        self.response_cache.store(params, data, etag)
+        return data
+
+    def _request(self, params: dict, etag: Optional[str] = None):
+        """
+        GET the API: (decoded body, ETag), or (None, etag) when a conditional
+        request is answered with 304 Not Modified. With an upstream guard, attempts
+        are paced and throttled or failed ones retried; every attempt counts
+        towards request_count.
+        """
+        guard = self.upstream_guard
+        if guard is not None:
+            params = guard.prepare(params)
+        headers = {"If-None-Match": etag} if etag else None
+        attempt = 0
+        while True:
+            if guard is not None:
+                try:
+                    time.sleep(guard.reserve())
+                except UpstreamUnavailable as e:
+                    raise HTTPException(status_code=503, detail=str(e))
+            self.request_count += 1
+            try:
+                response = self._get(params, headers)
+                if etag is not None and response.status_code == 304:
+                    if guard is not None:
+                        guard.record_success()
+                    return None, etag
+                data = response.json() if response.ok else None
+            except requests.exceptions.RequestException as e: # Timeouts, refused connections, bad bodies
+                error, retry_after = e, 0.0
+            else:
+                retry_after = guard.retry_hint(response.status_code, response.headers, data) if guard is not None else None
+                if retry_after is None:
+                    try:
+                        response.raise_for_status()
+                    except requests.exceptions.RequestException as e:
+                        raise HTTPException(status_code=503, detail=f"Error connecting to Wikipedia API: {e}")
+                    if guard is not None:
+                        guard.record_success()
+                    return data, response.headers.get("ETag")
+                error = f"HTTP {response.status_code}"
+
+            delay = None
+            if guard is not None:
+                guard.record_failure(retry_after)
+                delay = guard.backoff(attempt, retry_after)
+            if delay is None:
+                raise HTTPException(status_code=503, detail=f"Error connecting to Wikipedia API: {error}")
+            time.sleep(delay)
+            attempt += 1
+
+    def _get(self, params: dict, headers: Optional[dict]) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            response = requests.get(self.api_url, params=params, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            metrics.record_upstream("sync", "error", time.perf_counter() - started, 0)
+            raise
+        if metrics.active() is not None:
+            metrics.record_upstream("sync", response.status_code, time.perf_counter() - started, len(response.content))
+        return response
+
+    @staticmethod
+    def _revision_check_possible(entry: Optional[CachedResponse]) -> bool:
+        """
+        Whether a stale entry can be revalidated with one prop=info call: it has
+        no ETag (a conditional request is cheaper still) and records its revisions.
+        """
+        return entry is not None and entry.etag is None and bool(entry.revids) and len(entry.revids) <= MAX_TITLES_PER_QUERY
 
-        params = {
+    # --- Request builders and response parsers, shared with AsyncWikipediaClient ---
+
+    @staticmethod
+    def _search_params(term: str) -> dict:
+        return {
             "action": "query",
             "list": "search",
             "srsearch": term,
             "format": "json"
         }
-        data = self._call_wikipedia_api(params)
-        self.cache[cache_key] = {"data": data, "timestamp": time.time()}
-        return data
-
-    def get_article_summary(self, title: str) -> str:
-        cache_key = f"summary_{title}"
-        if cache_key in self.cache and (time.time() - self.cache[cache_key]["timestamp"] < self.cache_ttl):
-            return self.cache[cache_key]["data"]
 
-        params = {
+    @staticmethod
+    def _summary_params(titles: List[str]) -> dict:
+        return {
             "action": "query",
-            "prop": "extracts",
+            "prop": "extracts|info", # info adds each page's lastrevid, used to revalidate cached responses
             "exintro": True,
             "explaintext": True,
-            "titles": title,
+            "exlimit": "max",
+            "titles": "|".join(titles),
             "format": "json",
             "redirects": 1,
         }
-        data = self._call_wikipedia_api(params)
-        try:
-            page = next(iter(data["query"]["pages"].values()))
-            summary = page.get("extract", "")
-            self.cache[cache_key] = {"data": summary, "timestamp": time.time()}
-            return summary
-        except (KeyError, StopIteration):
-            self.cache[cache_key] = {"data": "", "timestamp": time.time()} # Cache empty summary too
-            return ""
 
-    def get_article_content(self, title: str):
-        params_parse = {
+    @staticmethod
+    def _content_params(title: str) -> dict:
+        return {
             "action": "parse",
             "page": title,
             "prop": "text",
             "format": "json",
             "redirects": 1,
         }
-        data = self._call_wikipedia_api(params_parse)
+
+    @staticmethod
+    def _links_params(titles: List[str]) -> dict:
+        return {
+            "action": "query",
+            "prop": "links|info",
+            "plnamespace": 0, # Articles only
+            "pllimit": "max",
+            "titles": "|".join(titles),
+            "format": "json",
+            "redirects": 1,
+        }
+
+    @staticmethod
+    def _revision_params(titles: List[str]) -> dict:
+        return {
+            "action": "query",
+            "prop": "info",
+            "titles": "|".join(titles),
+            "format": "json",
+            "redirects": 1,
+        }
+
+    @staticmethod
+    def _parse_summary(data: dict) -> str:
+        try:
+            page = next(iter(data["query"]["pages"].values()))
+            return page.get("extract", "")
+        except (KeyError, StopIteration):
+            return ""
+
+    @staticmethod
+    def _collect_extracts(data: dict, extracts: Dict[str, str], aliases: Dict[str, str]):
+        query = data.get("query", {})
+        for entry in query.get("normalized", []) + query.get("redirects", []):
+            aliases[entry["from"]] = entry["to"]
+        for page in query.get("pages", {}).values():
+            # TextExtracts returns at most "exlimit" extracts per call and
+            # asks for a continuation to get the rest.
+            if page.get("extract") or page["title"] not in extracts:
+                extracts[page["title"]] = page.get("extract", "")
+
+    @staticmethod
+    def _collect_links(data: dict, links: Dict[str, Optional[set]], aliases: Dict[str, str]):
+        """
+        Merge one prop=links response into `links` (page title -> link titles, None if missing).
+        Continuations page through the links of all the pages in a batch.
+        """
+        query = data.get("query", {})
+        for entry in query.get("normalized", []) + query.get("redirects", []):
+            aliases[entry["from"]] = entry["to"]
+        for page in query.get("pages", {}).values():
+            if "missing" in page or "invalid" in page:
+                links[page["title"]] = None
+                continue
+            page_links = links.get(page["title"])
+            if page_links is None:
+                page_links = links[page["title"]] = set()
+            page_links.update(link["title"] for link in page.get("links", []))
+
+    def _links_result(self, title: str, links: Dict[str, Optional[set]], aliases: Dict[str, str]):
+        """
+        Cacheable (final title, sorted link titles) for a requested title, or (None, ()) if it is missing.
+        """
+        final_title = self._resolve_title(title, aliases)
+        page_links = links.get(final_title)
+        if page_links is None:
+            return None, ()
+        return final_title, tuple(sorted(link for link in page_links if link.lower() != final_title.lower()))
+
+    @staticmethod
+    def _parse_content(data: dict, title: str):
         if "error" in data:
             raise HTTPException(status_code=404, detail=f'Article "{title}" not found.')
         try:
-            html_content = data["parse"]["text"]["*"]
-            final_article_title = data["parse"]["title"]
-            return html_content, final_article_title
+            return data["parse"]["text"]["*"], data["parse"]["title"]
         except KeyError:
             raise HTTPException(status_code=404, detail=f'Content for "{title}" could not be processed.')
 
+    @staticmethod
+    def _resolve_title(title: str, aliases: Dict[str, str]) -> str:
+        seen = set()
+        while title in aliases and title not in seen: # Guard against redirect loops
+            seen.add(title)
+            title = aliases[title]
+        return title
+
+    def _split_cached_summaries(self, titles: Iterable[str]):
+        """
+        Return (cached summaries, titles still to fetch), deduped and in order.
+        """
+        summaries = {}
+        pending = []
+        for title in dict.fromkeys(titles):
+            cached = self.cache.get(f"summary_{title}")
+            if cached is not None:
+                summaries[title] = cached
+            else:
+                pending.append(title)
+        return summaries, pending
+
+    def _split_cached_links(self, titles: Iterable[str]):
+        results = {}
+        pending = []
+        for title in dict.fromkeys(titles):
+            cached = self.cache.get(f"links_{title}")
+            if cached is not None:
+                results[title] = cached
+            else:
+                pending.append(title)
+        return results, pending
+
+    # --- Public API ---
+
+    def search_articles(self, term: str):
+        cache_key = f"search_{term}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        def _fetch():
+            data = self._call_wikipedia_api(self._search_params(term))
+            self.cache.set(cache_key, data)
+            return data
+
+        return self.single_flight.run("search", term, _fetch)
+
+    def get_article_summary(self, title: str) -> str:
+        cache_key = f"summary_{title}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        def _fetch():
+            summary = self._parse_summary(self._call_wikipedia_api(self._summary_params([title])))
+            self.cache.set(cache_key, summary) # Cache empty summary too
+            return summary
+
+        return self.single_flight.run("summary", title, _fetch)
+
+    def get_article_summaries(self, titles: Iterable[str]) -> Dict[str, str]:
+        """
+        Fetch the intro summaries of many articles, MAX_EXTRACTS_PER_QUERY titles per call.
+        The result is keyed by the titles as requested, after following
+        normalization and redirects; missing articles map to "".
+        """
+        summaries, pending = self._split_cached_summaries(titles)
+        if pending:
+            summaries.update(self.single_flight.run_many("summary", pending, self._fetch_summaries))
+        return summaries
+
+    def _fetch_summaries(self, titles: List[str]) -> Dict[str, str]:
+        summaries = {}
+        for start in range(0, len(titles), MAX_EXTRACTS_PER_QUERY):
+            chunk = titles[start:start + MAX_EXTRACTS_PER_QUERY]
+            for title, summary in self._fetch_summary_chunk(chunk).items():
+                self.cache.set(f"summary_{title}", summary)
+                summaries[title] = summary
+        return summaries
+
+    def _fetch_summary_chunk(self, titles: List[str]) -> Dict[str, str]:
+        params = self._summary_params(titles)
+        extracts = {} # Page title -> extract
+        aliases = {} # Requested/normalized title -> next title in the chain
+        while True:
+            data = self._call_wikipedia_api(params)
+            self._collect_extracts(data, extracts, aliases)
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+
+        return {title: extracts.get(self._resolve_title(title, aliases), "") for title in titles}
+
+    def get_links_for_titles(self, titles: Iterable[str]) -> Dict[str, set]:
+        """
+        Link titles of many articles through prop=links, MAX_TITLES_PER_QUERY titles per call.
+        Keyed by the titles as requested; missing articles map to an empty set.
+        """
+        results, pending = self._split_cached_links(titles)
+        if pending:
+            results.update(self.single_flight.run_many("links", pending, self._fetch_links))
+        return {title: set(result[1]) for title, result in results.items()}
+
+    def _fetch_links(self, titles: List[str]) -> dict:
+        results = {}
+        for start in range(0, len(titles), MAX_TITLES_PER_QUERY):
+            chunk = titles[start:start + MAX_TITLES_PER_QUERY]
+            for title, result in self._fetch_links_chunk(chunk).items():
+                self.cache.set(f"links_{title}", result)
+                results[title] = result
+        return results
+
+    def get_article_links(self, title: str):
+        """
+        Link titles of one article through prop=links, plus its final title after redirects.
+        """
+        results, pending = self._split_cached_links([title])
+        if pending:
+            results = self.single_flight.run_many("links", pending, self._fetch_links)
+        final_title, links = results[title]
+        if final_title is None:
+            raise HTTPException(status_code=404, detail=f'Article "{title}" not found.')
+        return set(links), final_title
+
+    def _fetch_links_chunk(self, titles: List[str]) -> dict:
+        params = self._links_params(titles)
+        links = {} # Page title -> link titles
+        aliases = {} # Requested/normalized title -> next title in the chain
+        while True:
+            data = self._call_wikipedia_api(params)
+            self._collect_links(data, links, aliases)
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+
+        return {title: self._links_result(title, links, aliases) for title in titles}
+
+    def get_article_content(self, title: str):
+        cache_key = f"content_{title}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        def _fetch():
+            content = self._parse_content(self._call_wikipedia_api(self._content_params(title)), title)
+            self.cache.set(cache_key, content)
+            return content
+
+        return self.single_flight.run("content", title, _fetch)
+
     def extract_links_from_html(self, html_content: str, current_article_title: str) -> set:
+        """
+        Return the titles of the articles linked from `html_content`, without the article itself.
+        Scans the <a href> values with a compiled pattern instead of building a DOM;
+        extract_links_from_html_soup is the reference implementation it must match.
+        """
+        with metrics.span("extract_links"):
+            if "<!--" in html_content:
+                html_content = HTML_COMMENT_PATTERN.sub("", html_content) # Commented-out markup is not a link
+            current_title = current_article_title.lower()
+            links = set()
+
+            for match in ANCHOR_HREF_PATTERN.finditer(html_content):
+                href = match[match.lastindex]
+                if "&" in href:
+                    href = html.unescape(href) # Attribute values may carry entities such as &amp;
+                article_name = self._article_name_from_href(href)
+                if article_name is not None and article_name.lower() != current_title:
+                    links.add(article_name)
+            return links
+
+    def extract_links_from_html_soup(self, html_content: str, current_article_title: str) -> set:
+        """
+        Reference extractor that builds the full BeautifulSoup/lxml tree.
+        Kept for parity tests and benchmarks of extract_links_from_html.
+        """
         soup = BeautifulSoup(html_content, "lxml")
         links = set()
-        link_pattern = re.compile(r"^/wiki/([^:?#]+)$")
 
         for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            match = link_pattern.match(href)
-            if match:
-                article_name = requests.utils.unquote(match.group(1)).replace("_", " ")
-                if article_name.lower() != current_article_title.lower():
-                    links.add(article_name)
+            article_name = self._article_name_from_href(a_tag["href"])
+            if article_name is not None and article_name.lower() != current_article_title.lower():
+                links.add(article_name)
         return links
+
+    @staticmethod
+    def _article_name_from_href(href: str) -> Optional[str]:
+        match = ARTICLE_LINK_PATTERN.match(href)
+        if not match:
+            return None
+        return requests.utils.unquote(match.group(1)).replace("_", " ")
@@ -0,0 +1,11 @@
+import pytest
+from wikipedia_stub import WikipediaStubServer
+
+@pytest.fixture
+def wikipedia_stub():
+    """
+    A local MediaWiki API stand-in with a little latency per response.
+    """
+    server = WikipediaStubServer(latency=0.02).start()
+    yield server
+    server.stop()
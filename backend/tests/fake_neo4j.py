@@ -0,0 +1,73 @@
+import time
+from typing import Callable, List, Optional
+
+class FakeResult:
+    def __init__(self, records: List[dict]):
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self):
+        return self._records[0] if self._records else None
+
+    def data(self):
+        return list(self._records)
+
+    def consume(self):
+        return None
+
+
+class FakeTransaction:
+    def __init__(self, driver: "FakeDriver"):
+        self._driver = driver
+
+    def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        self._driver.queries.append((query, params))
+        if self._driver.round_trip:
+            time.sleep(self._driver.round_trip)
+        records = self._driver.responder(query, params) if self._driver.responder else []
+        return FakeResult(records or [])
+
+
+class FakeSession:
+    def __init__(self, driver: "FakeDriver"):
+        self._driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args, **kwargs):
+        self._driver.transactions += 1
+        return work(FakeTransaction(self._driver), *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        self._driver.transactions += 1
+        return work(FakeTransaction(self._driver), *args, **kwargs)
+
+    def run(self, query: str, parameters: Optional[dict] = None, **kwargs):
+        return FakeTransaction(self._driver).run(query, parameters, **kwargs)
+
+
+class FakeDriver:
+    """
+    Recording stand-in for a neo4j Driver. Every tx.run is stored in `queries`;
+    `round_trip` adds a sleep per query to mimic network latency, and `responder`
+    (query, params) -> list of records supplies results.
+    """
+
+    def __init__(self, round_trip: float = 0.0, responder: Optional[Callable[[str, dict], List[dict]]] = None):
+        self.round_trip = round_trip
+        self.responder = responder
+        self.queries = []
+        self.transactions = 0
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+    def close(self):
+        pass
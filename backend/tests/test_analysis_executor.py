@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from services.analysis_executor import AnalysisExecutor
+from services.csr_graph import CSRGraph
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import BetweennessCentralityStrategy, DegreeCentralityStrategy, GraphAnalysisStrategy, PageRankStrategy
+
+class SlowStrategy(GraphAnalysisStrategy):
+    """
+    Runs until cancelled, polling the cancel check like the iterative strategies do.
+    """
+
+    output_key = "slow"
+
+    def compute(self, graph: CSRGraph) -> np.ndarray:
+        while True:
+            graph.raise_if_cancelled()
+            time.sleep(0.01)
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = AnalysisExecutor(max_workers=1, max_queue=1, inline_max_edges=100)
+    yield executor
+    executor.shutdown()
+
+def _ring_graph(node_count: int) -> CSRGraph:
+    node_ids = [f"Topic {i}" for i in range(node_count)]
+    edges = [(node_ids[i], node_ids[(i * 7 + offset) % node_count]) for i in range(node_count) for offset in (1, 2)]
+    return CSRGraph.from_edges(node_ids, edges)
+
+def _wait_until_idle(executor: AnalysisExecutor, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while executor.stats()["queue_depth"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+def test_small_graphs_run_inline(executor):
+    submitted = executor.stats()["submitted"]
+
+    scores = asyncio.run(executor.run(_ring_graph(20), [DegreeCentralityStrategy()]))
+
+    assert scores["degree_centrality"].shape == (20,)
+    assert executor.stats()["submitted"] == submitted
+
+def test_inline_analysis_leaves_the_event_loop_free_and_times_out(executor):
+    timeouts = executor.stats()["timeouts"]
+    graph = _ring_graph(20)
+
+    async def run():
+        ticks = 0
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        ticker = asyncio.ensure_future(tick())
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(graph, [SlowStrategy()], timeout=0.3)
+        ticker.cancel()
+        return exc_info.value.status_code, ticks
+
+    status_code, ticks = asyncio.run(run())
+
+    assert status_code == 504
+    assert ticks >= 10 # Other coroutines ran while the strategy did
+    assert executor.stats()["timeouts"] == timeouts + 1
+    assert graph.cancel_check is None
+
+def test_worker_results_match_inline(executor):
+    graph = _ring_graph(500)
+    strategies = [PageRankStrategy(), BetweennessCentralityStrategy(max_sources=50)]
+
+    scores = asyncio.run(executor.run(graph, strategies))
+
+    for strategy in strategies:
+        np.testing.assert_allclose(scores[strategy.output_key], strategy.compute(graph))
+    assert executor.stats()["completed"] >= 1
+
+def test_timeout_cancels_the_running_job(executor):
+    cancelled = executor.stats()["cancelled"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(executor.run(_ring_graph(500), [SlowStrategy()], timeout=0.5))
+
+    assert exc_info.value.status_code == 504
+    _wait_until_idle(executor)
+    assert executor.stats()["queue_depth"] == 0
+    assert executor.stats()["cancelled"] == cancelled + 1
+
+def test_full_queue_rejects_jobs(executor):
+    async def run():
+        slow = asyncio.ensure_future(executor.run(_ring_graph(500), [SlowStrategy()], timeout=1.0))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(_ring_graph(500), [DegreeCentralityStrategy()])
+        assert exc_info.value.status_code == 503
+        await asyncio.gather(slow, return_exceptions=True)
+
+    asyncio.run(run())
+    _wait_until_idle(executor)
+    assert executor.stats()["rejected"] == 1
+
+def test_graph_analyzer_uses_the_executor(executor):
+    nodes = [{"id": f"Topic {i}"} for i in range(300)]
+    edges = [{"from": f"Topic {i}", "to": f"Topic {(i + 1) % 300}"} for i in range(300)]
+    expected = GraphAnalyzer(strategy=PageRankStrategy()).analyze_and_add_results([dict(node) for node in nodes], edges)
+
+    analyzed = asyncio.run(GraphAnalyzer(strategy=PageRankStrategy(), executor=executor).analyze_and_add_results_async(nodes, edges))
+
+    assert [node["pagerank"] for node in analyzed] == pytest.approx([node["pagerank"] for node in expected])
+
+def test_graph_analyzer_without_executor_runs_off_the_loop():
+    nodes = [{"id": f"Topic {i}"} for i in range(30)]
+    edges = [{"from": f"Topic {i}", "to": f"Topic {(i + 1) % 30}"} for i in range(30)]
+    loop_threads = []
+
+    class ThreadRecordingStrategy(DegreeCentralityStrategy):
+        def compute(self, graph):
+            loop_threads.append(threading.get_ident())
+            return super().compute(graph)
+
+    async def run():
+        await GraphAnalyzer(strategy=ThreadRecordingStrategy()).analyze_and_add_results_async(nodes, edges)
+        return threading.get_ident()
+
+    assert loop_threads != [asyncio.run(run())]
+    assert all("degree_centrality" in node for node in nodes)
@@ -0,0 +1,129 @@
+import pytest
+from unittest.mock import patch
+import networkx as nx
+from fastapi.testclient import TestClient
+from dependencies import get_analysis_sessions
+from main import app
+from services.analysis_session import AnalysisSession, AnalysisSessionStore
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import (
+    BetweennessCentralityStrategy,
+    DegreeCentralityStrategy,
+    InDegreeCentralityStrategy,
+    PageRankStrategy,
+)
+
+def _expansions(seed: int, steps: int):
+    """
+    Deltas of an interactive session: each step expands one known node into a few new ones.
+    """
+    graph = nx.gnp_random_graph(40, 0.08, seed=seed, directed=True)
+    yield [str(node) for node in graph], [(str(u), str(v)) for u, v in graph.edges()]
+    for step in range(steps):
+        parent = str((step * 7) % (40 + step))
+        children = [f"New {step}-{i}" for i in range(3)]
+        yield children, [(parent, child) for child in children] + [(children[0], "0")]
+
+def _apply(known: dict, update: dict):
+    """
+    Client-side merge of an update into the scores it already holds.
+    """
+    for scores in known.values():
+        for key, factor in update["rescaled"].items():
+            scores[key] *= factor
+    for node_id, scores in update["changed"].items():
+        known.setdefault(node_id, {}).update(scores)
+
+def test_incremental_updates_match_full_recompute():
+    strategies = [DegreeCentralityStrategy(), InDegreeCentralityStrategy(), PageRankStrategy(tol=1e-10), BetweennessCentralityStrategy()]
+    session = AnalysisSession(strategies, tolerance=0.0)
+    known = {}
+    nodes, edges = {}, []
+
+    for node_ids, delta_edges in _expansions(seed=1, steps=10):
+        _apply(known, session.add(node_ids, delta_edges))
+        nodes.update((node_id, {"id": node_id}) for node_id in node_ids)
+        nodes.update((node_id, {"id": node_id}) for edge in delta_edges for node_id in edge)
+        edges += [{"from": u, "to": v} for u, v in delta_edges]
+
+    full = GraphAnalyzer(strategies=strategies).analyze_and_add_results(list(nodes.values()), edges)
+    assert session.node_count == len(full)
+    for node in full:
+        for strategy in strategies:
+            assert known[node["id"]][strategy.output_key] == pytest.approx(node[strategy.output_key], abs=1e-6)
+
+def test_degree_update_only_reports_touched_nodes():
+    session = AnalysisSession([DegreeCentralityStrategy()])
+    session.add(["A", "B", "C", "D"], [("A", "B"), ("B", "C")])
+
+    update = session.add(["E"], [("D", "E")])
+
+    assert set(update["changed"]) == {"D", "E"}
+    assert update["rescaled"] == {"degree_centrality": pytest.approx(3 / 4)}
+    assert update["changed"]["D"]["degree_centrality"] == pytest.approx(1 / 4)
+
+def test_repeated_edges_change_nothing():
+    session = AnalysisSession([DegreeCentralityStrategy(), PageRankStrategy()])
+    session.add(["A", "B"], [("A", "B")])
+
+    update = session.add([], [("A", "B")])
+
+    assert update == {"node_count": 2, "edge_count": 1, "changed": {}, "rescaled": {}}
+
+def test_iterative_metrics_warm_start_from_previous_scores(monkeypatch):
+    calls = []
+    compute = PageRankStrategy.compute
+
+    def counting_compute(self, graph, start=None):
+        calls.append(start is not None)
+        return compute(self, graph, start)
+
+    monkeypatch.setattr(PageRankStrategy, "compute", counting_compute)
+    session = AnalysisSession([PageRankStrategy()])
+    for node_ids, delta_edges in _expansions(seed=2, steps=3):
+        session.add(node_ids, delta_edges)
+
+    assert calls == [False, True, True, True]
+
+def test_session_store_ttl_and_lru():
+    """
+    Test that sessions expire after the idle TTL, that using one restarts it, and that the least recently used goes first.
+    """
+    store = AnalysisSessionStore(max_sessions=2, ttl=10)
+    first, second, third = (AnalysisSession([DegreeCentralityStrategy()]) for _ in range(3))
+    with patch("services.analysis_session.time.monotonic", return_value=100.0):
+        store.add(first)
+        store.add(second)
+    with patch("services.analysis_session.time.monotonic", return_value=105.0):
+        assert store.get(first.id) is first # Now expires at 115
+        store.add(third) # Evicts second, the least recently used
+    assert store.get(second.id) is None
+    with patch("services.analysis_session.time.monotonic", return_value=112.0):
+        assert store.get(first.id) is first
+    with patch("services.analysis_session.time.monotonic", return_value=130.0):
+        assert store.get(third.id) is None
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["expirations"] == 1
+
+def test_analysis_session_routes():
+    sessions = AnalysisSessionStore()
+    app.dependency_overrides[get_analysis_sessions] = lambda: sessions
+    try:
+        client = TestClient(app)
+        created = client.post("/api/analysis/sessions", json={
+            "nodes": ["A", "B", "C"], "edges": [{"from": "A", "to": "B"}], "metrics": "degree,pagerank",
+        })
+        assert created.status_code == 201
+        body = created.json()
+        assert body["scores"]["A"]["degree_centrality"] == pytest.approx(0.5)
+
+        update = client.post(f"/api/analysis/sessions/{body['session_id']}/delta", json={"edges": [{"from": "B", "to": "C"}]})
+        assert update.status_code == 200
+        assert set(update.json()["changed"]) >= {"B", "C"}
+        assert "degree_centrality" not in update.json()["changed"].get("A", {}) # A's degree did not change
+
+        assert client.delete(f"/api/analysis/sessions/{body['session_id']}").status_code == 204
+        assert client.get(f"/api/analysis/sessions/{body['session_id']}").status_code == 404
+        assert client.post("/api/analysis/sessions", json={"metrics": "closeness"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
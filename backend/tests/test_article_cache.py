@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import patch
+from services.article_cache import ArticleCache
+
+def test_get_set_and_counters():
+    """
+    Test that hits and misses are counted.
+    """
+    cache = ArticleCache()
+    assert cache.get("missing") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+def test_empty_string_is_a_hit():
+    """
+    Test that a cached empty summary is returned instead of treated as a miss.
+    """
+    cache = ArticleCache()
+    cache.set("summary_X", "")
+    assert cache.get("summary_X") == ""
+    assert cache.hits == 1
+
+def test_ttl_expiration():
+    """
+    Test that entries older than the TTL are dropped on access.
+    """
+    cache = ArticleCache(ttl=10)
+    with patch("services.article_cache.time.monotonic", return_value=100.0):
+        cache.set("key", "value")
+    with patch("services.article_cache.time.monotonic", return_value=111.0):
+        assert cache.get("key") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+def test_lru_eviction_by_entries():
+    """
+    Test that the least recently used entry is evicted when the entry cap is hit.
+    """
+    cache = ArticleCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a") # "b" is now the least recently used
+    cache.set("c", "3")
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+
+def test_eviction_by_bytes():
+    """
+    Test that the byte cap evicts old entries and rejects oversized values.
+    """
+    cache = ArticleCache(max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert "a" not in cache
+    assert cache.stats()["bytes"] == 6
+
+    cache.set("huge", "z" * 11)
+    assert "huge" not in cache
+    assert "b" in cache
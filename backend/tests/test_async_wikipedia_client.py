@@ -0,0 +1,130 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from services.article_cache import ArticleCache
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.wikipedia_client import WikipediaClient
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import DegreeCentralityStrategy
+from services.crawl_engine import CrawlBudget
+from routers.wikipedia import explore_article
+
+def _explore(client: AsyncWikipediaClient, title: str):
+    return explore_article(title, depth=1, wiki_client=client, graph_analyzer=GraphAnalyzer(strategy=DegreeCentralityStrategy()), budget=CrawlBudget(), stored_graph=None, link_index=None, encoder=None)
+
+def test_async_client_fetches_content_and_summaries(wikipedia_stub):
+    """
+    Test the async client end to end against the stub server.
+    """
+    async def run():
+        pool = WikipediaConnectionPool(api_url=wikipedia_stub.api_url)
+        try:
+            client = AsyncWikipediaClient(pool=pool)
+            html, title = await client.get_article_content("Topic 1")
+            summaries = await client.get_article_summaries(["Topic 2", "Topic 3"])
+            search = await client.search_articles("topic")
+            return html, title, summaries, search
+        finally:
+            await pool.aclose()
+
+    html, title, summaries, search = asyncio.run(run())
+    assert title == "Topic 1"
+    assert "/wiki/Topic_8" in html
+    assert summaries == {"Topic 2": "Topic 2 is a synthetic article.", "Topic 3": "Topic 3 is a synthetic article."}
+    assert len(search["query"]["search"]) == 10
+
+def test_async_client_not_found(wikipedia_stub):
+    """
+    Test that a missing article still raises a 404 HTTPException.
+    """
+    async def run():
+        pool = WikipediaConnectionPool(api_url=wikipedia_stub.api_url)
+        try:
+            await AsyncWikipediaClient(pool=pool).get_article_content("Nope")
+        finally:
+            await pool.aclose()
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(run())
+    assert exc_info.value.status_code == 404
+
+def test_async_client_connection_error():
+    """
+    Test that an unreachable API is reported as a 503.
+    """
+    async def run():
+        pool = WikipediaConnectionPool(api_url="http://127.0.0.1:9/w/api.php", timeout=1.0)
+        try:
+            await AsyncWikipediaClient(pool=pool).search_articles("x")
+        finally:
+            await pool.aclose()
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(run())
+    assert exc_info.value.status_code == 503
+
+def test_concurrent_explores_respect_semaphore_and_reuse_connections(wikipedia_stub):
+    """
+    Test that concurrent explores never exceed the in-flight cap and share keep-alive connections.
+    """
+    async def run():
+        pool = WikipediaConnectionPool(api_url=wikipedia_stub.api_url, max_connections=4, max_concurrency=3)
+        try:
+            clients = [AsyncWikipediaClient(pool=pool, cache=ArticleCache()) for _ in range(12)]
+            return await asyncio.gather(*(_explore(client, f"Topic {i}") for i, client in enumerate(clients)))
+        finally:
+            await pool.aclose()
+
+    results = asyncio.run(run())
+    assert all(len(result["nodes"]) == 16 for result in results)
+    assert wikipedia_stub.request_count == 24 # One parse and one batched summary call per explore
+    assert wikipedia_stub.peak_in_flight <= 3
+    assert wikipedia_stub.connection_count <= 4
+
+def test_concurrent_explores_outperform_serial_sync_client(wikipedia_stub):
+    """
+    Compare throughput of concurrent async explores with the same explores run serially.
+    """
+    titles = [f"Topic {i}" for i in range(10)]
+
+    started = time.perf_counter()
+    for title in titles:
+        sync_client = WikipediaClient(cache=ArticleCache(), api_url=wikipedia_stub.api_url)
+        html, final_title = sync_client.get_article_content(title)
+        links = sync_client.extract_links_from_html(html, final_title)
+        sync_client.get_article_summaries([final_title] + list(links)[:15])
+    serial_elapsed = time.perf_counter() - started
+
+    async def run():
+        pool = WikipediaConnectionPool(api_url=wikipedia_stub.api_url, max_concurrency=10)
+        try:
+            await asyncio.gather(*(_explore(AsyncWikipediaClient(pool=pool, cache=ArticleCache()), title) for title in titles))
+        finally:
+            await pool.aclose()
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    concurrent_elapsed = time.perf_counter() - started
+
+    # 20 calls at 20 ms each serially vs two waves of 10 concurrent calls
+    assert concurrent_elapsed < serial_elapsed / 2
+
+def test_links_cut_short_by_a_budget_are_not_shared(wikipedia_stub):
+    """
+    Test that callers waiting on a lookup that ran out of calls fetch the links themselves.
+    """
+    async def run():
+        pool = WikipediaConnectionPool(api_url=wikipedia_stub.api_url)
+        try:
+            client = AsyncWikipediaClient(pool=pool)
+            return await asyncio.gather(client.get_resolved_links_for_titles(["Topic 1", "Topic 2"], max_calls=0),
+                                        client.get_article_links("Topic 1"),
+                                        client.get_resolved_links_for_titles(["Topic 2"]))
+        finally:
+            await pool.aclose()
+
+    budgeted, (links, final_title), unbudgeted = asyncio.run(run())
+    assert budgeted == {}
+    assert final_title == "Topic 1" and links
+    assert unbudgeted["Topic 2"][1] == "Topic 2" and unbudgeted["Topic 2"][0]
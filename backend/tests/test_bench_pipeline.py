@@ -0,0 +1,42 @@
+import asyncio
+from benchmarks.bench_pipeline import ReplayStubServer, compare, load_fixture, percentile, record, run_benchmark
+from tests.wikipedia_stub import WikipediaStubServer
+
+def test_percentile_is_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.95) == 0.0
+
+def test_compare_flags_p95_and_throughput_regressions():
+    baseline = [{"scenario": "explore", "concurrency": 8, "p95_ms": 100.0, "rps": 50.0},
+                {"scenario": "list", "concurrency": 8, "p95_ms": 10.0, "rps": 500.0}]
+    results = [{"scenario": "explore", "concurrency": 8, "p95_ms": 130.0, "rps": 49.0},
+               {"scenario": "list", "concurrency": 8, "p95_ms": 10.5, "rps": 480.0}]
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert len(regressions) == 1 and regressions[0].startswith("explore x8")
+
+def test_recorded_responses_replay_without_misses(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANALYSIS_MAX_WORKERS", "0")
+    upstream = WikipediaStubServer(links_per_article=4, article_count=20).start()
+    fixtures = tmp_path / "pipeline.json.gz"
+    try:
+        asyncio.run(record(["Topic 1", "Topic 2"], 1, "html", 4, fixtures, api_url=upstream.api_url))
+    finally:
+        upstream.stop()
+    fixture = load_fixture(fixtures)
+    assert fixture["responses"]
+
+    # The app must crawl with the settings of the recording to make the same requests
+    monkeypatch.setattr("routers.wikipedia.MAX_NEIGHBORS", 4)
+    replay = ReplayStubServer(fixture["responses"]).start()
+    try:
+        results = asyncio.run(run_benchmark(replay.api_url, fixture["titles"], 1, ["explore", "save", "list", "analysis"],
+                                            [1, 4], requests=8, warmup=2, neo4j_round_trip=0.0))
+    finally:
+        replay.stop()
+    assert replay.misses == 0
+    assert [(r["scenario"], r["concurrency"]) for r in results] == [
+        ("explore", 1), ("explore", 4), ("save", 1), ("save", 4), ("list", 1), ("list", 4), ("analysis", 1), ("analysis", 4)]
+    assert all(r["errors"] == 0 and r["rps"] > 0 for r in results)
+    assert all(r["rss_mb"] is None or 0 < r["rss_mb"] <= r["process_peak_rss_mb"] + 1 for r in results)
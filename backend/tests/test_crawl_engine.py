@@ -0,0 +1,213 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.crawl_engine import CrawlEngine, CrawlBudget, LINK_SOURCE_HTML, LINK_SOURCE_LINKS
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import DegreeCentralityStrategy
+from services.link_index import LinkIndex
+from routers.wikipedia import explore_article
+from wikipedia_stub import WikipediaStubServer
+
+@pytest.fixture
+def five_link_stub():
+    """
+    A stub where every article has exactly five links, so crawls are deterministic.
+    """
+    server = WikipediaStubServer(links_per_article=5).start()
+    yield server
+    server.stop()
+
+def _crawl(api_url: str, title: str, depth: int, max_neighbors: int = 5, budget: CrawlBudget = None, link_index: LinkIndex = None):
+    async def run():
+        pool = WikipediaConnectionPool(api_url=api_url)
+        try:
+            client = AsyncWikipediaClient(pool=pool)
+            engine = CrawlEngine(client, GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=max_neighbors, budget=budget,
+                                 link_index=link_index)
+            return await engine.crawl(title, depth), client.request_count
+        finally:
+            await pool.aclose()
+    return asyncio.run(run())
+
+def test_crawl_depth_two(five_link_stub):
+    """
+    Test a full depth-2 crawl: one parse per expanded article and one summary call per 20 new titles.
+    """
+    graph, calls = _crawl(five_link_stub.api_url, "Topic 1", depth=2)
+
+    assert graph["truncated"] is False
+    assert len(graph["nodes"]) == 1 + 5 + 25
+    assert len(graph["edges"]) == 5 + 25
+    assert all("degree_centrality" in node for node in graph["nodes"])
+    assert graph["nodes"][0]["summary"] == "Topic 1 is a synthetic article."
+    assert calls == 1 + 1 + 5 + 2
+
+def test_crawl_reads_known_links_from_link_index(five_link_stub):
+    """
+    Test that a second crawl of the same region takes every link from the index and only fetches summaries.
+    """
+    link_index = LinkIndex()
+    first, first_calls = _crawl(five_link_stub.api_url, "Topic 1", depth=2, link_index=link_index)
+    second, second_calls = _crawl(five_link_stub.api_url, "Topic 1", depth=2, link_index=link_index)
+
+    assert first_calls == 1 + 1 + 5 + 2
+    assert second_calls == 1 + 2 # Only the summary calls of each level, no parse calls
+    assert second == first
+    assert link_index.stats()["articles"] == 1 + 5
+
+def test_crawl_root_from_link_index_follows_redirect():
+    """
+    Test that a redirected root read from the index gets the same id as a fresh fetch.
+    """
+    server = WikipediaStubServer(links_per_article=5, redirects={"Old Topic 1": "Topic 1"}).start()
+    try:
+        link_index = LinkIndex()
+        first, _ = _crawl(server.api_url, "Old Topic 1", depth=1, link_index=link_index)
+        second, second_calls = _crawl(server.api_url, "Old Topic 1", depth=1, link_index=link_index)
+    finally:
+        server.stop()
+
+    assert first["nodes"][0]["id"] == second["nodes"][0]["id"] == "Topic 1"
+    assert second_calls == 1 # Only the summaries
+    assert link_index.stats()["redirects"] == 1
+
+def test_redirected_child_drops_its_self_link():
+    """
+    Test that a redirected child's links are indexed under its final title without its self-link.
+    """
+    # Topic 6 links to itself among its five links; Topic 8, a child of Topic 1, redirects to it
+    server = WikipediaStubServer(links_per_article=5, article_count=20, redirects={"Topic 8": "Topic 6"}).start()
+    try:
+        link_index = LinkIndex()
+        _crawl(server.api_url, "Topic 1", depth=2, link_index=link_index)
+        graph, calls = _crawl(server.api_url, "Topic 6", depth=1, link_index=link_index)
+    finally:
+        server.stop()
+
+    assert "Topic 6" in server.links_of("Topic 6")
+    assert calls == 1 # The root came from the index
+    assert not [edge for edge in graph["edges"] if edge["from"] == edge["to"]]
+
+def test_crawl_dedupes_titles_across_levels():
+    """
+    Test that titles reached twice become one node with several incoming edges.
+    """
+    server = WikipediaStubServer(links_per_article=3, article_count=10).start()
+    try:
+        graph, _ = _crawl(server.api_url, "Topic 1", depth=3)
+    finally:
+        server.stop()
+
+    ids = [node["id"] for node in graph["nodes"]]
+    assert len(ids) == len(set(ids))
+    assert len(graph["edges"]) > len(ids) - 1 # Edges back into already-known nodes are kept
+    assert len({(edge["from"], edge["to"]) for edge in graph["edges"]}) == len(graph["edges"])
+
+def test_crawl_node_budget(five_link_stub):
+    """
+    Test that the crawl stops at max_nodes and reports truncation.
+    """
+    graph, _ = _crawl(five_link_stub.api_url, "Topic 1", depth=2, budget=CrawlBudget(max_nodes=10))
+    assert graph["truncated"] is True
+    assert len(graph["nodes"]) == 10
+
+def test_crawl_call_budget(five_link_stub):
+    """
+    Test that the crawl never makes more upstream calls than max_calls.
+    """
+    graph, calls = _crawl(five_link_stub.api_url, "Topic 1", depth=2, budget=CrawlBudget(max_calls=4))
+    assert graph["truncated"] is True
+    assert calls == 4
+    assert len(graph["nodes"]) == 1 + 5 + 5 # Only one level-2 article could be expanded
+
+def test_crawl_call_budget_covers_extract_paging():
+    """
+    Test that summaries are budgeted at 20 titles per call, the most intro extracts one response holds.
+    """
+    server = WikipediaStubServer(links_per_article=30).start()
+    try:
+        graph, calls = _crawl(server.api_url, "Topic 1", depth=1, max_neighbors=30, budget=CrawlBudget(max_calls=2))
+    finally:
+        server.stop()
+    assert graph["truncated"] is True
+    assert calls == 2 # The root parse and one summary call, not a chain of continuations
+    assert len(graph["nodes"]) == 1 + 19 # The root's summary takes one of the 20 slots
+
+def test_crawl_time_budget():
+    """
+    Test that a crawl running out of time returns the levels it already has.
+    """
+    server = WikipediaStubServer(latency=0.15).start()
+    try:
+        graph, _ = _crawl(server.api_url, "Topic 1", depth=2, budget=CrawlBudget(time_budget=0.4))
+    finally:
+        server.stop()
+    assert graph["truncated"] is True
+    assert len(graph["nodes"]) == 6
+
+def test_explore_rejects_unsupported_depth():
+    """
+    Test that depths outside 1..MAX_DEPTH are rejected before any crawl.
+    """
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(explore_article("Topic 1", depth=4, wiki_client=None, graph_analyzer=None, budget=None, stored_graph=None))
+    assert exc_info.value.status_code == 400
+
+def test_crawl_with_prop_links_matches_html_source():
+    """
+    Test that the prop=links source builds the same graph as HTML parsing, in fewer calls.
+    """
+    server = WikipediaStubServer(links_per_article=5, links_page_size=7).start()
+    try:
+        async def run(link_source):
+            pool = WikipediaConnectionPool(api_url=server.api_url)
+            try:
+                client = AsyncWikipediaClient(pool=pool)
+                engine = CrawlEngine(client, GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=5, link_source=link_source)
+                return await engine.crawl("Topic 1", 2), client.request_count
+            finally:
+                await pool.aclose()
+
+        html_graph, html_calls = asyncio.run(run(LINK_SOURCE_HTML))
+        links_graph, links_calls = asyncio.run(run(LINK_SOURCE_LINKS))
+    finally:
+        server.stop()
+
+    assert {node["id"] for node in links_graph["nodes"]} == {node["id"] for node in html_graph["nodes"]}
+    assert {(e["from"], e["to"]) for e in links_graph["edges"]} == {(e["from"], e["to"]) for e in html_graph["edges"]}
+    # Root: 1 call; level 2: 25 links paged 7 at a time = 4 calls, instead of 5 parse calls
+    assert links_calls == 1 + 1 + 4 + 2
+    assert html_calls == 1 + 1 + 5 + 2
+
+def test_crawl_with_prop_links_respects_call_budget():
+    """
+    Test that link continuations count against max_calls instead of running past it.
+    """
+    server = WikipediaStubServer(links_per_article=5, links_page_size=2).start()
+    try:
+        async def run():
+            pool = WikipediaConnectionPool(api_url=server.api_url)
+            try:
+                client = AsyncWikipediaClient(pool=pool)
+                engine = CrawlEngine(client, GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=5,
+                                     budget=CrawlBudget(max_calls=8), link_source=LINK_SOURCE_LINKS)
+                return await engine.crawl("Topic 1", 2), client.request_count
+            finally:
+                await pool.aclose()
+
+        graph, calls = asyncio.run(run())
+    finally:
+        server.stop()
+
+    # Root: 3 pages of links and 1 summary call; level 2 needs 13 link calls but only 3 are left
+    assert calls <= 8
+    assert graph["truncated"] is True
+    assert len(graph["nodes"]) == 1 + 5
+
+def test_crawl_rejects_unknown_link_source():
+    """
+    Test that a misconfigured link source fails fast.
+    """
+    with pytest.raises(ValueError):
+        CrawlEngine(None, None, max_neighbors=5, link_source="xml")
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import httpx
+from fastapi import HTTPException
+from main import app
+from dependencies import get_crawl_jobs
+from services.crawl_jobs import (CrawlJobManager, CrawlJobStore, STATUS_CANCELLED, STATUS_FAILED, STATUS_QUEUED,
+                                 STATUS_RUNNING, STATUS_SUCCEEDED)
+
+PARAMS = {"article_title": "Root", "depth": 2, "metrics": "degree", "max_neighbors": 3, "name": None, "save": True}
+
+def _events(count: int, delay: float = 0.0, hang: bool = False):
+    async def run_crawl(params):
+        yield {"type": "node", "node": {"id": params["article_title"], "label": params["article_title"], "summary": ""}}
+        for i in range(count):
+            await asyncio.sleep(delay)
+            yield {"type": "node", "node": {"id": f"N{i}", "label": f"N{i}", "summary": "s"}}
+            yield {"type": "edge", "edge": {"from": params["article_title"], "to": f"N{i}"}}
+        if hang:
+            await asyncio.sleep(3600)
+        yield {"type": "centrality", "scores": {params["article_title"]: {"degree_centrality": 1.0}}, "truncated": False}
+    return run_crawl
+
+def _manager(store, run_crawl, save=None, **kwargs):
+    return CrawlJobManager(store, run_crawl, save=save, poll_interval=0.02, checkpoint_interval=0.0, **kwargs)
+
+async def _wait_for(manager, job_id, *statuses):
+    for _ in range(500):
+        job = await manager.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stayed {job['status']}")
+
+def test_job_runs_in_background_and_saves_the_result(tmp_path):
+    """
+    Test that a submitted job is claimed, crawled and saved as an exploration.
+    """
+    saved = []
+    def save(name, nodes, edges):
+        saved.append((name, len(nodes), len(edges)))
+        return {"id": "exploration-1"}
+
+    async def scenario():
+        manager = _manager(CrawlJobStore(str(tmp_path / "jobs.sqlite3")), _events(5), save=save)
+        await manager.start()
+        try:
+            job = await manager.submit(PARAMS)
+            assert job["status"] == STATUS_QUEUED
+            done = await _wait_for(manager, job["id"], STATUS_SUCCEEDED, STATUS_FAILED)
+            return done, await manager.result(job["id"])
+        finally:
+            await manager.close()
+
+    done, result = asyncio.run(scenario())
+    assert done["status"] == STATUS_SUCCEEDED
+    assert done["exploration_id"] == "exploration-1"
+    assert (done["node_count"], done["edge_count"]) == (6, 5)
+    assert saved == [("Root", 6, 5)]
+    assert result["nodes"][0]["degree_centrality"] == 1.0
+
+def test_cancel_keeps_the_partial_graph_and_failures_are_recorded(tmp_path):
+    """
+    Test that cancelling a running job stops it without saving, and that crawl errors fail the job.
+    """
+    saved = []
+    async def failing(params):
+        raise HTTPException(status_code=404, detail="Article not found.")
+        yield
+
+    async def scenario():
+        store = CrawlJobStore(str(tmp_path / "jobs.sqlite3"))
+        manager = _manager(store, _events(2, hang=True), save=lambda *args: saved.append(args))
+        await manager.start()
+        try:
+            job = await manager.submit(PARAMS)
+            await _wait_for(manager, job["id"], STATUS_RUNNING)
+            while (await manager.get(job["id"]))["node_count"] < 3:
+                await asyncio.sleep(0.01)
+            cancelled = await manager.cancel(job["id"])
+            partial = await manager.result(job["id"])
+        finally:
+            await manager.close()
+
+        manager = _manager(store, failing)
+        await manager.start()
+        try:
+            failed = await _wait_for(manager, (await manager.submit(PARAMS))["id"], STATUS_FAILED)
+        finally:
+            await manager.close()
+        return cancelled, partial, failed
+
+    cancelled, partial, failed = asyncio.run(scenario())
+    assert cancelled["status"] == STATUS_CANCELLED
+    assert len(partial["nodes"]) == 3 and len(partial["edges"]) == 2
+    assert saved == []
+    assert failed["error"] == "Article not found."
+
+def test_cancel_during_save_records_the_exploration(tmp_path):
+    """
+    Test that a cancel landing while the result is being saved still records the exploration that was created.
+    """
+    saving, release = threading.Event(), threading.Event()
+    def save(name, nodes, edges):
+        saving.set()
+        release.wait(5)
+        return {"id": "exploration-1"}
+
+    async def scenario():
+        manager = _manager(CrawlJobStore(str(tmp_path / "jobs.sqlite3")), _events(2), save=save)
+        await manager.start()
+        try:
+            job = await manager.submit(PARAMS)
+            while not saving.is_set():
+                await asyncio.sleep(0.01)
+            threading.Timer(0.1, release.set).start()
+            return await manager.cancel(job["id"])
+        finally:
+            await manager.close()
+
+    cancelled = asyncio.run(scenario())
+    assert cancelled["status"] == STATUS_CANCELLED
+    assert cancelled["exploration_id"] == "exploration-1"
+
+def test_running_jobs_are_requeued_at_shutdown_and_resumed(tmp_path):
+    """
+    Test that the job table survives a restart: a job interrupted by shutdown runs again in the next manager.
+    """
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def scenario():
+        first = _manager(CrawlJobStore(path), _events(2, hang=True))
+        await first.start()
+        job = await first.submit(PARAMS)
+        await _wait_for(first, job["id"], STATUS_RUNNING)
+        await first.close()
+        interrupted = first.store.get(job["id"])
+        first.store.close()
+
+        second = _manager(CrawlJobStore(path), _events(2))
+        await second.start()
+        try:
+            return interrupted, await _wait_for(second, job["id"], STATUS_SUCCEEDED)
+        finally:
+            await second.close()
+
+    interrupted, resumed = asyncio.run(scenario())
+    assert interrupted["status"] == STATUS_QUEUED
+    assert resumed["node_count"] == 3
+
+def test_crawl_job_routes(tmp_path):
+    """
+    Test the HTTP flow: submit, poll the result, cancel conflicts and validation.
+    """
+    async def scenario():
+        manager = _manager(CrawlJobStore(str(tmp_path / "jobs.sqlite3")), _events(3))
+        await manager.start()
+        app.dependency_overrides[get_crawl_jobs] = lambda: manager
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                created = await client.post("/api/crawl-jobs", json={"article_title": "Root", "depth": 2, "save": False})
+                assert created.status_code == 202
+                job_id = created.json()["id"]
+                await _wait_for(manager, job_id, STATUS_SUCCEEDED)
+                result = (await client.get(f"/api/crawl-jobs/{job_id}/result")).json()
+                listed = (await client.get("/api/crawl-jobs")).json()
+                conflict = await client.post(f"/api/crawl-jobs/{job_id}/cancel")
+                bad_depth = await client.post("/api/crawl-jobs", json={"article_title": "Root", "depth": 99})
+                bad_metric = await client.post("/api/crawl-jobs", json={"article_title": "Root", "metrics": "nope"})
+                missing = await client.get("/api/crawl-jobs/unknown")
+                return created.json(), result, listed, conflict, bad_depth, bad_metric, missing
+        finally:
+            app.dependency_overrides.clear()
+            await manager.close()
+
+    created, result, listed, conflict, bad_depth, bad_metric, missing = asyncio.run(scenario())
+    assert created["status"] == STATUS_QUEUED and created["max_neighbors"] > 0
+    assert result["status"] == STATUS_SUCCEEDED and len(result["nodes"]) == 4 and len(result["edges"]) == 3
+    assert [job["id"] for job in listed["items"]] == [created["id"]]
+    assert conflict.status_code == 409
+    assert bad_depth.status_code == 400 and bad_metric.status_code == 400
+    assert missing.status_code == 404
@@ -0,0 +1,133 @@
+import json
+import pytest
+from unittest.mock import Mock
+from fastapi.testclient import TestClient
+from main import app
+from routers.explorations import get_neo4j_repository
+from services.exploration_transfer import NdjsonImporter, export_ndjson
+from services.neo4j_repository import Neo4jRepository, CLEAR_EXPLORATION_GRAPH_QUERY, EXPORT_QUERY, IMPORT_EXPLORATION_QUERY
+from fake_neo4j import FakeDriver
+
+EXPORT_ROWS = [
+    {"type": "exploration", "data": {"id": "e1", "name": "First", "node_count": 2, "edge_count": 1, "created_at": "2026-01-01T00:00:00Z"}},
+    {"type": "node", "data": {"exploration_id": "e1", "id": "A", "label": "A", "summary": "a", "degree_centrality": 1.0}},
+    {"type": "node", "data": {"exploration_id": "e1", "id": "B", "label": "B", "summary": "b", "degree_centrality": 1.0}},
+    {"type": "edge", "data": {"exploration_id": "e1", "from": "A", "to": "B"}},
+]
+
+def _export_lines():
+    driver = FakeDriver(responder=lambda query, params: EXPORT_ROWS if query == EXPORT_QUERY else [])
+    return b"".join(export_ndjson(Neo4jRepository(driver=driver)))
+
+def _fake_repo(batch_size=2):
+    repo = Mock(spec=Neo4jRepository)
+    repo.write_batch_size = batch_size
+    return repo
+
+def test_export_ndjson_one_line_per_record():
+    """
+    Test that every exploration, node and edge becomes one JSON line.
+    """
+    lines = _export_lines().splitlines()
+    assert [json.loads(line)["type"] for line in lines] == ["exploration", "node", "node", "edge"]
+    assert json.loads(lines[3]) == {"type": "edge", "exploration_id": "e1", "from": "A", "to": "B"}
+
+def test_importer_round_trip_with_split_chunks():
+    """
+    Test that an export re-imports correctly even when chunks split lines.
+    """
+    repo = _fake_repo()
+    importer = NdjsonImporter(repo)
+    payload = _export_lines()
+    for start in range(0, len(payload), 7):
+        importer.feed(payload[start:start + 7])
+    counts = importer.finish()
+
+    assert counts == {"explorations": 1, "nodes": 2, "edges": 1}
+    repo.import_exploration.assert_called_once()
+    assert repo.import_exploration.call_args[0][0]["id"] == "e1"
+    repo.import_nodes.assert_called_once()
+    assert [node["id"] for node in repo.import_nodes.call_args[0][1]] == ["A", "B"]
+    repo.import_edges.assert_called_once()
+    assert repo.import_edges.call_args[0][0] == "e1" # Edges are recorded as members of their exploration
+
+def test_importer_flushes_in_bounded_batches():
+    """
+    Test that nodes and edges are written every batch_size lines, nodes before edges.
+    """
+    repo = _fake_repo(batch_size=2)
+    calls = []
+    repo.import_nodes.side_effect = lambda exploration_id, nodes: calls.append(("nodes", len(nodes)))
+    repo.import_edges.side_effect = lambda exploration_id, edges: calls.append(("edges", len(edges)))
+
+    lines = [{"type": "exploration", "id": "e1", "name": "E"}]
+    lines += [{"type": "node", "exploration_id": "e1", "id": f"N{i}"} for i in range(5)]
+    lines += [{"type": "edge", "exploration_id": "e1", "from": "N0", "to": f"N{i}"} for i in range(1, 5)]
+    importer = NdjsonImporter(repo)
+    importer.feed(b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+    importer.finish()
+
+    assert calls == [("nodes", 2), ("nodes", 2), ("nodes", 1), ("edges", 2), ("edges", 2)]
+
+@pytest.mark.parametrize("payload", [
+    b"not json\n",
+    b'{"type": "node", "exploration_id": "e1", "id": "A"}\n',
+    b'{"type": "vertex"}\n',
+])
+def test_importer_rejects_bad_lines(payload):
+    """
+    Test that malformed or out-of-order lines are reported with their line number.
+    """
+    with pytest.raises(ValueError, match="Line 1"):
+        NdjsonImporter(_fake_repo()).feed(payload)
+
+@pytest.mark.parametrize("record", [
+    {"type": "node", "exploration_id": "e1", "label": "A"},
+    {"type": "edge", "exploration_id": "e1", "from": "A"},
+    {"type": "edge", "exploration_id": "e1", "from": "A", "to": ["B"]},
+])
+def test_importer_rejects_records_without_ids(record):
+    """
+    Test that nodes without an id and edges without both ends are refused before any write.
+    """
+    repo = _fake_repo()
+    payload = json.dumps({"type": "exploration", "id": "e1", "name": "E"}).encode() + b"\n" + json.dumps(record).encode() + b"\n"
+    with pytest.raises(ValueError, match="Line 2"):
+        importer = NdjsonImporter(repo)
+        importer.feed(payload)
+        importer.finish()
+    repo.import_nodes.assert_not_called()
+    repo.import_edges.assert_not_called()
+
+def test_import_replaces_the_graph_of_an_existing_exploration():
+    """
+    Test that importing over an existing id first takes its old nodes and edges out of it.
+    """
+    driver = FakeDriver()
+    Neo4jRepository(driver=driver).import_exploration({"id": "e1", "name": "E"})
+
+    assert driver.transactions == 1
+    assert [query for query, _ in driver.queries] == [CLEAR_EXPLORATION_GRAPH_QUERY, IMPORT_EXPLORATION_QUERY]
+    assert driver.queries[0][1]["exploration_id"] == "e1"
+
+def test_import_and_export_routes():
+    """
+    Test the streaming routes end to end with a fake repository.
+    """
+    driver = FakeDriver(responder=lambda query, params: EXPORT_ROWS if query == EXPORT_QUERY else [])
+    app.dependency_overrides[get_neo4j_repository] = lambda: Neo4jRepository(driver=driver)
+    try:
+        client = TestClient(app)
+        exported = client.get("/api/explorations/export")
+        assert exported.status_code == 200
+        assert exported.headers["content-type"].startswith("application/x-ndjson")
+
+        imported = client.post("/api/explorations/import", content=exported.content)
+        assert imported.json() == {"explorations": 1, "nodes": 2, "edges": 1}
+
+        rejected = client.post("/api/explorations/import", content=b"{}\n")
+        assert rejected.status_code == 400
+        missing_id = client.post("/api/explorations/import", content=exported.content.replace(b'"id": "A", ', b""))
+        assert missing_id.status_code == 400
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from routers.wikipedia import get_wikipedia_client
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.crawl_engine import CrawlEngine
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import DegreeCentralityStrategy
+from wikipedia_stub import WikipediaStubServer
+
+@pytest.fixture
+def stub():
+    server = WikipediaStubServer(links_per_article=5).start()
+    yield server
+    server.stop()
+
+def _stream(api_url: str, title: str, depth: int, on_event=None):
+    async def run():
+        pool = WikipediaConnectionPool(api_url=api_url)
+        try:
+            engine = CrawlEngine(AsyncWikipediaClient(pool=pool), GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=5)
+            events = []
+            async for event in engine.stream(title, depth):
+                events.append(event)
+                if on_event:
+                    on_event(event)
+            return events
+        finally:
+            await pool.aclose()
+    return asyncio.run(run())
+
+def test_root_node_is_sent_before_any_summary_is_fetched(stub):
+    requests_at_event = []
+    events = _stream(stub.api_url, "Topic 1", 2, on_event=lambda event: requests_at_event.append(stub.request_count))
+
+    assert events[0] == {"type": "node", "node": {"id": "Topic 1", "label": "Topic 1", "summary": ""}}
+    assert requests_at_event[0] == 1 # Only the root article was loaded
+    assert events[1]["node"]["summary"] == "Topic 1 is a synthetic article."
+    assert events[-1]["type"] == "centrality" and events[-1]["truncated"] is False
+    assert [event["type"] for event in events[:-1]].count("edge") == 5 + 25
+
+def test_streamed_events_fold_into_the_crawl_result(stub):
+    events = _stream(stub.api_url, "Topic 1", 2)
+    nodes = {event["node"]["id"] for event in events if event["type"] == "node"}
+    scores = events[-1]["scores"]
+
+    assert len(nodes) == 1 + 5 + 25
+    assert set(scores) == nodes
+    assert all("degree_centrality" in node_scores for node_scores in scores.values())
+
+@pytest.fixture
+def client(stub):
+    async def wikipedia_client():
+        pool = WikipediaConnectionPool(api_url=stub.api_url)
+        try:
+            yield AsyncWikipediaClient(pool=pool)
+        finally:
+            await pool.aclose()
+
+    app.dependency_overrides[get_wikipedia_client] = wikipedia_client
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+def test_stream_endpoint_sends_ndjson_events(client):
+    response = client.get("/api/explore/Topic 1/stream")
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert events[0]["node"]["id"] == "Topic 1"
+    assert events[-1]["type"] == "centrality"
+    assert len(events[-1]["scores"]) == 6
+
+def test_stream_endpoint_reports_a_missing_root_with_its_status(client):
+    assert client.get("/api/explore/Nope/stream").status_code == 404
+    assert client.get("/api/explore/Topic 1/stream?depth=9").status_code == 400
@@ -80,6 +80,7 @@ def test_graph_analyzer_with_mock_strategy(sample_graph_data):
     
     # Mock a strategy
     mock_strategy = Mock(spec=GraphAnalysisStrategy)
+    mock_strategy.output_key = "degree_centrality"
     mock_strategy.analyze.return_value = {
         "A": 0.1, "B": 0.2, "C": 0.3, "D": 0.4
     }
@@ -0,0 +1,96 @@
+import json
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from routers.explorations import get_neo4j_repository
+from services.graph_encoding import GraphEncoder, compact_graph, expand_graph, COMPACT_MEDIA_TYPE, FORMAT_COMPACT
+from services.neo4j_repository import Neo4jRepository, GET_EXPLORATION_QUERY
+from fake_neo4j import FakeDriver
+
+def _graph(size: int) -> dict:
+    nodes = [{"id": f"Article {i}", "label": f"Article {i}", "summary": f"Article {i} is about topic {i}. " * 8,
+              "degree_centrality": i / size} for i in range(size)]
+    edges = [{"from": f"Article {i}", "to": f"Article {(i * 7 + j) % size}"} for i in range(size) for j in range(1, 4)]
+    return {"nodes": nodes, "edges": edges, "truncated": False}
+
+def test_compact_graph_round_trips():
+    graph = _graph(20)
+    compact = compact_graph(graph)
+
+    assert compact["nodes"][:2] == ["Article 0", "Article 1"]
+    assert "labels" not in compact # Every label equals its id
+    assert compact["edges"][0] == [0, 1]
+    assert expand_graph(compact) == graph
+
+def test_summaries_are_truncated_or_left_out():
+    graph = {"nodes": [{"id": "A", "label": "A", "summary": "A long summary of A."}], "edges": [{"from": "A", "to": "B"}]}
+
+    assert compact_graph(graph, summary_chars=6)["summaries"] == ["A long…", None]
+    assert "summaries" not in compact_graph(graph, summary_chars=0)
+    assert compact_graph(graph)["nodes"] == ["A", "B"] # Edge endpoints without a node entry get an index too
+
+def test_compact_encoding_is_a_fraction_of_the_default_json():
+    graph = _graph(500)
+    default = json.dumps(graph).encode("utf-8")
+    compact = orjson.dumps(compact_graph(graph, summary_chars=0))
+
+    assert len(compact) < len(default) / 4
+
+def test_codings_with_q_zero_are_not_used():
+    def encoding(accept_encoding):
+        return GraphEncoder(FORMAT_COMPACT, accept_encoding=accept_encoding)._content_encoding()
+
+    assert encoding("gzip;q=0") is None
+    assert encoding("br;q=0, gzip") == "gzip"
+    assert encoding("gzip; q=0.5, identity") == "gzip"
+    assert encoding("gzip;q=bad") is None
+    assert encoding("") is None
+
+def _exploration_responder(query: str, params: dict):
+    if query == GET_EXPLORATION_QUERY:
+        graph = _graph(200)
+        if not params["include_summaries"]:
+            for node in graph["nodes"]:
+                node["summary"] = None
+        return [{"id": "e1", "name": "Big", **graph}]
+    return []
+
+@pytest.fixture
+def client():
+    driver = FakeDriver(responder=_exploration_responder)
+    app.dependency_overrides[get_neo4j_repository] = lambda: Neo4jRepository(driver=driver)
+    try:
+        yield TestClient(app), driver
+    finally:
+        app.dependency_overrides.clear()
+
+def test_exploration_negotiates_compact_gzipped_responses(client):
+    client, driver = client
+    response = client.get("/api/explorations/e1", headers={"Accept": COMPACT_MEDIA_TYPE, "Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == COMPACT_MEDIA_TYPE
+    assert response.headers["content-encoding"] == "gzip"
+    body = response.json()
+    assert body["id"] == "e1" and body["encoding"] == "compact"
+    assert len(body["nodes"]) == 200 and len(body["edges"]) == 600
+
+def test_summary_chars_zero_skips_reading_summaries(client):
+    client, driver = client
+    body = client.get("/api/explorations/e1?format=compact&summary_chars=0").json()
+
+    assert "summaries" not in body
+    assert driver.queries[-1][1]["include_summaries"] is False
+
+def test_default_and_unknown_formats(client):
+    client, _ = client
+    assert client.get("/api/explorations/e1").json()["nodes"][0]["id"] == "Article 0"
+    assert client.get("/api/explorations/e1?format=xml").status_code == 400
+
+def test_msgpack_encoding(client):
+    msgpack = pytest.importorskip("msgpack")
+    client, _ = client
+    response = client.get("/api/explorations/e1", headers={"Accept": "application/msgpack"})
+
+    assert msgpack.unpackb(response.content)["nodes"][0] == "Article 0"
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from fastapi.testclient import TestClient
+from main import app
+from routers.explorations import get_neo4j_repository
+from services.neo4j_repository import (
+    Neo4jRepository,
+    GET_NODE_QUERY,
+    NEIGHBOURHOOD_STEP_QUERY,
+    NEIGHBOURHOOD_PATTERNS,
+    SHORTEST_PATH_QUERY,
+    TOP_NODES_QUERY,
+    TOP_NODE_METRICS,
+)
+from fake_neo4j import FakeDriver, FakeSession, FakeTransaction
+
+# A -> B -> C -> D, A -> E
+LINKS = {"A": ["B", "E"], "B": ["C"], "C": ["D"], "D": [], "E": []}
+
+def _node(node_id: str) -> dict:
+    return {"id": node_id, "label": node_id, "degree_centrality": 0.5}
+
+def _graph_responder(query: str, params: dict):
+    if query == GET_NODE_QUERY:
+        return [{"node": _node(params["id"])}] if params["id"] in LINKS else []
+    if query == NEIGHBOURHOOD_STEP_QUERY % NEIGHBOURHOOD_PATTERNS["out"]:
+        found = sorted({link for node_id in params["frontier"] for link in LINKS[node_id]} - set(params["seen"]))
+        return [{"node": _node(node_id)} for node_id in found[:params["limit"]]]
+    if query == SHORTEST_PATH_QUERY % 3 and params["target"] == "D":
+        return [{"position": i, "node": _node(node_id)} for i, node_id in enumerate("ABCD")]
+    if query.startswith(TOP_NODES_QUERY.split("%s")[0]):
+        return [{"node": {"id": f"N{i}", "label": f"N{i}", "score": 1000 - i}} for i in range(params["limit"])]
+    return []
+
+def _lines(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_neighbourhood_expands_breadth_first_in_one_read_transaction():
+    driver = FakeDriver(responder=_graph_responder)
+    repo = Neo4jRepository(driver=driver)
+
+    nodes = list(repo.neighbourhood("A", hops=2, limit=10, direction="out"))
+
+    assert [(node["id"], node["hops"]) for node in nodes] == [("A", 0), ("B", 1), ("E", 1), ("C", 2)]
+    assert driver.transactions == 1
+    step_params = [params for query, params in driver.queries if query.startswith("\n    UNWIND $frontier")]
+    assert step_params[1]["frontier"] == ["B", "E"]
+    assert step_params[1]["seen"] == ["A", "B", "E"]
+
+def test_neighbourhood_respects_result_limit():
+    repo = Neo4jRepository(driver=FakeDriver(responder=_graph_responder))
+
+    nodes = list(repo.neighbourhood("A", hops=3, limit=2, direction="out"))
+
+    assert [node["id"] for node in nodes] == ["A", "B", "E"]
+
+def test_retried_read_transaction_does_not_repeat_records(monkeypatch):
+    """
+    Test that records streamed by a failed attempt are not sent again when the driver retries.
+    """
+    def execute_read_twice(self, work, *args, **kwargs):
+        work(FakeTransaction(self._driver), *args, **kwargs) # First attempt, as if its commit had failed
+        return work(FakeTransaction(self._driver), *args, **kwargs)
+
+    monkeypatch.setattr(FakeSession, "execute_read", execute_read_twice)
+    repo = Neo4jRepository(driver=FakeDriver(responder=_graph_responder))
+
+    nodes = list(repo.top_nodes("degree_centrality", limit=5))
+
+    assert [node["id"] for node in nodes] == ["N0", "N1", "N2", "N3", "N4"]
+
+def test_closing_the_stream_stops_the_transaction():
+    repo = Neo4jRepository(driver=FakeDriver(responder=_graph_responder))
+    threads_before = threading.active_count()
+
+    records = repo.top_nodes("in_links", limit=1000) # More than the read-ahead buffer
+    assert next(records)["id"] == "N0"
+    records.close()
+
+    deadline = time.monotonic() + 2
+    while threading.active_count() > threads_before and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert threading.active_count() == threads_before
+
+def test_graph_routes():
+    driver = FakeDriver(responder=_graph_responder)
+    app.dependency_overrides[get_neo4j_repository] = lambda: Neo4jRepository(driver=driver)
+    try:
+        client = TestClient(app)
+
+        path = client.get("/api/graph/shortest-path", params={"source": "A", "target": "D", "max_hops": 3})
+        assert path.status_code == 200
+        assert path.headers["content-type"].startswith("application/x-ndjson")
+        assert [node["id"] for node in _lines(path)] == ["A", "B", "C", "D"]
+        assert client.get("/api/graph/shortest-path", params={"source": "D", "target": "A", "max_hops": 3}).status_code == 404
+        assert client.get("/api/graph/shortest-path", params={"source": "A", "target": "A"}).status_code == 400
+        assert client.get("/api/graph/shortest-path", params={"source": "A", "target": "D", "max_hops": 50}).status_code == 422
+
+        neighbourhood = client.get("/api/graph/neighbourhood", params={"id": "A", "direction": "out"})
+        assert [node["id"] for node in _lines(neighbourhood)] == ["A", "B", "E"]
+        assert client.get("/api/graph/neighbourhood", params={"id": "Z"}).status_code == 404
+
+        top = client.get("/api/graph/top", params={"metric": "explorations", "limit": 3})
+        assert [node["score"] for node in _lines(top)] == [1000, 999, 998]
+        assert any(TOP_NODE_METRICS["explorations"] in query for query, _ in driver.queries)
+        assert client.get("/api/graph/top", params={"metric": "closeness"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
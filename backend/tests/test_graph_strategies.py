@@ -0,0 +1,127 @@
+import pytest
+import networkx as nx
+import numpy as np
+from fastapi import HTTPException
+from routers.wikipedia import get_graph_analyzer
+from services.csr_graph import CSRGraph
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import (
+    BetweennessCentralityStrategy,
+    DegreeCentralityStrategy,
+    HITSAuthorityStrategy,
+    HITSHubStrategy,
+    InDegreeCentralityStrategy,
+    OutDegreeCentralityStrategy,
+    PageRankStrategy,
+    STRATEGIES,
+)
+
+def _random_graph(seed: int) -> nx.DiGraph:
+    graph = nx.gnp_random_graph(120, 0.04, seed=seed, directed=True)
+    graph.add_edge(3, 3) # Self-loop
+    graph.add_node(500) # Isolated node
+    return nx.relabel_nodes(graph, {node: f"Topic {node}" for node in graph})
+
+def _star_graph() -> nx.DiGraph:
+    # The shape of a depth-1 explore: the root links to every neighbour
+    graph = nx.DiGraph()
+    graph.add_edges_from(("Root", f"Leaf {i}") for i in range(15))
+    graph.add_edges_from([("Leaf 1", "Leaf 2"), ("Leaf 2", "Root")])
+    return graph
+
+GRAPHS = {
+    "random-1": lambda: _random_graph(1),
+    "random-2": lambda: _random_graph(2),
+    "star": _star_graph,
+    "path": lambda: nx.path_graph(["A", "B", "C", "D"], create_using=nx.DiGraph),
+}
+
+def _assert_parity(actual: dict, expected: dict, tolerance: float):
+    assert set(actual) == set(expected)
+    for node, value in expected.items():
+        assert actual[node] == pytest.approx(value, abs=tolerance), node
+
+# --- CSRGraph ---
+
+def test_csr_graph_dedupes_edges_and_adds_missing_endpoints():
+    graph = CSRGraph.from_edges(["A", "B"], [("A", "B"), ("A", "B"), ("B", "C")])
+
+    assert graph.node_ids == ["A", "B", "C"]
+    assert graph.edge_count == 2
+    assert graph.out_degree().tolist() == [1, 1, 0]
+    assert graph.in_degree().tolist() == [0, 1, 1]
+    assert graph.index["C"] == 2
+
+# --- NetworkX parity ---
+
+@pytest.mark.parametrize("graph_name", GRAPHS)
+@pytest.mark.parametrize("strategy, reference", [
+    (DegreeCentralityStrategy(), nx.degree_centrality),
+    (InDegreeCentralityStrategy(), nx.in_degree_centrality),
+    (OutDegreeCentralityStrategy(), nx.out_degree_centrality),
+    (PageRankStrategy(), nx.pagerank),
+    (BetweennessCentralityStrategy(max_sources=None), nx.betweenness_centrality),
+])
+def test_strategy_matches_networkx(graph_name, strategy, reference):
+    graph = GRAPHS[graph_name]()
+
+    _assert_parity(strategy.analyze(graph), reference(graph), tolerance=1e-9)
+
+# HITS is only well defined when the leading singular value is unique, which a path graph lacks
+@pytest.mark.parametrize("graph_name", ["random-1", "random-2", "star"])
+def test_hits_matches_networkx(graph_name):
+    graph = GRAPHS[graph_name]()
+    hubs, authorities = nx.hits(graph)
+
+    _assert_parity(HITSHubStrategy().analyze(graph), hubs, tolerance=1e-6)
+    _assert_parity(HITSAuthorityStrategy().analyze(graph), authorities, tolerance=1e-6)
+
+def test_sampled_betweenness_matches_networkx_with_same_seed():
+    graph = _random_graph(3)
+    strategy = BetweennessCentralityStrategy(max_sources=30, seed=7)
+
+    _assert_parity(strategy.analyze(graph), nx.betweenness_centrality(graph, k=30, seed=7), tolerance=1e-9)
+
+def test_sampled_betweenness_needs_two_sources():
+    with pytest.raises(ValueError):
+        BetweennessCentralityStrategy(max_sources=1)
+    scores = BetweennessCentralityStrategy(max_sources=2).analyze(_random_graph(5))
+    assert all(np.isfinite(value) for value in scores.values())
+
+def test_betweenness_batches_do_not_change_result(monkeypatch):
+    graph = _random_graph(4)
+    expected = BetweennessCentralityStrategy(max_sources=None).analyze(graph)
+
+    monkeypatch.setattr(BetweennessCentralityStrategy, "BATCH_CELLS", 5 * len(graph)) # Batches of 5 sources
+
+    _assert_parity(BetweennessCentralityStrategy(max_sources=None).analyze(graph), expected, tolerance=1e-12)
+
+def test_single_node_graph():
+    graph = CSRGraph.from_edges(["A"], [])
+
+    assert DegreeCentralityStrategy().analyze(graph) == {"A": 1.0}
+    assert PageRankStrategy().analyze(graph) == {"A": 1.0}
+    assert BetweennessCentralityStrategy().analyze(graph) == {"A": 0.0}
+
+# --- GraphAnalyzer with several strategies ---
+
+def test_graph_analyzer_writes_each_strategy_output_key():
+    nodes = [{"id": "A"}, {"id": "B"}, {"id": "C"}]
+    edges = [{"from": "A", "to": "B"}, {"from": "B", "to": "C"}]
+    analyzer = GraphAnalyzer(strategies=[strategy_class() for strategy_class in STRATEGIES.values()])
+
+    modified_nodes = analyzer.analyze_and_add_results(nodes, edges)
+
+    for strategy in analyzer.strategies:
+        assert all(strategy.output_key in node for node in modified_nodes)
+    node_b = modified_nodes[1]
+    assert node_b["betweenness_centrality"] == pytest.approx(0.5)
+    assert node_b["in_degree_centrality"] == pytest.approx(0.5)
+
+def test_explore_metrics_pick_strategies_by_name():
+    analyzer = get_graph_analyzer("degree, pagerank", executor=None)
+
+    assert [strategy.output_key for strategy in analyzer.strategies] == ["degree_centrality", "pagerank"]
+    with pytest.raises(HTTPException) as exc_info:
+        get_graph_analyzer("degree,closeness", executor=None)
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+from services.link_index import LinkIndex
+
+def test_put_and_get_keep_link_order():
+    """
+    Test that links come back in the order they were put, sliced to the limit, and that titles are interned once.
+    """
+    index = LinkIndex()
+    index.put({"A": ["B", "C", "D"], "B": ["A", "C"]})
+
+    assert index.get_links(["A", "B", "Z"]) == {"A": ["B", "C", "D"], "B": ["A", "C"]}
+    assert index.get_links(["A"], limit=2) == {"A": ["B", "C"]}
+    stats = index.stats()
+    assert stats["titles"] == 4
+    assert stats["links"] == 5
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+def test_put_replaces_links():
+    """
+    Test that putting an article again replaces its row instead of growing it.
+    """
+    index = LinkIndex()
+    index.put({"A": ["B", "C"]})
+    before = index.stats()["bytes"]
+    index.put({"A": ["C", "B"]})
+
+    assert index.get_links(["A"]) == {"A": ["C", "B"]}
+    assert index.stats()["bytes"] == before
+
+def test_ttl_expiration():
+    """
+    Test that rows older than the TTL are dropped on access.
+    """
+    index = LinkIndex(ttl=10)
+    with patch("services.link_index.time.monotonic", return_value=100.0):
+        index.put({"A": ["B"]})
+    with patch("services.link_index.time.monotonic", return_value=111.0):
+        assert index.get_links(["A"]) == {}
+    assert index.expirations == 1
+    assert index.stats()["articles"] == 0
+
+def test_lru_eviction_by_bytes():
+    """
+    Test that the least recently read rows are evicted once the byte budget is exceeded.
+    """
+    probe = LinkIndex()
+    probe.put({f"Article {i}": ["Link 0", "Link 1"] for i in range(3)})
+    index = LinkIndex(max_bytes=probe.stats()["bytes"] - 1) # One byte short of three articles
+
+    index.put({"Article 0": ["Link 0", "Link 1"]})
+    index.put({"Article 1": ["Link 0", "Link 1"]})
+    index.get_links(["Article 0"]) # Article 1 is now the least recently used
+    index.put({"Article 2": ["Link 0", "Link 1"]})
+
+    assert set(index.get_links(["Article 0", "Article 1", "Article 2"])) == {"Article 0", "Article 2"}
+    assert index.evictions == 1
+    assert index.stats()["bytes"] <= index.max_bytes
+
+def test_compaction_drops_unreferenced_titles():
+    """
+    Test that titles only referenced by evicted rows are dropped by compaction.
+    """
+    index = LinkIndex(max_bytes=40_000)
+    for i in range(20):
+        index.put({f"Article {i}": [f"Article {i} link {j}" for j in range(20)]})
+
+    stats = index.stats()
+    assert stats["compactions"] >= 1
+    assert stats["bytes"] <= index.max_bytes
+    assert stats["titles"] < 20 * 21
+    kept = index.get_links([f"Article {i}" for i in range(20)])
+    assert "Article 19" in kept
+    assert all(links == [f"{title} link {j}" for j in range(20)] for title, links in kept.items())
+
+def test_compaction_waits_for_enough_dead_titles():
+    """
+    Test that a full index does not compact on every put: eviction leaves slack and titles leave with their rows.
+    """
+    index = LinkIndex(max_bytes=200_000)
+    puts = 300
+    for i in range(puts):
+        index.put({f"Article {i}": [f"Article {i} link {j}" for j in range(20)]})
+        assert index.stats()["bytes"] <= index.max_bytes
+
+    stats = index.stats()
+    assert stats["evictions"] > 0
+    assert 1 <= stats["compactions"] <= puts // 5 # Each one frees at least the 10% of slack below max_bytes
+    # Titles of evicted rows are dead until the next compaction, and only those
+    assert stats["titles"] - stats["dead_titles"] == stats["articles"] * 21
+
+def test_shared_titles_stay_live():
+    """
+    Test that a title is only dead once no row refers to it any more.
+    """
+    index = LinkIndex()
+    index.put({"A": ["Shared", "Only A"], "B": ["Shared"]})
+    index.put({"A": ["Other"]}) # Only A is now unreferenced
+
+    assert index.stats()["dead_titles"] == 1
+    index.put({"C": ["Only A"]})
+    assert index.stats()["dead_titles"] == 0
+
+def test_redirects_resolve_to_the_target_row():
+    """
+    Test that a redirect reads the links of its target and reports the target's title.
+    """
+    index = LinkIndex()
+    index.put({"Target": ["X", "Y"]}, redirects={"Alias": "Target"})
+
+    assert index.get_resolved_links(["Alias", "Target"]) == {"Alias": (["X", "Y"], "Target"), "Target": (["X", "Y"], "Target")}
+    assert index.get_links(["Alias"], limit=1) == {"Alias": ["X"]}
+    index.put({"Alias": ["Z"]}) # The title became an article of its own
+    assert index.get_resolved_links(["Alias"]) == {"Alias": (["Z"], "Alias")}
+    assert index.stats()["redirects"] == 0
@@ -0,0 +1,93 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from dependencies import set_global_metrics
+from routers.explorations import get_neo4j_repository
+from routers.wikipedia import get_wikipedia_client
+from services import metrics
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.metrics import Histogram, MetricsRegistry
+from services.neo4j_repository import Neo4jRepository, GET_EXPLORATION_QUERY
+from fake_neo4j import FakeDriver
+from wikipedia_stub import WikipediaStubServer
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry(server_timing=True)
+    metrics.activate(registry)
+    set_global_metrics(registry)
+    try:
+        yield registry
+    finally:
+        metrics.activate(None)
+        set_global_metrics(None)
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage="a")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{stage="a",le="0.1"} 1',
+        'latency_seconds_bucket{stage="a",le="1.0"} 2',
+        'latency_seconds_bucket{stage="a",le="+Inf"} 3',
+        'latency_seconds_sum{stage="a"} 5.55',
+        'latency_seconds_count{stage="a"} 3',
+    ]
+
+def test_hooks_are_no_ops_while_disabled():
+    session = object()
+    assert metrics.span("a") is metrics.span("b")
+    assert metrics.instrument_session(session, "read") is session
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 404
+    assert "server-timing" not in response.headers
+
+@pytest.fixture
+def stub():
+    server = WikipediaStubServer(links_per_article=5).start()
+    yield server
+    server.stop()
+
+def test_explore_stages_and_upstream_calls_are_recorded(registry, stub):
+    async def wikipedia_client():
+        pool = WikipediaConnectionPool(api_url=stub.api_url)
+        try:
+            yield AsyncWikipediaClient(pool=pool)
+        finally:
+            await pool.aclose()
+
+    app.dependency_overrides[get_wikipedia_client] = wikipedia_client
+    try:
+        client = TestClient(app)
+        response = client.get("/api/explore/Topic 1")
+        exposition = client.get("/metrics").text
+    finally:
+        app.dependency_overrides.clear()
+
+    stages = {entry.split(";")[0].strip() for entry in response.headers["server-timing"].split(",")}
+    assert {"crawl_root", "extract_links", "crawl_summaries", "graph_analysis", "upstream", "total"} <= stages
+    assert 'wikigraph_upstream_requests_total{client="async",status="200"} 2' in exposition
+    assert 'wikigraph_http_request_seconds_count{method="GET",route="/api/explore/{article_title}",status="200"} 1' in exposition
+    assert 'wikigraph_request_upstream_calls_bucket{route="/api/explore/{article_title}",le="2.0"} 1' in exposition
+
+def test_neo4j_transactions_are_counted_per_request(registry):
+    def responder(query, params):
+        if query == GET_EXPLORATION_QUERY:
+            return [{"id": "e1", "name": "E", "nodes": [{"id": "A", "label": "A"}], "edges": []}]
+        return []
+
+    driver = FakeDriver(responder=responder)
+    app.dependency_overrides[get_neo4j_repository] = lambda: Neo4jRepository(driver=driver)
+    try:
+        client = TestClient(app)
+        response = client.get("/api/explorations/e1")
+        exposition = client.get("/metrics").text
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert "neo4j;dur=" in response.headers["server-timing"]
+    assert 'wikigraph_neo4j_queries_total{operation="get_exploration"} 1' in exposition
+    assert 'wikigraph_neo4j_transaction_seconds_count{operation="get_exploration"} 1' in exposition
@@ -0,0 +1,195 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from routers.explorations import get_neo4j_repository
+from services.neo4j_repository import (Neo4jRepository, UPSERT_NODES_QUERY, MERGE_EDGES_QUERY, LIST_EXPLORATIONS_QUERY,
+                                       GET_EXPLORATION_QUERY, PATCH_EXPLORATION_QUERY, REMOVE_NODES_QUERY,
+                                       REMOVE_EDGES_QUERY, REFRESH_COUNTS_QUERY)
+from fake_neo4j import FakeDriver
+
+def _graph(node_count: int):
+    nodes = [{"id": f"N{i}", "label": f"N{i}", "summary": "s", "degree_centrality": 0.5} for i in range(node_count)]
+    edges = [{"from": "N0", "to": f"N{i}"} for i in range(1, node_count)]
+    return nodes, edges
+
+def test_save_exploration_batches_nodes_and_edges(monkeypatch):
+    """
+    Test that nodes and edges are written with one UNWIND statement per batch.
+    """
+    monkeypatch.setenv("NEO4J_WRITE_BATCH_SIZE", "100")
+    driver = FakeDriver()
+    nodes, edges = _graph(250)
+
+    saved = Neo4jRepository(driver=driver).save_exploration("Big", nodes, edges)
+
+    queries = [query for query, _ in driver.queries]
+    assert driver.transactions == 1
+    assert queries.count(UPSERT_NODES_QUERY) == 3 # 100 + 100 + 50
+    assert queries.count(MERGE_EDGES_QUERY) == 3 # 100 + 100 + 49
+    node_batches = [params["nodes"] for query, params in driver.queries if query == UPSERT_NODES_QUERY]
+    assert [len(batch) for batch in node_batches] == [100, 100, 50]
+    assert node_batches[0][0] == {"id": "N0", "label": "N0", "summary": "s", "degree_centrality": 0.5}
+    assert all(params["exploration_id"] == saved["id"] for query, params in driver.queries if query == UPSERT_NODES_QUERY)
+    edge_batches = [params["edges"] for query, params in driver.queries if query == MERGE_EDGES_QUERY]
+    assert edge_batches[-1][-1] == {"from": "N0", "to": "N249"}
+    assert not any("CachedArticle" in query or "fetched_at" in query for query in queries) # Client summaries never feed the crawl cache
+    assert saved["name"] == "Big"
+
+def test_save_empty_exploration_creates_only_the_exploration():
+    """
+    Test that an empty graph does not send empty UNWIND statements.
+    """
+    driver = FakeDriver()
+    Neo4jRepository(driver=driver).save_exploration("Empty", [], [])
+    assert len(driver.queries) == 1
+    assert driver.queries[0][0].startswith("CREATE (e:Exploration")
+
+def _listing_driver(rows):
+    def responder(query, params):
+        if query == LIST_EXPLORATIONS_QUERY:
+            return rows[:params["limit"]]
+        return []
+    return FakeDriver(responder=responder)
+
+def test_save_exploration_records_listing_metadata():
+    """
+    Test that the Exploration node carries the counts the listing reads.
+    """
+    driver = FakeDriver()
+    nodes, edges = _graph(5)
+    Neo4jRepository(driver=driver).save_exploration("Small", nodes, edges)
+    query, params = driver.queries[0]
+    assert "created_at: datetime()" in query
+    assert params["node_count"] == 5
+    assert params["edge_count"] == 4
+
+def test_list_explorations_pages_with_cursor():
+    """
+    Test that a full page returns a cursor that resumes after its last item.
+    """
+    rows = [{"id": f"id-{i}", "name": f"E{i}", "node_count": 1, "edge_count": 0, "created_at": f"2026-01-0{9 - i}T00:00:00Z"} for i in range(3)]
+    driver = _listing_driver(rows)
+    repo = Neo4jRepository(driver=driver)
+
+    page = repo.list_explorations(limit=2)
+    assert [item["id"] for item in page["items"]] == ["id-0", "id-1"]
+    assert driver.queries[0][1]["limit"] == 3
+    assert driver.queries[0][1]["cursor_created_at"] is None
+
+    repo.list_explorations(limit=2, cursor=page["next_cursor"])
+    assert driver.queries[1][1]["cursor_created_at"] == "2026-01-08T00:00:00Z"
+    assert driver.queries[1][1]["cursor_id"] == "id-1"
+
+def test_list_explorations_last_page_has_no_cursor():
+    """
+    Test that a short page ends the pagination.
+    """
+    rows = [{"id": "id-0", "name": "E0", "node_count": 1, "edge_count": 0, "created_at": "2026-01-01T00:00:00Z"}]
+    page = Neo4jRepository(driver=_listing_driver(rows)).list_explorations(limit=2)
+    assert len(page["items"]) == 1
+    assert page["next_cursor"] is None
+
+def test_list_explorations_rejects_bad_cursor():
+    """
+    Test that a cursor we did not issue is refused before querying.
+    """
+    driver = FakeDriver()
+    with pytest.raises(ValueError):
+        Neo4jRepository(driver=driver).list_explorations(cursor="not-a-cursor")
+    assert driver.queries == []
+
+def test_get_exploration_passes_summary_flag_and_handles_missing():
+    """
+    Test single-exploration loading with and without summaries.
+    """
+    def responder(query, params):
+        if params["id"] == "known":
+            return [{"id": "known", "name": "K", "nodes": [{"id": "A", "label": "A", "summary": None, "degree_centrality": 0.0}], "edges": []}]
+        return []
+    driver = FakeDriver(responder=responder)
+    repo = Neo4jRepository(driver=driver)
+
+    exploration = repo.get_exploration("known", include_summaries=False)
+    assert exploration["nodes"][0]["summary"] is None
+    assert driver.queries[0][1]["include_summaries"] is False
+    assert repo.get_exploration("unknown") is None
+
+def _stored_driver(node_count: int):
+    """
+    A driver holding one saved exploration "known" with the graph of _graph(node_count).
+    """
+    nodes, edges = _graph(node_count)
+    def responder(query, params):
+        if params.get("id") != "known":
+            return []
+        if query == GET_EXPLORATION_QUERY:
+            return [{"id": "known", "name": "K", "nodes": nodes, "edges": edges}]
+        if query == PATCH_EXPLORATION_QUERY:
+            return [{"name": params["name"] or "K", "node_count": node_count, "edge_count": node_count - 1}]
+        if query == REFRESH_COUNTS_QUERY:
+            return [{"node_count": 0, "edge_count": 0}]
+        return []
+    return FakeDriver(responder=responder)
+
+def test_update_exploration_writes_only_the_delta():
+    """
+    Test that a patch sends one statement per kind of change, sized by the change, in one transaction.
+    """
+    driver = _stored_driver(1000)
+    result = Neo4jRepository(driver=driver).update_exploration(
+        "known", add_nodes=[{"id": "New", "label": "New"}], remove_nodes=["N5"],
+        add_edges=[{"from": "N0", "to": "New"}], remove_edges=[{"from": "N0", "to": "N6"}])
+
+    assert driver.transactions == 1
+    queries = [query for query, _ in driver.queries]
+    assert queries == [PATCH_EXPLORATION_QUERY, REMOVE_EDGES_QUERY, REMOVE_NODES_QUERY, UPSERT_NODES_QUERY,
+                       MERGE_EDGES_QUERY, REFRESH_COUNTS_QUERY]
+    assert driver.queries[2][1]["ids"] == ["N5"]
+    # Edges are added to and removed from this exploration only
+    assert all(params["exploration_id"] == "known" for query, params in driver.queries
+               if query in (REMOVE_EDGES_QUERY, MERGE_EDGES_QUERY))
+    assert result["upserted_nodes"] == 1 and result["removed_edges"] == 1
+
+def test_replace_exploration_graph_diffs_against_the_stored_graph():
+    """
+    Test that sending the whole edited graph writes only the nodes and edges that changed.
+    """
+    driver = _stored_driver(50)
+    nodes, edges = _graph(50)
+    nodes = [node for node in nodes if node["id"] != "N49"]
+    nodes[1] = {**nodes[1], "summary": "edited"}
+    nodes.append({"id": "N50", "label": "N50", "summary": None, "degree_centrality": None})
+    edges = [edge for edge in edges if edge["to"] != "N49"] + [{"from": "N1", "to": "N50"}]
+
+    result = Neo4jRepository(driver=driver).replace_exploration_graph("known", nodes, edges, name="Renamed")
+
+    assert driver.transactions == 1
+    written = {query: params for query, params in driver.queries}
+    assert [node["id"] for node in written[UPSERT_NODES_QUERY]["nodes"]] == ["N1", "N50"]
+    assert written[REMOVE_NODES_QUERY]["ids"] == ["N49"]
+    assert written[MERGE_EDGES_QUERY]["edges"] == [{"from": "N1", "to": "N50"}]
+    assert written[REMOVE_EDGES_QUERY]["edges"] == [{"from": "N0", "to": "N49"}]
+    assert written[PATCH_EXPLORATION_QUERY]["name"] == "Renamed"
+    assert result["name"] == "Renamed"
+
+def test_patch_exploration_route():
+    """
+    Test the PATCH route: unchanged graphs write nothing, bad bodies get 400 and unknown ids 404.
+    """
+    driver = _stored_driver(3)
+    app.dependency_overrides[get_neo4j_repository] = lambda: Neo4jRepository(driver=driver)
+    try:
+        client = TestClient(app)
+        nodes, edges = _graph(3)
+        unchanged = client.patch("/api/explorations/known", json={"nodes": nodes, "edges": edges})
+        assert unchanged.status_code == 200
+        assert unchanged.json()["node_count"] == 3 and unchanged.json()["upserted_nodes"] == 0
+        assert [query for query, _ in driver.queries] == [GET_EXPLORATION_QUERY, PATCH_EXPLORATION_QUERY]
+
+        both = client.patch("/api/explorations/known", json={"nodes": nodes, "edges": edges, "remove_nodes": ["N1"]})
+        assert both.status_code == 400
+        conflicting = client.patch("/api/explorations/known", json={"add_nodes": [nodes[1]], "remove_nodes": ["N1"]})
+        assert conflicting.status_code == 400
+        assert client.patch("/api/explorations/unknown", json={"remove_nodes": ["N1"]}).status_code == 404
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,42 @@
+from services.neo4j_schema import ensure_schema, MIGRATIONS, SCHEMA_VERSION, SET_SCHEMA_VERSION_QUERY
+from fake_neo4j import FakeDriver
+
+def _driver_at_version(version):
+    def responder(query, params):
+        if "RETURN s.version" in query:
+            return [{"version": version}] if version is not None else []
+        if query.startswith("SHOW CONSTRAINTS"):
+            return [{"name": "graph_node_id"}, {"name": "exploration_id"}]
+        if query.startswith("SHOW INDEXES"):
+            return [{"name": "graph_node_id"}]
+        return []
+    return FakeDriver(responder=responder)
+
+def test_ensure_schema_on_empty_database():
+    """
+    Test that a fresh database gets every migration and the version is recorded.
+    """
+    driver = _driver_at_version(None)
+    state = ensure_schema(driver, "neo4j")
+
+    queries = [query for query, _ in driver.queries]
+    for _, statements in MIGRATIONS:
+        for statement in statements:
+            assert statement in queries
+    assert "CREATE CONSTRAINT graph_node_id IF NOT EXISTS FOR (gn:GraphNode) REQUIRE gn.id IS UNIQUE" in queries
+    recorded = [params["version"] for query, params in driver.queries if query == SET_SCHEMA_VERSION_QUERY]
+    assert recorded[-1] == SCHEMA_VERSION
+    assert state["version"] == SCHEMA_VERSION
+    assert state["applied"] == [version for version, _ in MIGRATIONS]
+    assert state["constraints"] == ["exploration_id", "graph_node_id"]
+
+def test_ensure_schema_is_a_no_op_when_current():
+    """
+    Test that an up-to-date database runs no schema statements.
+    """
+    driver = _driver_at_version(SCHEMA_VERSION)
+    state = ensure_schema(driver, "neo4j")
+
+    assert not any(query.startswith("CREATE") for query, _ in driver.queries)
+    assert state["applied"] == []
+    assert state["version"] == SCHEMA_VERSION
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import pytest
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.response_cache import ResponseCache, normalize_params, extract_revids
+from services.wikipedia_client import WikipediaClient
+from wikipedia_stub import WikipediaStubServer
+
+@pytest.fixture
+def stub():
+    server = WikipediaStubServer(links_per_article=5).start()
+    yield server
+    server.stop()
+
+def _expire(cache: ResponseCache):
+    cache._connection().execute("UPDATE responses SET validated_at = validated_at - ?", (cache.ttl + 1,))
+
+def test_normalize_params():
+    assert normalize_params({"titles": "B|A", "exintro": True, "format": "json"}) == \
+        normalize_params({"format": "json", "exintro": 1, "titles": "A|B"})
+    assert normalize_params({"titles": "a"}) != normalize_params({"titles": "A"})
+
+def test_extract_revids():
+    assert extract_revids({"parse": {"title": "A", "revid": 7}}) == {"A": 7}
+    assert extract_revids({"query": {"pages": {"1": {"title": "A", "lastrevid": 3}, "-1": {"title": "B", "missing": ""}}}}) == {"A": 3, "B": 0}
+    assert extract_revids({"query": {"pages": {"1": {"title": "A"}}}}) is None
+
+def test_responses_survive_a_restart(stub, tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path)
+    WikipediaClient(api_url=stub.api_url, response_cache=cache).get_article_content("Topic 1")
+    cache.close()
+
+    cache = ResponseCache(path) # A new process, with an empty in-memory cache
+    client = WikipediaClient(api_url=stub.api_url, response_cache=cache)
+    html, title = client.get_article_content("Topic 1")
+
+    assert title == "Topic 1" and "/wiki/Topic_8" in html
+    assert client.request_count == 0
+    assert stub.request_count == 1
+    assert cache.stats()["hits"] == 1
+
+def test_stale_entries_are_revalidated_by_revision(stub, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    WikipediaClient(api_url=stub.api_url, response_cache=cache).get_article_summaries([f"Topic {i}" for i in range(10)])
+    _expire(cache)
+
+    client = WikipediaClient(api_url=stub.api_url, response_cache=cache)
+    summaries = client.get_article_summaries([f"Topic {i}" for i in range(10)])
+
+    assert summaries["Topic 3"] == "Topic 3 is a synthetic article."
+    assert client.request_count == 1 # One prop=info call instead of the extracts
+    assert cache.stats()["revalidated"] == 1
+
+    stub.edit("Topic 3")
+    _expire(cache)
+    client = WikipediaClient(api_url=stub.api_url, response_cache=cache)
+    client.get_article_summaries([f"Topic {i}" for i in range(10)])
+    assert client.request_count == 2 # prop=info saw a new revision, so the batch is fetched again
+
+def test_stale_entries_are_revalidated_by_etag(tmp_path):
+    server = WikipediaStubServer(etags=True).start()
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+
+    async def fetch():
+        pool = WikipediaConnectionPool(api_url=server.api_url)
+        try:
+            client = AsyncWikipediaClient(pool=pool, response_cache=cache)
+            return await client.get_article_content("Topic 1"), client.request_count
+        finally:
+            await pool.aclose()
+
+    try:
+        asyncio.run(fetch())
+        _expire(cache)
+        (html, title), calls = asyncio.run(fetch())
+    finally:
+        server.stop()
+
+    assert title == "Topic 1"
+    assert calls == 1
+    assert server.not_modified_count == 1
+    assert cache.stats()["revalidated"] == 1
+
+def test_size_cap_holds_across_concurrent_writers(tmp_path):
+    """
+    Several cache instances (as in several worker processes) writing to one file.
+    """
+    path = str(tmp_path / "responses.sqlite3")
+    max_bytes = 20_000
+    errors = []
+
+    def writer(worker: int):
+        cache = ResponseCache(path, max_bytes=max_bytes)
+        try:
+            for i in range(100):
+                cache.store({"action": "parse", "page": f"Topic {worker}-{i}"}, {"parse": {"title": "x", "text": {"*": f"{worker}-{i}" * 200}}})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            cache.close()
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = ResponseCache(path, max_bytes=max_bytes).stats()
+    assert errors == []
+    assert 0 < stats["bytes"] <= max_bytes
+    assert stats["entries"] < 400
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from services.article_cache import ArticleCache
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.crawl_engine import CrawlEngine
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import DegreeCentralityStrategy
+from services.single_flight import SingleFlight, normalize_title
+from services.wikipedia_client import WikipediaClient
+from wikipedia_stub import WikipediaStubServer
+
+def test_normalize_title():
+    assert normalize_title("albert_einstein") == "Albert einstein"
+    assert normalize_title("  Albert   Einstein ") == "Albert Einstein"
+
+def test_concurrent_threads_share_one_fetch():
+    single_flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "content"
+
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(single_flight.run("content", ["Foo_bar", "foo bar"][i % 2], fetch)))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["content"] * 8
+    assert len(calls) == 1
+    assert single_flight.stats() == {"in_flight": 0, "fetched": 1, "coalesced": 7}
+
+def test_batches_coalesce_per_title():
+    single_flight = SingleFlight()
+    batches = []
+
+    async def fetch(titles):
+        batches.append(titles)
+        await asyncio.sleep(0.05)
+        return {title: title.upper() for title in titles}
+
+    async def run():
+        return await asyncio.gather(
+            single_flight.run_many_async("summary", ["A", "B"], fetch),
+            single_flight.run_many_async("summary", ["B", "C"], fetch),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert first == {"A": "A", "B": "B"}
+    assert second == {"B": "B", "C": "C"}
+    assert batches == [["A", "B"], ["C"]]
+    assert single_flight.stats()["coalesced"] == 1
+
+def test_errors_reach_every_waiting_caller():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        raise HTTPException(status_code=503, detail="down")
+
+    async def run():
+        return await asyncio.gather(*(single_flight.run_async("content", "A", fetch) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert [error.status_code for error in errors] == [503, 503, 503]
+    assert single_flight.stats()["in_flight"] == 0
+
+def test_waiting_caller_fetches_itself_when_the_first_is_cancelled():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "content"
+
+    async def run():
+        first = asyncio.ensure_future(single_flight.run_async("content", "A", fetch))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(single_flight.run_async("content", "A", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "content"
+    assert len(calls) == 2
+
+def test_titles_left_out_of_a_fetch_are_fetched_by_the_waiters():
+    single_flight = SingleFlight()
+    batches = []
+
+    async def fetch(titles):
+        batches.append(titles)
+        await asyncio.sleep(0.05)
+        return {title: title.upper() for title in titles if len(batches) > 1 or title != "B"}
+
+    async def run():
+        return await asyncio.gather(
+            single_flight.run_many_async("links", ["A", "B"], fetch),
+            single_flight.run_many_async("links", ["B"], fetch),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert first == {"A": "A"}
+    assert second == {"B": "B"}
+    assert batches == [["A", "B"], ["B"]]
+    assert single_flight.stats()["in_flight"] == 0
+
+def _upstream_calls(single_flight_per_client: bool, users: int = 20) -> int:
+    """
+    `users` concurrent depth-1 explores of the same article against a slow stub,
+    sharing the article cache, as the app does. Returns the upstream requests made.
+    """
+    server = WikipediaStubServer(latency=0.05, links_per_article=5).start()
+    shared = SingleFlight()
+
+    async def run():
+        pool = WikipediaConnectionPool(api_url=server.api_url, max_concurrency=50)
+        cache = ArticleCache()
+        try:
+            async def explore():
+                single_flight = SingleFlight() if single_flight_per_client else shared
+                client = AsyncWikipediaClient(pool=pool, cache=cache, single_flight=single_flight)
+                engine = CrawlEngine(client, GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=5)
+                return await engine.crawl("Topic 1", 1)
+            graphs = await asyncio.gather(*(explore() for _ in range(users)))
+            assert all(len(graph["nodes"]) == 6 for graph in graphs)
+        finally:
+            await pool.aclose()
+
+    try:
+        asyncio.run(run())
+        return server.request_count
+    finally:
+        server.stop()
+
+def test_load_concurrent_explores_of_a_trending_article():
+    """
+    Load test: without coalescing every concurrent user misses the cache at once.
+    """
+    without = _upstream_calls(single_flight_per_client=True)
+    with_coalescing = _upstream_calls(single_flight_per_client=False)
+
+    assert without == 20 * 2 # One parse and one summary batch per user
+    assert with_coalescing == 2
+
+def test_sync_clients_share_fetches_across_threads():
+    server = WikipediaStubServer(latency=0.05).start()
+    single_flight = SingleFlight()
+    cache = ArticleCache()
+    try:
+        def read():
+            client = WikipediaClient(cache=cache, api_url=server.api_url, single_flight=single_flight)
+            client.get_article_content("Topic 1")
+            client.get_article_summaries(["Topic 2", "Topic 3"])
+
+        threads = [threading.Thread(target=read) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.stop()
+
+    assert server.request_count == 2
+    assert single_flight.stats()["coalesced"] >= 9
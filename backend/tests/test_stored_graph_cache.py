@@ -0,0 +1,154 @@
+import asyncio
+import time
+import pytest
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.crawl_engine import CrawlEngine
+from services.graph_analyzer import GraphAnalyzer
+from services.graph_strategies import DegreeCentralityStrategy
+from services.neo4j_repository import Neo4jRepository, GET_STORED_ARTICLES_QUERY, STORE_SUMMARIES_QUERY, STORE_LINKS_QUERY, STORE_REDIRECTS_QUERY
+from services.stored_graph_cache import StoredGraphCache
+from fake_neo4j import FakeDriver
+from wikipedia_stub import WikipediaStubServer
+
+class StoredArticles:
+    """
+    Responder that keeps cached summaries, links and redirects, with their fetch time, like the Neo4j queries do.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def __call__(self, query: str, params: dict):
+        now = time.time()
+        if query == STORE_SUMMARIES_QUERY:
+            for article in params["articles"]:
+                self.nodes.setdefault(article["title"], {}).update(summary=article["summary"], summary_fetched_at=now)
+        elif query == STORE_LINKS_QUERY:
+            for article in params["articles"]:
+                self.nodes.setdefault(article["title"], {}).update(links=article["links"], links_fetched_at=now, redirects_to=None)
+        elif query == STORE_REDIRECTS_QUERY:
+            for redirect in params["redirects"]:
+                self.nodes.setdefault(redirect["title"], {}).update(redirects_to=redirect["target"], links_fetched_at=now, links=None)
+        elif query == GET_STORED_ARTICLES_QUERY:
+            fresh_after = now - params["max_age"]
+            records = []
+            for title in params["titles"]:
+                node = self.nodes.get(title)
+                if node is None:
+                    continue
+                target_title = node.get("redirects_to")
+                article = self.nodes.get(target_title) if target_title is not None else None
+                if article is None:
+                    target_title, article = title, node
+                fresh_links = min(node.get("links_fetched_at", 0), article.get("links_fetched_at", 0)) >= fresh_after
+                records.append({
+                    "id": title,
+                    "title": target_title,
+                    "summary": node.get("summary") if node.get("summary_fetched_at", 0) >= fresh_after else None,
+                    "links": article.get("links") if fresh_links else None,
+                })
+            return records
+        return []
+
+@pytest.fixture
+def five_link_stub():
+    server = WikipediaStubServer(links_per_article=5).start()
+    yield server
+    server.stop()
+
+def _crawl(api_url: str, stored_graph: StoredGraphCache, title: str = "Topic 1", depth: int = 2):
+    async def run():
+        pool = WikipediaConnectionPool(api_url=api_url)
+        try:
+            client = AsyncWikipediaClient(pool=pool)
+            engine = CrawlEngine(client, GraphAnalyzer(strategy=DegreeCentralityStrategy()), max_neighbors=5, stored_graph=stored_graph)
+            return await engine.crawl(title, depth), client.request_count
+        finally:
+            await pool.aclose()
+    return asyncio.run(run())
+
+def _flush(stored_graph: StoredGraphCache, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while stored_graph.stats()["pending_writes"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_second_explore_is_served_from_the_stored_graph(five_link_stub):
+    store = StoredArticles()
+    stored_graph = StoredGraphCache(Neo4jRepository(driver=FakeDriver(responder=store)))
+    try:
+        first, first_calls = _crawl(five_link_stub.api_url, stored_graph)
+        _flush(stored_graph)
+        second, second_calls = _crawl(five_link_stub.api_url, stored_graph)
+    finally:
+        stored_graph.close()
+
+    assert first_calls == 1 + 1 + 5 + 2
+    assert second_calls == 0
+    assert {node["id"]: node["summary"] for node in second["nodes"]} == {node["id"]: node["summary"] for node in first["nodes"]}
+    assert {(e["from"], e["to"]) for e in second["edges"]} == {(e["from"], e["to"]) for e in first["edges"]}
+    assert stored_graph.stats()["write_errors"] == 0
+
+def test_only_stale_or_missing_articles_are_fetched(five_link_stub):
+    store = StoredArticles()
+    stored_graph = StoredGraphCache(Neo4jRepository(driver=FakeDriver(responder=store)), max_age=3600)
+    try:
+        _crawl(five_link_stub.api_url, stored_graph, depth=1)
+        _flush(stored_graph)
+        store.nodes["Topic 1"]["links_fetched_at"] -= 7200 # Root links are now stale, summaries are not
+
+        graph, calls = _crawl(five_link_stub.api_url, stored_graph, depth=1)
+    finally:
+        stored_graph.close()
+
+    assert calls == 1 # Only the root parse
+    assert len(graph["nodes"]) == 6
+    assert store.nodes["Topic 1"]["links_fetched_at"] > time.time() - 60 # Written back again
+
+def test_redirected_root_keeps_its_final_title():
+    """
+    Test that a root served from the stored graph gets the same id as a fresh fetch through the redirect.
+    """
+    server = WikipediaStubServer(links_per_article=5, redirects={"Old Topic 1": "Topic 1"}).start()
+    store = StoredArticles()
+    stored_graph = StoredGraphCache(Neo4jRepository(driver=FakeDriver(responder=store)))
+    try:
+        first, _ = _crawl(server.api_url, stored_graph, title="Old Topic 1", depth=1)
+        _flush(stored_graph)
+        second, second_calls = _crawl(server.api_url, stored_graph, title="Old Topic 1", depth=1)
+    finally:
+        stored_graph.close()
+        server.stop()
+
+    assert first["nodes"][0]["id"] == "Topic 1"
+    assert second["nodes"][0]["id"] == "Topic 1"
+    assert second_calls == 0
+    assert store.nodes["Old Topic 1"]["redirects_to"] == "Topic 1"
+    assert store.nodes["Old Topic 1"].get("links") is None
+
+def test_neo4j_errors_fall_back_to_wikipedia(five_link_stub):
+    def failing(query, params):
+        raise RuntimeError("Neo4j is down")
+
+    stored_graph = StoredGraphCache(Neo4jRepository(driver=FakeDriver(responder=failing)))
+    try:
+        graph, calls = _crawl(five_link_stub.api_url, stored_graph, depth=1)
+        _flush(stored_graph)
+    finally:
+        stored_graph.close()
+
+    assert len(graph["nodes"]) == 6
+    assert calls == 2
+    assert stored_graph.stats()["read_errors"] == 2
+    assert stored_graph.stats()["write_errors"] == 2
+
+def test_write_backs_are_dropped_when_too_many_are_pending():
+    stored_graph = StoredGraphCache(Neo4jRepository(driver=FakeDriver(round_trip=0.2)), max_pending_writes=1)
+    try:
+        stored_graph.write_back(summaries={"A": "a"})
+        stored_graph.write_back(summaries={"B": "b"})
+        stored_graph.write_back(summaries={"C": ""}) # Nothing to store
+    finally:
+        stored_graph.close()
+
+    assert stored_graph.stats()["writes"] == 1
+    assert stored_graph.stats()["dropped_writes"] == 1
@@ -0,0 +1,100 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from services.async_wikipedia_client import AsyncWikipediaClient, WikipediaConnectionPool
+from services.response_cache import ResponseCache
+from services.upstream_guard import UpstreamGuard, TokenBucket, UpstreamUnavailable
+from services.wikipedia_client import WikipediaClient
+from wikipedia_stub import WikipediaStubServer
+
+@pytest.fixture
+def stub():
+    server = WikipediaStubServer(links_per_article=5).start()
+    yield server
+    server.stop()
+
+def _guard(**kwargs) -> UpstreamGuard:
+    return UpstreamGuard(**{"rate": 1000.0, "burst": 1000, "base_delay": 0.01, "max_delay": 1.0, **kwargs})
+
+def test_token_bucket_paces_past_the_burst():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+
+def test_throttled_requests_are_retried(stub):
+    guard = _guard()
+    client = WikipediaClient(api_url=stub.api_url, upstream_guard=guard)
+    stub.throttle(2, status=429, retry_after=0.05)
+
+    started = time.monotonic()
+    html, title = client.get_article_content("Topic 1")
+
+    assert title == "Topic 1"
+    assert time.monotonic() - started >= 0.1 # Retry-After was honoured on both retries
+    assert client.request_count == stub.request_count == 3
+    assert guard.stats()["throttled"] == 2
+    assert guard.stats()["circuit"] == "closed"
+
+def test_maxlag_errors_are_retried_on_the_async_path(stub):
+    guard = _guard()
+    stub.throttle(1, maxlag=True, retry_after=0.01)
+
+    async def fetch():
+        pool = WikipediaConnectionPool(api_url=stub.api_url)
+        try:
+            return await AsyncWikipediaClient(pool=pool, upstream_guard=guard).get_article_summaries(["Topic 2"])
+        finally:
+            await pool.aclose()
+
+    assert asyncio.run(fetch()) == {"Topic 2": "Topic 2 is a synthetic article."}
+    assert stub.request_count == 2
+    assert guard.stats()["throttled"] == 1
+
+def test_without_a_guard_errors_are_not_retried(stub):
+    client = WikipediaClient(api_url=stub.api_url)
+    stub.throttle(1, status=503)
+
+    with pytest.raises(HTTPException) as error:
+        client.get_article_content("Topic 1")
+
+    assert error.value.status_code == 503
+    assert stub.request_count == 1
+
+def test_open_circuit_serves_stale_cached_responses(stub, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl=0)
+    guard = _guard(max_retries=1, failure_threshold=2, reset_timeout=60)
+    WikipediaClient(api_url=stub.api_url, response_cache=cache).get_article_content("Topic 1")
+
+    stub.throttle(100, status=503)
+    client = WikipediaClient(api_url=stub.api_url, response_cache=cache, upstream_guard=guard)
+    html, title = client.get_article_content("Topic 1") # Opens the circuit, answered from the stale entry
+    requests_while_failing = stub.request_count
+
+    assert title == "Topic 1"
+    assert guard.stats()["circuit"] == "open"
+    client = WikipediaClient(api_url=stub.api_url, response_cache=cache, upstream_guard=guard)
+    assert client.get_article_content("Topic 1")[1] == "Topic 1"
+    assert stub.request_count == requests_while_failing # The open circuit does not call Wikipedia
+    assert guard.stats()["rejected"] >= 1
+    assert cache.stats()["served_stale"] == 2
+    with pytest.raises(HTTPException) as error:
+        client.get_article_content("Topic 2") # Nothing cached to fall back to
+    assert error.value.status_code == 503
+
+def test_circuit_probes_after_the_reset_timeout():
+    guard = _guard(failure_threshold=1, reset_timeout=0.05)
+    guard.reserve()
+    guard.record_failure()
+    with pytest.raises(UpstreamUnavailable):
+        guard.reserve()
+
+    time.sleep(0.06)
+    guard.reserve() # The probe
+    guard.record_success()
+
+    assert guard.stats()["circuit"] == "closed"
+    assert guard.stats()["circuit_opened"] == 1
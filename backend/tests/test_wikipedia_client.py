@@ -1,6 +1,9 @@
+import gzip
 import pytest
+from pathlib import Path
 from unittest.mock import patch, Mock
 from services.wikipedia_client import WikipediaClient, WIKIPEDIA_API_URL
+from services.article_cache import ArticleCache
 from fastapi import HTTPException
 import requests # Import requests to access its exceptions
 
@@ -20,7 +23,7 @@ def test_call_wikipedia_api_success(wiki_client):
 
     with patch('requests.get', return_value=mock_response) as mock_get:
         result = wiki_client._call_wikipedia_api({"param": "value"})
-        mock_get.assert_called_once_with(WIKIPEDIA_API_URL, params={"param": "value"})
+        mock_get.assert_called_once_with(WIKIPEDIA_API_URL, params={"param": "value"}, headers=None, timeout=wiki_client.timeout)
         assert result == {"success": True}
 
 def test_call_wikipedia_api_http_error(wiki_client):
@@ -172,3 +175,153 @@ def test_extract_links_from_html_self_link_excluded(wiki_client):
     """
     links = wiki_client.extract_links_from_html(html_content, "Test Article")
     assert links == set()
+
+def test_shared_cache_survives_across_clients():
+    """
+    Test that clients sharing one cache do not refetch the same article.
+    """
+    cache = ArticleCache()
+    mock_api_response = {
+        "parse": {
+            "text": {"*": "<p>Content</p>"},
+            "title": "Final Title"
+        }
+    }
+    first, second = WikipediaClient(cache=cache), WikipediaClient(cache=cache)
+    with patch.object(first, '_call_wikipedia_api', return_value=mock_api_response) as first_call, \
+         patch.object(second, '_call_wikipedia_api', return_value=mock_api_response) as second_call:
+        assert first.get_article_content("Initial Title") == ("<p>Content</p>", "Final Title")
+        assert second.get_article_content("Initial Title") == ("<p>Content</p>", "Final Title")
+        first_call.assert_called_once()
+        second_call.assert_not_called()
+
+def test_get_article_summaries_follows_normalization_and_redirects(wiki_client):
+    """
+    Test that batched summaries are mapped back to the titles as requested.
+    """
+    mock_api_response = {"query": {
+        "normalized": [{"from": "python", "to": "Python"}],
+        "redirects": [{"from": "Python", "to": "Python (programming language)"}],
+        "pages": {
+            "1": {"title": "Python (programming language)", "extract": "A language."},
+            "2": {"title": "Guido van Rossum", "extract": "A programmer."},
+            "-1": {"title": "Nope", "missing": ""},
+        }
+    }}
+    with patch.object(wiki_client, '_call_wikipedia_api', return_value=mock_api_response) as mock_call:
+        summaries = wiki_client.get_article_summaries(["python", "Guido van Rossum", "Nope"])
+        mock_call.assert_called_once()
+        assert mock_call.call_args[0][0]["titles"] == "python|Guido van Rossum|Nope"
+    assert summaries == {"python": "A language.", "Guido van Rossum": "A programmer.", "Nope": ""}
+
+def test_get_article_summaries_chunks_and_uses_cache(wiki_client):
+    """
+    Test that titles are sent in chunks of 20 (one extracts call each) and cached titles are skipped.
+    """
+    titles = [f"Title {i}" for i in range(120)]
+    wiki_client.cache.set("summary_Title 0", "Cached.")
+
+    def fake_api(params):
+        pages = {str(i): {"title": t, "extract": f"About {t}."} for i, t in enumerate(params["titles"].split("|"))}
+        return {"query": {"pages": pages}}
+
+    with patch.object(wiki_client, '_call_wikipedia_api', side_effect=fake_api) as mock_call:
+        summaries = wiki_client.get_article_summaries(titles)
+        assert mock_call.call_count == 6 # 119 uncached titles -> 5 x 20 + 19
+    assert summaries["Title 0"] == "Cached."
+    assert summaries["Title 119"] == "About Title 119."
+    assert len(summaries) == 120
+
+def test_get_article_summaries_follows_continuation(wiki_client):
+    """
+    Test that extracts held back by exlimit are fetched through "continue".
+    """
+    responses = [
+        {"continue": {"excontinue": 1, "continue": "||"}, "query": {"pages": {
+            "1": {"title": "A", "extract": "About A."},
+            "2": {"title": "B"},
+        }}},
+        {"query": {"pages": {
+            "1": {"title": "A"},
+            "2": {"title": "B", "extract": "About B."},
+        }}},
+    ]
+    with patch.object(wiki_client, '_call_wikipedia_api', side_effect=responses) as mock_call:
+        summaries = wiki_client.get_article_summaries(["A", "B"])
+        assert mock_call.call_args_list[1][0][0]["excontinue"] == 1
+    assert summaries == {"A": "About A.", "B": "About B."}
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+@pytest.mark.parametrize("fixture", sorted(path.name for path in FIXTURES_DIR.glob("*.html.gz")))
+def test_extract_links_from_html_matches_soup_on_fixtures(wiki_client, fixture):
+    """
+    Test that the href scanner returns exactly the links of the BeautifulSoup extractor.
+    """
+    html_content = gzip.open(FIXTURES_DIR / fixture, "rt", encoding="utf-8").read()
+    links = wiki_client.extract_links_from_html(html_content, "Café")
+    assert links
+    assert links == wiki_client.extract_links_from_html_soup(html_content, "Café")
+
+def test_extract_links_from_html_tricky_markup(wiki_client):
+    """
+    Test quoting, entities, case and comments against the BeautifulSoup extractor.
+    """
+    html_content = """
+    <p>
+        <a href='/wiki/Single_quoted'>single</a>
+        <a href=/wiki/Unquoted>unquoted</a>
+        <A HREF="/wiki/Upper_case">upper</A>
+        <a title="a > b" href="/wiki/Angle_in_title">angle</a>
+        <a data-href="/wiki/Not_this" href="/wiki/But_this">data-href</a>
+        <a title="href=/wiki/Fake" href="/wiki/Real">fake href</a>
+        <a href="/wiki/AT%26T">encoded</a>
+        <a href="/wiki/Rock_&amp;_roll">entity</a>
+        <a
+            href="/wiki/Multi_line">multi-line</a>
+        <a name="no-href">anchor</a>
+        <abbr href="/wiki/Not_an_anchor">abbr</abbr>
+        <!-- <a href="/wiki/Commented_out">hidden</a> -->
+        <a href="/wiki/Caf%C3%A9">self</a>
+    </p>
+    """
+    links = wiki_client.extract_links_from_html(html_content, "Café")
+    assert links == {
+        "Single quoted", "Unquoted", "Upper case", "Angle in title", "But this",
+        "Real", "AT&T", "Rock & roll", "Multi line",
+    }
+    assert links == wiki_client.extract_links_from_html_soup(html_content, "Café")
+
+def test_get_links_for_titles_follows_continuation_and_redirects(wiki_client):
+    """
+    Test batched prop=links: continuation is merged, redirects are followed and self-links dropped.
+    """
+    responses = [
+        {"continue": {"plcontinue": "2|0|C", "continue": "||"}, "query": {
+            "redirects": [{"from": "Old A", "to": "A"}],
+            "pages": {
+                "1": {"title": "A", "links": [{"ns": 0, "title": "A"}, {"ns": 0, "title": "B"}]},
+                "2": {"title": "B", "links": [{"ns": 0, "title": "A"}]},
+                "-1": {"title": "Nope", "missing": ""},
+            }}},
+        {"query": {"pages": {
+            "1": {"title": "A"},
+            "2": {"title": "B", "links": [{"ns": 0, "title": "C"}]},
+            "-1": {"title": "Nope", "missing": ""},
+        }}},
+    ]
+    with patch.object(wiki_client, '_call_wikipedia_api', side_effect=responses) as mock_call:
+        links = wiki_client.get_links_for_titles(["Old A", "B", "Nope"])
+        assert mock_call.call_args_list[0][0][0]["plnamespace"] == 0
+        assert mock_call.call_args_list[1][0][0]["plcontinue"] == "2|0|C"
+    assert links == {"Old A": {"B"}, "B": {"A", "C"}, "Nope": set()}
+
+def test_get_article_links_missing_article(wiki_client):
+    """
+    Test that prop=links on a missing article raises a 404 like get_article_content.
+    """
+    mock_api_response = {"query": {"pages": {"-1": {"title": "Nope", "missing": ""}}}}
+    with patch.object(wiki_client, '_call_wikipedia_api', return_value=mock_api_response):
+        with pytest.raises(HTTPException) as exc_info:
+            wiki_client.get_article_links("Nope")
+    assert exc_info.value.status_code == 404
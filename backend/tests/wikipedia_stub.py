@@ -0,0 +1,209 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # The default backlog of 5 drops bursts of concurrent connects
+
+class WikipediaStubServer:
+    """
+    Local stand-in for the MediaWiki API, used to test the HTTP clients.
+    Articles are synthetic: "Topic N" links to `links_per_article` other topics.
+    Every response waits `latency` seconds to mimic a remote server. Every article
+    is at revision 1 until `edit` bumps it; with `etags`, parse responses carry an
+    ETag and answer a matching If-None-Match with 304. Parse requests for a title
+    in `redirects` are answered with the article it redirects to.
+    """
+
+    def __init__(self, latency: float = 0.0, links_per_article: int = 20, article_count: int = 1000, links_page_size: int = 500,
+                 etags: bool = False, extracts_page_size: int = 20, redirects: dict = None):
+        self.latency = latency
+        self.links_page_size = links_page_size # pllimit=max, paged with "plcontinue" offsets
+        self.extracts_page_size = extracts_page_size # exlimit=max for intro extracts, paged with "excontinue" offsets
+        self.links_per_article = links_per_article
+        self.article_count = article_count
+        self.etags = etags
+        self.redirects = redirects or {}
+        self.revisions = {} # Title -> revision id, for edited articles
+        self.not_modified_count = 0
+        self._faults = [] # (status, retry_after, maxlag) for the next requests, consumed in order
+        self.request_count = 0
+        self.connection_count = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/w/api.php"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- Synthetic article graph ---
+
+    def links_of(self, title: str) -> list:
+        try:
+            index = int(title.rsplit(" ", 1)[1])
+        except (IndexError, ValueError):
+            return []
+        return [f"Topic {(index * 7 + offset) % self.article_count}" for offset in range(1, self.links_per_article + 1)]
+
+    def html_of(self, title: str) -> str:
+        anchors = "".join(f'<li><a href="/wiki/{quote(link.replace(" ", "_"))}" title="{link}">{link}</a></li>' for link in self.links_of(title))
+        return f'<div class="mw-parser-output"><p><b>{title}</b> is a synthetic article.</p><ul>{anchors}</ul></div>'
+
+    def revid_of(self, title: str) -> int:
+        return self.revisions.get(title, 1)
+
+    def edit(self, title: str):
+        self.revisions[title] = self.revid_of(title) + 1
+
+    def throttle(self, count: int, status: int = 429, retry_after: float = None, maxlag: bool = False):
+        """
+        Fail the next `count` requests: with `status`, or with a maxlag error
+        (HTTP 200, as the real API does) when `maxlag` is set.
+        """
+        with self._lock:
+            self._faults.extend([(200 if maxlag else status, retry_after, maxlag)] * count)
+
+    def etag_of(self, params: dict):
+        if self.etags and params.get("action") == "parse":
+            return f'"{params["page"]}-{self.revid_of(params["page"])}"'
+        return None
+
+    # --- Request handling ---
+
+    def respond(self, params: dict) -> dict:
+        action = params.get("action")
+        if action == "parse":
+            title = self.redirects.get(params["page"], params["page"])
+            if not title.startswith("Topic "):
+                return {"error": {"code": "missingtitle", "info": "The page you specified doesn't exist."}}
+            return {"parse": {"title": title, "revid": self.revid_of(title), "text": {"*": self.html_of(title)}}}
+        if params.get("list") == "search":
+            term = params.get("srsearch", "")
+            return {"query": {"search": [{"title": f"Topic {i}", "snippet": term} for i in range(10)]}}
+        props = params.get("prop", "").split("|")
+        if "extracts" in props:
+            offset = int(params.get("excontinue", 0))
+            titles = params.get("titles", "").split("|")
+            pages = {}
+            for index, title in enumerate(titles):
+                pages[str(index + 1)] = {"title": title}
+                if offset <= index < offset + self.extracts_page_size:
+                    pages[str(index + 1)]["extract"] = f"{title} is a synthetic article."
+            response = {"query": {"pages": pages}}
+            if offset + self.extracts_page_size < len(titles):
+                response["continue"] = {"excontinue": str(offset + self.extracts_page_size), "continue": "||"}
+        elif "links" in props:
+            response = self.links_response(params)
+        elif props == ["info"]:
+            pages = {str(index + 1): {"title": title} for index, title in enumerate(params.get("titles", "").split("|"))}
+            response = {"query": {"pages": pages}}
+        else:
+            return {"error": {"code": "badparams", "info": "Unsupported request."}}
+        if "info" in props:
+            for page in response["query"]["pages"].values():
+                if "missing" not in page:
+                    page["lastrevid"] = self.revid_of(page["title"])
+        return response
+
+    def links_response(self, params: dict) -> dict:
+        titles = params.get("titles", "").split("|")
+        all_links = [(title, link) for title in titles for link in self.links_of(title)]
+        offset = int(params.get("plcontinue", 0))
+        page_links = all_links[offset:offset + self.links_page_size]
+
+        pages = {}
+        for index, title in enumerate(titles):
+            if title.startswith("Topic "):
+                pages[str(index + 1)] = {"pageid": index + 1, "ns": 0, "title": title}
+            else:
+                pages[str(-index - 1)] = {"ns": 0, "title": title, "missing": ""}
+        by_title = {page["title"]: page for page in pages.values()}
+        for title, link in page_links:
+            by_title[title].setdefault("links", []).append({"ns": 0, "title": link})
+
+        response = {"query": {"pages": pages}}
+        if offset + self.links_page_size < len(all_links):
+            response["continue"] = {"plcontinue": str(offset + self.links_page_size), "continue": "||"}
+        return response
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, so connection reuse can be observed
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this, Nagle's
+                # algorithm plus delayed ACKs add ~40 ms to every keep-alive response.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connection_count += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                with stub._lock:
+                    fault = stub._faults.pop(0) if stub._faults else None
+                if fault is not None:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                    self._send_fault(*fault)
+                    return
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    params = {key: values[-1] for key, values in parse_qs(urlparse(self.path).query).items()}
+                    etag = stub.etag_of(params)
+                    body = json.dumps(stub.respond(params)).encode("utf-8")
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                if etag is not None and self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_fault(self, status: int, retry_after, maxlag: bool):
+                body = json.dumps({"error": {"code": "maxlag", "info": "Waiting for a database server."}} if maxlag else {}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if retry_after is not None:
+                    self.send_header("Retry-After", str(retry_after))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Keep test output quiet
+
+        return Handler
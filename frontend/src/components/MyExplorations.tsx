@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import { getExplorations, saveExploration, deleteExploration } from '../services/api';
-import type { Exploration, GraphData, Node, Edge } from '../services/api';
+import { getExplorations, getExploration, saveExploration, deleteExploration } from '../services/api';
+import type { ExplorationSummary, GraphData, Node, Edge } from '../services/api';
 
 interface MyExplorationsProps {
   onLoadExploration: (exploration: { name: string; nodes: Node[]; edges: Edge[] }) => void;
@@ -8,7 +8,8 @@ interface MyExplorationsProps {
 }
 
 const MyExplorations: React.FC<MyExplorationsProps> = ({ onLoadExploration, currentGraph }) => {
-  const [explorations, setExplorations] = useState<Exploration[]>([]);
+  const [explorations, setExplorations] = useState<ExplorationSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
   const [saveName, setSaveName] = useState<string>('');
@@ -17,8 +18,9 @@ const MyExplorations: React.FC<MyExplorationsProps> = ({ onLoadExploration, curr
     setLoading(true);
     setError(null);
     try {
-      const data = await getExplorations();
-      setExplorations(data);
+      const page = await getExplorations();
+      setExplorations(page.items);
+      setNextCursor(page.next_cursor);
     } catch (e: any) {
       setError(`Fallo al obtener exploraciones: ${e.message}`);
     } finally {
@@ -26,6 +28,33 @@ const MyExplorations: React.FC<MyExplorationsProps> = ({ onLoadExploration, curr
     }
   };
 
+  const fetchMoreExplorations = async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    setError(null);
+    try {
+      const page = await getExplorations(nextCursor);
+      setExplorations((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (e: any) {
+      setError(`Fallo al obtener exploraciones: ${e.message}`);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleLoadExploration = async (id: string) => {
+    setLoading(true);
+    setError(null);
+    try {
+      onLoadExploration(await getExploration(id));
+    } catch (e: any) {
+      setError(`Fallo al cargar exploración: ${e.message}`);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
     fetchExplorations();
   }, []);
@@ -105,7 +134,8 @@ const MyExplorations: React.FC<MyExplorationsProps> = ({ onLoadExploration, curr
           {explorations.map((exp) => (
             <li key={exp.id}>
               <span>{exp.name}</span>
-              <button onClick={() => onLoadExploration(exp)} disabled={loading}>
+              {exp.node_count !== undefined && <span> ({exp.node_count} nodos)</span>}
+              <button onClick={() => handleLoadExploration(exp.id)} disabled={loading}>
                 Cargar
               </button>
               <button onClick={() => handleDeleteExploration(exp.id)} disabled={loading}>
@@ -115,6 +145,9 @@ const MyExplorations: React.FC<MyExplorationsProps> = ({ onLoadExploration, curr
           ))}
         </ul>
       )}
+      {!loading && nextCursor && (
+        <button onClick={fetchMoreExplorations}>Cargar más</button>
+      )}
     </div>
   );
 };
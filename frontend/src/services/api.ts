@@ -27,6 +27,19 @@ export interface Exploration extends GraphData {
   name: string;
 }
 
+export interface ExplorationSummary {
+  id: string;
+  name: string;
+  node_count?: number;
+  edge_count?: number;
+  created_at?: string;
+}
+
+export interface ExplorationPage {
+  items: ExplorationSummary[];
+  next_cursor: string | null;
+}
+
 export const searchArticles = async (term: string): Promise<SearchResult[]> => {
   const response = await fetch(`${API_BASE_URL}/api/search?term=${encodeURIComponent(term)}`);
   if (!response.ok) {
@@ -44,8 +57,17 @@ export const exploreArticle = async (articleTitle: string): Promise<GraphData> =
   return response.json();
 };
 
-export const getExplorations = async (): Promise<Exploration[]> => {
-  const response = await fetch(`${API_BASE_URL}/api/explorations`);
+export const getExplorations = async (cursor?: string | null): Promise<ExplorationPage> => {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const response = await fetch(`${API_BASE_URL}/api/explorations${query}`);
+  if (!response.ok) {
+    throw new Error(`Error HTTP! estado: ${response.status}`);
+  }
+  return response.json();
+};
+
+export const getExploration = async (id: string): Promise<Exploration> => {
+  const response = await fetch(`${API_BASE_URL}/api/explorations/${id}`);
   if (!response.ok) {
     throw new Error(`Error HTTP! estado: ${response.status}`);
   }